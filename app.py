@@ -1,11 +1,31 @@
 import streamlit as st
-import pandas as pd
-import folium
-from streamlit_folium import folium_static
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import json
-import requests
-import plotly.express as px
-import plotly.graph_objects as go
+import os
+import time
+import zipfile
+
+from batch import cached_batch, expand_upload
+from boundaryfile import load_compact
+from choropleth import MAP_PALETTE, feature_name, render_choropleth
+from cache import LRUCache, fingerprint, frame_fingerprint
+from charts import potensi_pie, top10_bar
+from core import prepare_frame, summarize
+from fetcher import FetchError, SheetFetcher, check_sheet_url
+from geostore import BoundarySet
+from history import PERIODS, SnapshotStore
+from instrument import RecentRuns, StageRecorder, append_log, stage, stage_percentiles, timed
+from livemap import build_live_update, geometry_payload, live_choropleth, live_viewport
+from ingest import cached_ingest, file_digest
+from matching import frame_matcher
+from metrics_api import MetricsStore, serve as serve_metrics_api
+from partitions import INDEX_FILE, PartitionStore, desa_metrics
+from pipeline import CAPAIAN_BANDS, TABLE_SORTS, get_color_by_percentage, table_page, table_rows
+from regions import RegionIndex, rollup
+from scheduler import RefreshScheduler, format_age
+from spatial import PolygonIndex
+from topology import build_levels, choose_level, zoom_for_bounds
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -14,6 +34,22 @@ st.set_page_config(
     layout="wide"
 )
 
+# Log instrumentasi (JSON Lines, satu baris per rerun; hanya jika diset, dirotasi per ukuran)
+# dan direktori dump cProfile
+DIAGNOSTICS_LOG = os.environ.get('DASHBOARD_DIAGNOSTICS_LOG') or None
+PROFILE_DIR = 'profiles'
+# Port API metrik read-only (lihat metrics_api.py); kosong = API tidak dijalankan
+METRICS_API_PORT = os.environ.get('DASHBOARD_METRICS_PORT')
+# Selang (detik) cek snapshot pertama URL Apps Script baru; rerun tidak pernah menunggu jaringan
+SNAPSHOT_POLL_SECONDS = 1.0
+# Web app Apps Script bawaan (isian awal URL di sidebar)
+DEFAULT_SHEET_URL = "https://script.google.com/macros/s/AKfycbwdWbIsHNUvba1fMh3K41-1sS0-nuQmvDbcoHJMc2z_v-mCSFvKbWkHHucfZkiN1gmc/exec?action=getPotensiRealisasi"
+# Sumber data API metrik; dipantau terus oleh scheduler, tanpa perlu ada session yang membuka dashboard
+METRICS_SHEET_URL = os.environ.get('DASHBOARD_METRICS_SHEET_URL', DEFAULT_SHEET_URL)
+# Host tambahan (dipisah koma, mis. 127.0.0.1 untuk mock lokal) selain script.google.com
+SHEET_HOSTS = tuple(host.strip().lower() for host in os.environ.get('DASHBOARD_SHEET_HOSTS', '').split(',')
+                    if host.strip())
+
 # Title dan Header
 st.markdown("""
     <div style='background: linear-gradient(to right, #004aad, #0074e0); padding: 20px; border-radius: 10px;'>
@@ -25,30 +61,188 @@ st.markdown("""
 st.write("")
 
 
+BOGOR_GEOJSON = 'bogor_regency.json'
+# Format ringkas (lihat tools/convert_boundaries.py), berisi juga level sederhana
+BOGOR_COMPACT = 'bogor_regency.bnd'
+# Batas kecamatan satu provinsi (multi-kabupaten), dibuat dengan
+# tools/convert_boundaries.py --where GID_1=IDN.9_1
+PROVINCE_COMPACT = 'jawa_barat.bnd'
+# Riwayat snapshot (append-only) untuk grafik tren
+HISTORY_DB = os.environ.get('DASHBOARD_HISTORY_DB', 'history.sqlite')
+# Batas desa per kecamatan (lihat tools/partition_boundaries.py)
+DESA_PARTITIONS = 'desa_partitions'
+MAP_CENTER = (-6.60, 106.85)
+MAP_ZOOM = 10
+MAP_TILES = 'OpenStreetMap'
+MAP_HEIGHT = 600
+# Kolom yang mempengaruhi isi peta (fingerprint cache peta)
+MAP_COLUMNS = ['Kecamatan', 'Potensi', 'Realisasi', 'Sisa', 'Persentase']
+# Pilihan jumlah baris per halaman tabel monitoring
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
+
+
 # Function to load GeoJSON from file
-@st.cache_data
-def load_bogor_geojson():
-    """Load Bogor Regency GeoJSON from local file"""
+@st.cache_resource
+def load_bogor_levels():
+    """Load batas Kabupaten Bogor beserta level sederhananya (satu salinan read-only untuk semua session)"""
+    if os.path.exists(BOGOR_COMPACT):
+        return load_compact(BOGOR_COMPACT)
     try:
-        with open('bogor_regency.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(BOGOR_GEOJSON, 'r', encoding='utf-8') as f:
+            return build_levels(BoundarySet.from_geojson(json.load(f)))
     except FileNotFoundError:
         return None
 
 
-# Function to load data from Google Sheets
-@st.cache_data(ttl=300)
-def load_google_sheets_data(url):
-    """Load data from Google Apps Script"""
-    try:
-        response = requests.get(url, timeout=10)
-        data = response.json()
-        if data.get('status') == 'ok':
-            return pd.DataFrame(data['data'])
+@st.cache_resource
+def load_province_levels():
+    """Load batas kecamatan provinsi beserta level sederhananya; None jika belum dibuat"""
+    if not os.path.exists(PROVINCE_COMPACT):
+        return None
+    return load_compact(PROVINCE_COMPACT)
+
+
+def load_bogor_boundaries():
+    """Batas Kabupaten Bogor resolusi penuh"""
+    levels = load_bogor_levels()
+    return levels[0][1] if levels else None
+
+
+@st.cache_resource(max_entries=8)
+def load_uploaded_boundaries(digest, _data):
+    """Parse GeoJSON upload sekali per isi file (key: hash isi file)"""
+    return BoundarySet.from_geojson(json.loads(_data))
+
+
+@st.cache_resource(max_entries=8)
+def load_boundary_levels(key, _boundaries):
+    """Level batas yang disederhanakan; peta bawaan memakai hasil precompute"""
+    if key == BOGOR_GEOJSON:
+        return load_bogor_levels()
+    if key == PROVINCE_COMPACT:
+        return load_province_levels()
+    return build_levels(_boundaries)
+
+
+@st.cache_resource(max_entries=8)
+def load_region_index(key, _boundaries):
+    """Index bbox + kelompok GID_2 untuk batas multi-kabupaten; None jika hanya satu kabupaten"""
+    index = RegionIndex(load_boundary_levels(key, _boundaries))
+    return index if len(index.regency_features) > 1 else None
+
+
+# Refresh Google Sheets di latar belakang; session hanya membaca snapshot
+@st.cache_resource
+def get_refresh_scheduler():
+    """Satu worker untuk semua session: cek setiap 60 detik (revalidasi kondisional)"""
+    return RefreshScheduler(SheetFetcher(), interval=60)
+
+
+@st.fragment(run_every=SNAPSHOT_POLL_SECONDS)
+def wait_for_snapshot(url):
+    """Status muat yang dicek ulang tanpa rerun penuh; seluruh app di-rerun begitu snapshot pertama ada"""
+    if get_refresh_scheduler().snapshot(url) is not None:
+        st.rerun()
+    st.info("⏳ Data sedang dimuat di latar belakang...")
+
+
+@st.cache_resource(max_entries=8)
+def load_geometry_payload(fingerprint, _boundaries):
+    """GeoJSON geometry + key untuk peta live, dibuat sekali per batas"""
+    return geometry_payload(_boundaries)
+
+
+@st.cache_resource
+def get_kecamatan_locator():
+    """Locator (lon, lat) -> nama kecamatan dari batas bawaan (index grid dibangun sekali)"""
+    boundaries = load_bogor_boundaries()
+    if boundaries is None:
         return None
-    except Exception as e:
-        st.error(f"Error loading from Google Sheets: {str(e)}")
+    return PolygonIndex(boundaries).locator([feature_name(props) for props in boundaries.properties])
+
+
+@st.cache_resource
+def get_snapshot_store():
+    """SnapshotStore SQLite bersama untuk semua session"""
+    return SnapshotStore(HISTORY_DB)
+
+
+@st.cache_resource
+def get_partition_store():
+    """Partisi batas desa (dibuka per kecamatan, LRU); None jika belum dibuat"""
+    if not os.path.exists(os.path.join(DESA_PARTITIONS, INDEX_FILE)):
         return None
+    return PartitionStore(DESA_PARTITIONS)
+
+
+# Cache HTML peta yang sudah di-render, dipakai bersama oleh semua session
+@st.cache_resource
+def get_map_cache():
+    """LRU cache HTML peta (maks. 16 peta / 64 MB), key: fingerprint batas, metrik dan style"""
+    return LRUCache(max_entries=16, max_bytes=64 * 1024 ** 2)
+
+
+# Rekap kabupaten terpisah dari cache peta, supaya tidak saling menggusur
+@st.cache_resource
+def get_rollup_cache():
+    """LRU cache rekap kabupaten/kota (maks. 8 rekap), key: fingerprint batas dan metrik"""
+    return LRUCache(max_entries=8, max_bytes=16 * 1024 ** 2)
+
+
+# Urutan baris tabel per filter/urutan; terpisah agar tidak menggusur peta
+@st.cache_resource
+def get_table_cache():
+    """LRU cache posisi baris tabel monitoring (maks. 64 kueri / 8 MB), key: fingerprint metrik, filter dan urutan"""
+    return LRUCache(max_entries=64, max_bytes=8 * 1024 ** 2)
+
+
+# Cache hasil ingest upload, dipakai bersama oleh semua session
+@st.cache_resource
+def get_upload_cache():
+    """LRU cache hasil parsing upload (maks. 8 file / 512 MB)"""
+    return LRUCache(max_entries=8, max_bytes=512 * 1024 ** 2)
+
+
+@st.cache_resource
+def get_metrics_store():
+    """Snapshot API metrik (data Google Sheets) + server HTTP-nya, satu per proses; None jika tidak diaktifkan.
+
+    Snapshot diperbarui dari worker refresh setiap kali data METRICS_SHEET_URL
+    berubah, bukan dari rerun dashboard, jadi API tetap terkini meski tidak
+    ada session yang terbuka.
+    """
+    if not METRICS_API_PORT:
+        return None
+    url = check_sheet_url(METRICS_SHEET_URL, SHEET_HOSTS)
+    source = f"sheets:{url}"
+    boundaries = load_bogor_boundaries()
+    store = MetricsStore()
+
+    def publish(changed_url, snapshot):
+        if changed_url != url:
+            return
+        try:
+            df, _, _ = prepare_frame(snapshot['df'])
+        except ValueError:
+            # Data tidak valid: API tetap menyajikan snapshot sebelumnya
+            return
+        store.publish(df, boundaries, source=source, updated_at=snapshot['updated_at'])
+
+    scheduler = get_refresh_scheduler()
+    scheduler.watch(url, pin=True)
+    scheduler.subscribe(publish)
+    # Data yang sudah diambil sebelum subscribe tidak memicu listener
+    snapshot = scheduler.snapshot(url)
+    if snapshot is not None and snapshot['df'] is not None:
+        publish(url, snapshot)
+    serve_metrics_api(store, host=os.environ.get('DASHBOARD_METRICS_HOST', '127.0.0.1'), port=int(METRICS_API_PORT))
+    return store
+
+
+@st.cache_resource
+def get_recent_runs():
+    """Record instrumentasi rerun terakhir dari semua session, untuk p50/p95 di panel diagnostik"""
+    return RecentRuns(max_runs=500)
 
 
 # Placeholder GeoJSON (kotak sederhana)
@@ -71,238 +265,319 @@ placeholder_geojson = {
 }
 
 
-def normalize_name(name):
-    """Normalize nama kecamatan untuk matching"""
-    return name.lower().strip().replace(" ", "").replace("-", "")
-
+@st.cache_resource
+def load_placeholder_boundaries():
+    """Placeholder GeoJSON sebagai BoundarySet"""
+    return BoundarySet.from_geojson(placeholder_geojson)
 
-def get_color_by_percentage(persen):
-    """Warna berdasarkan persentase realisasi (untuk progress bar)"""
-    if persen >= 80:
-        return '#28a745'  # Hijau
-    elif persen >= 50:
-        return '#ffc107'  # Kuning
-    elif persen > 0:
-        return '#dc3545'  # Merah
-    else:
-        return '#e0e0e0'  # Abu-abu (tidak ada data)
-
-
-def get_colorful_palette():
-    """Warna warni untuk peta"""
-    return [
-        '#4CAF50', '#2196F3', '#FF9800', '#E91E63', '#9C27B0',
-        '#FF5722', '#00BCD4', '#FFEB3B', '#795548', '#607D8B',
-        '#3F51B5', '#009688', '#FFC107', '#CDDC39', '#FF4081',
-        '#00ACC1', '#7CB342', '#D32F2F', '#512DA8', '#689F38',
-        '#F44336', '#03A9F4', '#8BC34A', '#E65100', '#673AB7',
-        '#00897B', '#6D4C41', '#5E35B1', '#1E88E5', '#43A047'
-    ]
 
+def metrics_fingerprint(df):
+    """Fingerprint kolom metrik (dan Kabupaten, jika ada) yang menentukan hasil pencocokan dan peta"""
+    return frame_fingerprint(df[MAP_COLUMNS + (['Kabupaten'] if 'Kabupaten' in df.columns else [])])
 
-# Sidebar
-with st.sidebar:
-    st.header("⚙️ Konfigurasi")
 
-    # Data Source
-    st.subheader("📂 Sumber Data")
-    data_source = st.radio(
-        "Pilih sumber data:",
-        ["Google Sheets", "Upload File"]
+@timed('map')
+def cached_map(map_boundaries, df, palette, live, location, zoom, ambiguous=frozenset()):
+    """Peta (HTML atau payload live) dari cache bersama; di-render ulang hanya jika batas, metrik atau style berubah"""
+    map_cache = get_map_cache()
+    map_key = (
+        'live' if live else 'html',
+        map_boundaries.fingerprint,
+        metrics_fingerprint(df),
+        fingerprint(palette, location, zoom, MAP_TILES, sorted(ambiguous)),
     )
-
-    df = None
-
-    if data_source == "Google Sheets":
-        gs_url = st.text_input(
-            "Google Apps Script URL",
-            value="https://script.google.com/macros/s/AKfycbwdWbIsHNUvba1fMh3K41-1sS0-nuQmvDbcoHJMc2z_v-mCSFvKbWkHHucfZkiN1gmc/exec?action=getPotensiRealisasi",
-            help="URL dari Google Apps Script yang mengembalikan data JSON"
+    rendered = map_cache.get(map_key)
+    if rendered is None:
+        matcher = frame_matcher(df, ambiguous)
+        if live:
+            # Tanpa koordinat: hanya metrik & style per key
+            rendered = build_live_update(
+                map_boundaries, df, matcher=matcher, palette=palette,
+                progress_color=get_color_by_percentage
+            )
+        else:
+            rendered = render_choropleth(
+                map_boundaries,
+                df,
+                matcher=matcher,
+                palette=palette,
+                progress_color=get_color_by_percentage,
+                location=list(location),
+                zoom=zoom,
+                tiles=MAP_TILES
+            )
+        map_cache.put(map_key, rendered)
+    return rendered
+
+
+# API metrik (jika diaktifkan) dijalankan pada rerun pertama di proses ini, apa pun sumber data session-nya
+try:
+    get_metrics_store()
+except (ValueError, FetchError) as e:
+    st.error(f"❌ API metrik tidak dijalankan: {e}")
+
+# Waktu per tahap untuk rerun ini; opsi memori/profil dari panel diagnostik (run sebelumnya)
+recorder = StageRecorder(
+    memory=st.session_state.get('diagnostics_memory', False),
+    profile_dir=PROFILE_DIR if st.session_state.get('diagnostics_profile', False) else None
+).start()
+# Konteks record diagnostik; tetap terdefinisi jika rerun berhenti sebelum sidebar selesai
+data_source = map_source = df = None
+try:
+    # Sidebar
+    with st.sidebar:
+        st.header("⚙️ Konfigurasi")
+
+        # Data Source
+        st.subheader("📂 Sumber Data")
+        data_source = st.radio(
+            "Pilih sumber data:",
+            ["Google Sheets", "Upload File"]
         )
 
-        if st.button("🔄 Load Data from Google Sheets"):
-            with st.spinner("Loading..."):
-                df = load_google_sheets_data(gs_url)
-                if df is not None:
-                    st.success(f"✅ Loaded {len(df)} kecamatan")
-    else:
-        uploaded_file = st.file_uploader(
-            "Upload CSV atau Excel",
-            type=['csv', 'xlsx', 'xls'],
-            help="File dengan kolom: KECAMATAN, POTENSI, REALISASI"
-        )
+        df = None
+        # Identitas sumber data untuk riwayat snapshot
+        history_source = None
+        taken_at = None
+        # Agregat per (kecamatan, desa) untuk drill-down, jika data punya kolom desa
+        desa_count = None
+
+        if data_source == "Google Sheets":
+            gs_url = st.text_input(
+                "Google Apps Script URL",
+                value=DEFAULT_SHEET_URL,
+                help="URL dari Google Apps Script yang mengembalikan data JSON"
+            )
 
-        if uploaded_file:
+            scheduler = get_refresh_scheduler()
+            refresh_clicked = st.button("🔄 Refresh Data dari Google Sheets")
+            snapshot = url_error = None
             try:
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                    st.success(f"✅ Loaded {len(df)} rows")
-                else:
-                    # Excel file - check for multiple sheets
-                    excel_file = pd.ExcelFile(uploaded_file)
-                    sheet_names = excel_file.sheet_names
-
-                    st.info(f"📋 Sheet ditemukan: {', '.join(sheet_names)}")
-
-                    # Check if we have POTENSI and AKUISISI sheets
-                    if 'POTENSI' in sheet_names and 'AKUISISI' in sheet_names:
-                        df_potensi = pd.read_excel(uploaded_file, sheet_name='POTENSI')
-                        df_akuisisi = pd.read_excel(uploaded_file, sheet_name='AKUISISI')
-
-                        # Remove empty rows
-                        df_potensi = df_potensi.dropna(how='all')
-                        df_akuisisi = df_akuisisi.dropna(how='all')
-
-                        # Clean column names
-                        df_potensi.columns = [str(col).strip().upper() for col in df_potensi.columns]
-                        df_akuisisi.columns = [str(col).strip().upper() for col in df_akuisisi.columns]
-
-                        st.sidebar.write("**POTENSI columns:**", list(df_potensi.columns)[:5])
-                        st.sidebar.write("**AKUISISI columns:**", list(df_akuisisi.columns)[:5])
-
-                        # Find kecamatan columns - prioritize exact matches
-                        kec_col_pot = None
-                        kec_col_aku = None
+                # URL divalidasi sebelum dipantau: hanya web app Apps Script (atau host yang diizinkan)
+                gs_url = check_sheet_url(gs_url, SHEET_HOSTS)
+                if refresh_clicked:
+                    scheduler.request_refresh(gs_url)
+                # Tanpa menunggu: URL baru menampilkan status muat yang di-poll (wait_for_snapshot)
+                with stage('fetch'):
+                    snapshot = scheduler.snapshot(gs_url)
+            except (ValueError, FetchError) as e:
+                url_error = str(e)
+            if url_error:
+                st.error(f"❌ {url_error}")
+            elif snapshot is None:
+                wait_for_snapshot(gs_url)
+            elif snapshot['df'] is None:
+                st.error(f"Error loading from Google Sheets: {snapshot['error']}")
+            else:
+                # Salinan: snapshot dipakai bersama oleh semua session
+                df = snapshot['df'].copy()
+                history_source = f"sheets:{gs_url}"
+                taken_at = snapshot['updated_at']
+                st.success(f"✅ Loaded {len(df)} kecamatan")
+                now = time.time()
+                st.caption(
+                    f"🕒 Snapshot #{snapshot['sequence']} · data berubah {format_age(now - snapshot['updated_at'])} lalu"
+                    f" · dicek {format_age(now - snapshot['checked_at'])} lalu"
+                )
+                if snapshot['error']:
+                    st.warning(f"⚠️ Refresh terakhir gagal, memakai data sebelumnya: {snapshot['error']}")
+        else:
+            batch_upload = st.checkbox(
+                "📦 Batch: banyak file / ZIP",
+                value=False,
+                help="Workbook dari beberapa kantor cabang diparse paralel lalu dijumlahkan per kecamatan"
+            )
+            uploaded_files = []
+            uploaded_file = None
+            if batch_upload:
+                uploaded_files = st.file_uploader(
+                    "Upload CSV, Excel atau ZIP",
+                    type=['csv', 'xlsx', 'xls', 'zip'],
+                    accept_multiple_files=True,
+                    help="Setiap file diproses seperti upload tunggal; isi ZIP dibongkar otomatis"
+                )
+            else:
+                uploaded_file = st.file_uploader(
+                    "Upload CSV atau Excel",
+                    type=['csv', 'xlsx', 'xls'],
+                    help="File dengan kolom: KECAMATAN, POTENSI, REALISASI"
+                )
+            stream_upload = st.checkbox(
+                "⚡ Mode streaming (file besar)",
+                value=False,
+                help="Baca CSV per chunk atau POTENSI/AKUISISI (.xlsx) baris demi baris agar memori tetap kecil"
+            )
+            locate_upload = st.checkbox(
+                "📍 Kecamatan dari koordinat (lat/lon)",
+                value=False,
+                help="Baris dengan kolom LAT/LON ditempatkan ke kecamatan berdasarkan batas peta bawaan; "
+                     "nama kecamatan di file dipakai jika titik di luar peta"
+            )
 
-                        # Try exact matches first
-                        if 'KECAMATAN' in df_potensi.columns:
-                            kec_col_pot = 'KECAMATAN'
-                        elif 'KODE KECAMATAN' in df_potensi.columns:
-                            kec_col_pot = 'KODE KECAMATAN'
-                        else:
-                            for c in df_potensi.columns:
-                                if 'KEC' in c:
-                                    kec_col_pot = c
-                                    break
-
-                        if 'KECAMATAN' in df_akuisisi.columns:
-                            kec_col_aku = 'KECAMATAN'
-                        elif 'KODE KECAMATAN' in df_akuisisi.columns:
-                            kec_col_aku = 'KODE KECAMATAN'
-                        else:
-                            for c in df_akuisisi.columns:
-                                if 'KEC' in c:
-                                    kec_col_aku = c
-                                    break
-
-                        if kec_col_pot and kec_col_aku:
-                            # Remove rows where kecamatan is empty
-                            df_potensi = df_potensi[df_potensi[kec_col_pot].notna()]
-                            df_akuisisi = df_akuisisi[df_akuisisi[kec_col_aku].notna()]
-
-                            # Check if there's a POTENSI column (numeric values) or just count rows
-                            has_potensi_col = any('POTENSI' in str(col).upper() or 'NILAI' in str(col).upper()
-                                                  for col in df_potensi.columns if col != kec_col_pot)
-
-                            if has_potensi_col:
-                                # Find the numeric potensi column
-                                potensi_value_col = None
-                                for col in df_potensi.columns:
-                                    if col != kec_col_pot and (
-                                            'POTENSI' in str(col).upper() or 'NILAI' in str(col).upper()):
-                                        potensi_value_col = col
-                                        break
-
-                                if potensi_value_col:
-                                    # Sum the potensi values per kecamatan
-                                    df_potensi[potensi_value_col] = pd.to_numeric(df_potensi[potensi_value_col],
-                                                                                  errors='coerce').fillna(0)
-                                    potensi_count = df_potensi.groupby(kec_col_pot)[
-                                        potensi_value_col].sum().reset_index()
-                                    potensi_count.columns = ['Kecamatan', 'Potensi']
-                                    st.sidebar.info(f"📊 Menggunakan kolom nilai: {potensi_value_col}")
-                                else:
-                                    # Fallback: count rows
-                                    potensi_count = df_potensi[kec_col_pot].value_counts().reset_index()
-                                    potensi_count.columns = ['Kecamatan', 'Potensi']
-                                    st.sidebar.info("📊 Menghitung jumlah baris (row count)")
+            if uploaded_files:
+                batch_files = []
+                for upload in uploaded_files:
+                    try:
+                        batch_files.extend(expand_upload(upload.name, upload.getvalue()))
+                    except zipfile.BadZipFile:
+                        st.error(f"❌ {upload.name}: ZIP tidak valid")
+                if batch_files:
+                    progress_slot = st.empty()
+                    try:
+                        with stage('ingest'):
+                            result = cached_batch(
+                                get_upload_cache(), batch_files,
+                                streaming=stream_upload,
+                                locator=get_kecamatan_locator() if locate_upload else None,
+                                progress=lambda fraction: progress_slot.progress(fraction, text="Membaca file...")
+                            )
+                    finally:
+                        progress_slot.empty()
+
+                    df = result['df']
+                    desa_count = result['desa_count']
+                    history_source = "batch:" + ", ".join(sorted(upload.name for upload in uploaded_files))
+                    if result['cached']:
+                        st.caption("⚡ Dari cache (file tidak berubah)")
+                    if result['located']:
+                        st.caption(f"📍 {result['located']:,} baris ditempatkan dari koordinat")
+                    for name, error in result['errors']:
+                        st.error(f"❌ {name}: {error}")
+                    st.success(
+                        f"✅ Merged {len(result['files'])}/{len(batch_files)} file: {len(df)} kecamatan"
+                        f" | Total Potensi: {df['Potensi'].sum():,} | Total Realisasi: {df['Realisasi'].sum():,}")
+                    with st.expander("📄 Ringkasan per file"):
+                        st.dataframe(result['files'], use_container_width=True, hide_index=True)
+
+            if uploaded_file:
+                try:
+                    upload_cache = get_upload_cache()
+                    file_bytes = uploaded_file.getvalue()
+                    progress_slot = st.empty()
+                    locator = get_kecamatan_locator() if locate_upload else None
+                    try:
+                        with stage('ingest'):
+                            result = cached_ingest(
+                                upload_cache, file_bytes, uploaded_file.name,
+                                streaming=stream_upload,
+                                progress=lambda fraction: progress_slot.progress(fraction, text="Membaca file..."),
+                                locator=locator
+                            )
+                        if result['kind'] == 'sheet':
+                            selected_sheet = st.sidebar.selectbox("Pilih sheet:", result['sheet_names'])
+                            if selected_sheet != result['sheet']:
+                                with stage('ingest'):
+                                    result = cached_ingest(upload_cache, file_bytes, uploaded_file.name,
+                                                           streaming=stream_upload, sheet=selected_sheet,
+                                                           locator=locator)
+                    except ValueError as e:
+                        st.error(f"❌ {str(e)}")
+                        result = None
+                    finally:
+                        progress_slot.empty()
+
+                    if result is not None:
+                        df = result['df']
+                        desa_count = result.get('desa_count')
+                        history_source = f"upload:{uploaded_file.name}"
+                        if result['cached']:
+                            st.caption("⚡ Dari cache (file tidak berubah)")
+                        if result.get('located'):
+                            st.caption(f"📍 {result['located']:,} baris ditempatkan dari koordinat")
+
+                        if result['kind'] == 'csv':
+                            if result['streaming']:
+                                st.success(f"✅ Aggregated {len(df)} kecamatan")
+                            else:
+                                st.success(f"✅ Loaded {len(df)} rows")
+                        elif result['kind'] == 'potensi_akuisisi':
+                            st.info(f"📋 Sheet ditemukan: {', '.join(result['sheet_names'])}")
+                            st.sidebar.write("**POTENSI columns:**", result['potensi_columns'][:5])
+                            st.sidebar.write("**AKUISISI columns:**", result['akuisisi_columns'][:5])
+
+                            if result['potensi_value_col']:
+                                st.sidebar.info(f"📊 Menggunakan kolom nilai: {result['potensi_value_col']}")
                             else:
-                                # Count rows per kecamatan
-                                potensi_count = df_potensi[kec_col_pot].value_counts().reset_index()
-                                potensi_count.columns = ['Kecamatan', 'Potensi']
                                 st.sidebar.info("📊 Menghitung jumlah baris (row count)")
 
-                            # For AKUISISI, always count rows (number of people acquired)
-                            akuisisi_count = df_akuisisi[kec_col_aku].value_counts().reset_index()
-                            akuisisi_count.columns = ['Kecamatan', 'Realisasi']
-
-                            # Convert to string and clean
-                            potensi_count['Kecamatan'] = potensi_count['Kecamatan'].astype(str).str.strip()
-                            akuisisi_count['Kecamatan'] = akuisisi_count['Kecamatan'].astype(str).str.strip()
-
-
-                            # Remove code prefixes and clean names more aggressively
-                            def clean_kecamatan_name(name):
-                                name = str(name).strip()
-                                # Remove leading numbers and spaces (e.g., "320138 ")
-                                name = pd.Series(name).str.replace(r'^\d+\s*', '', regex=True).iloc[0]
-                                # Remove "Kecamatan" prefix (case insensitive)
-                                name = pd.Series(name).str.replace(r'^Kecamatan\s+', '', case=False, regex=True).iloc[0]
-                                # Final strip
-                                return name.strip()
-
-
-                            potensi_count['Kecamatan'] = potensi_count['Kecamatan'].apply(clean_kecamatan_name)
-                            akuisisi_count['Kecamatan'] = akuisisi_count['Kecamatan'].apply(clean_kecamatan_name)
-
                             # Show preview
                             with st.sidebar.expander("📊 Preview Data"):
                                 st.write("**Potensi (Top 5):**")
-                                st.dataframe(potensi_count.head(5), use_container_width=True)
+                                st.dataframe(result['potensi_count'].head(5), use_container_width=True)
                                 st.write("**Akuisisi (Top 5):**")
-                                st.dataframe(akuisisi_count.head(5), use_container_width=True)
-
-                            # Merge
-                            df = pd.merge(potensi_count, akuisisi_count, on='Kecamatan', how='outer').fillna(0)
-                            df['Potensi'] = df['Potensi'].astype(int)
-                            df['Realisasi'] = df['Realisasi'].astype(int)
+                                st.dataframe(result['akuisisi_count'].head(5), use_container_width=True)
 
                             st.success(
                                 f"✅ Merged: {len(df)} kecamatan | Total Potensi: {df['Potensi'].sum():,} | Total Realisasi: {df['Realisasi'].sum():,}")
                         else:
-                            st.error(
-                                f"❌ Kolom kecamatan tidak ditemukan. Potensi: {kec_col_pot}, Akuisisi: {kec_col_aku}")
-                            df = None
-                    else:
-                        # Single sheet or different names
-                        selected_sheet = st.sidebar.selectbox("Pilih sheet:", sheet_names)
-                        df = pd.read_excel(uploaded_file, sheet_name=selected_sheet)
-                        st.success(f"✅ Loaded {len(df)} rows from '{selected_sheet}'")
+                            st.info(f"📋 Sheet ditemukan: {', '.join(result['sheet_names'])}")
+                            st.success(f"✅ Loaded {len(df)} rows from '{result['sheet']}'")
 
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
-                st.exception(e)
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+                    st.exception(e)
 
-    st.divider()
+        st.divider()
 
-    # GeoJSON Source
-    st.subheader("🗺️ Sumber Peta")
-    map_source = st.radio(
-        "Pilih sumber GeoJSON:",
-        ["Gunakan Peta Bawaan", "Upload GeoJSON", "Placeholder"]
-    )
+        # GeoJSON Source
+        st.subheader("🗺️ Sumber Peta")
+        map_source = st.radio(
+            "Pilih sumber GeoJSON:",
+            ["Gunakan Peta Bawaan", "Peta Provinsi (multi-kabupaten)", "Upload GeoJSON", "Placeholder"]
+        )
 
-    geojson_data = None
+        boundaries = None
+        boundaries_key = None
 
-    if map_source == "Gunakan Peta Bawaan":
-        geojson_data = load_bogor_geojson()
-        if geojson_data:
-            st.success(f"✅ {len(geojson_data.get('features', []))} kecamatan")
+        if map_source == "Gunakan Peta Bawaan":
+            boundaries = load_bogor_boundaries()
+            boundaries_key = BOGOR_GEOJSON
+            if boundaries:
+                st.success(f"✅ {len(boundaries)} kecamatan")
+            else:
+                st.warning("⚠️ bogor_regency.json tidak ditemukan")
+        elif map_source == "Peta Provinsi (multi-kabupaten)":
+            levels = load_province_levels()
+            if levels:
+                boundaries = levels[0][1]
+                boundaries_key = PROVINCE_COMPACT
+                st.success(f"✅ {len(boundaries)} kecamatan")
+            else:
+                st.warning(f"⚠️ {PROVINCE_COMPACT} tidak ditemukan (buat dengan tools/convert_boundaries.py)")
+        elif map_source == "Upload GeoJSON":
+            geojson_file = st.file_uploader("Upload file GeoJSON", type=['geojson', 'json'])
+            if geojson_file:
+                geojson_bytes = geojson_file.getvalue()
+                boundaries_key = file_digest(geojson_bytes)
+                boundaries = load_uploaded_boundaries(boundaries_key, geojson_bytes)
+                st.success(f"✅ {len(boundaries)} features")
         else:
-            st.warning("⚠️ bogor_regency.json tidak ditemukan")
-    elif map_source == "Upload GeoJSON":
-        geojson_file = st.file_uploader("Upload file GeoJSON", type=['geojson', 'json'])
-        if geojson_file:
-            geojson_data = json.load(geojson_file)
-            st.success(f"✅ {len(geojson_data.get('features', []))} features")
-    else:
-        geojson_data = placeholder_geojson
-        st.info("Menggunakan placeholder")
+            boundaries = load_placeholder_boundaries()
+            boundaries_key = 'placeholder'
+            st.info("Menggunakan placeholder")
+
+        # Batas multi-kabupaten: hanya feature yang terlihat yang dirender
+        region_index = load_region_index(boundaries_key, boundaries) if boundaries else None
+        selected_regency = None
+        if region_index is not None:
+            regency_names = region_index.regencies()
+            selected_regency = st.selectbox(
+                "Kabupaten/Kota:",
+                [None] + list(regency_names),
+                format_func=lambda gid: f"Semua ({len(regency_names)} kabupaten/kota)" if gid is None
+                else regency_names[gid]
+            )
 
-    st.divider()
+        live_map = st.checkbox(
+            "⚡ Peta live (refresh hanya kirim data)",
+            value=False,
+            help="Geometry dikirim ke browser sekali per session; refresh data hanya mengubah warna, tooltip dan popup"
+        )
 
-    # Download sample
-    sample_csv = """kecamatan,potensi,realisasi
+        st.divider()
+
+        # Download sample
+        sample_csv = """kecamatan,potensi,realisasi
 Citeureup,33537,26829
 Babakan Madang,18105,14484
 Sukamakmur,13622,10897
@@ -310,187 +585,169 @@ Caringin,20863,16690
 Cijeruk,14656,11724
 Cibinong,25000,20000"""
 
-    st.download_button(
-        "📥 Download Contoh CSV",
-        data=sample_csv,
-        file_name="contoh_data.csv",
-        mime="text/csv"
-    )
-
-# Main Content
-if df is not None and not df.empty:
-    # Clean and prepare data
-    try:
-        # Standardize column names
-        df.columns = [col.lower() for col in df.columns]
-
-        # Show detected columns for debugging
-        st.sidebar.info(f"Kolom terdeteksi: {', '.join(df.columns)}")
-
-        # Find relevant columns with better detection
-        kec_col = None
-        pot_col = None
-        real_col = None
-
-        # Detect kecamatan column
-        for c in df.columns:
-            if any(x in c for x in ['kec', 'wilayah', 'daerah', 'lokasi']):
-                kec_col = c
-                break
-
-        # Detect potensi column
-        for c in df.columns:
-            if any(x in c for x in ['potensi', 'pot', 'target', 'nilai']):
-                pot_col = c
-                break
-
-        # Detect realisasi column (optional)
-        for c in df.columns:
-            if any(x in c for x in ['realisasi', 'real', 'capaian', 'akuisisi']):
-                real_col = c
-                break
-
-        # Validate required columns
-        if not kec_col:
-            st.error(
-                "❌ Kolom KECAMATAN tidak ditemukan. Pastikan ada kolom dengan kata 'kecamatan', 'wilayah', atau 'daerah'")
-            st.stop()
-
-        if not pot_col:
-            st.error(
-                "❌ Kolom POTENSI tidak ditemukan. Pastikan ada kolom dengan kata 'potensi', 'target', atau 'nilai'")
-            st.stop()
-
-        # Prepare dataframe
-        if real_col:
-            df = df[[kec_col, pot_col, real_col]].copy()
-            df.columns = ['Kecamatan', 'Potensi', 'Realisasi']
-            df['Realisasi'] = pd.to_numeric(df['Realisasi'], errors='coerce').fillna(0).astype(int)
-        else:
-            # No realisasi column - set to 0
-            df = df[[kec_col, pot_col]].copy()
-            df.columns = ['Kecamatan', 'Potensi']
-            df['Realisasi'] = 0
-            st.warning("⚠️ Kolom REALISASI tidak ditemukan. Semua realisasi diset ke 0.")
-
-        # Clean data
-        df['Kecamatan'] = df['Kecamatan'].str.strip()
-        df['Kecamatan'] = df['Kecamatan'].str.replace('Kecamatan ', '', case=False)
-        df['Potensi'] = pd.to_numeric(df['Potensi'], errors='coerce').fillna(0).astype(int)
-
-        # Calculate metrics
-        df['Sisa'] = df['Potensi'] - df['Realisasi']
-        df['Persentase'] = df.apply(
-            lambda row: (row['Realisasi'] / row['Potensi'] * 100) if row['Potensi'] > 0 else 0,
-            axis=1
+        st.download_button(
+            "📥 Download Contoh CSV",
+            data=sample_csv,
+            file_name="contoh_data.csv",
+            mime="text/csv"
         )
-        df['Kecamatan_normalized'] = df['Kecamatan'].apply(normalize_name)
-
-        # Metrics Row
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total Potensi", f"{df['Potensi'].sum():,}")
-        with col2:
-            st.metric("Total Realisasi", f"{df['Realisasi'].sum():,}")
-        with col3:
-            st.metric("Total Sisa", f"{df['Sisa'].sum():,}")
-        with col4:
-            avg_persen = (df['Realisasi'].sum() / df['Potensi'].sum() * 100) if df['Potensi'].sum() > 0 else 0
-            st.metric("Rata-rata Capaian", f"{avg_persen:.1f}%")
-
-        st.divider()
 
-        # Layout: Map + Charts
-        col_map, col_chart = st.columns([3, 2])
+    # Main Content
+    if df is not None and not df.empty:
+        # Clean and prepare data
+        try:
+            # Show detected columns for debugging
+            st.sidebar.info(f"Kolom terdeteksi: {', '.join(str(col).lower() for col in df.columns)}")
 
-        with col_map:
-            st.subheader("🗺️ Peta Interaktif Realisasi")
-
-            if geojson_data:
-                # Create map
-                m = folium.Map(
-                    location=[-6.60, 106.85],
-                    zoom_start=10,
-                    tiles='OpenStreetMap'
+            # Deteksi kolom dan hitung metrik (core, tanpa UI)
+            try:
+                with stage('prepare'):
+                    df, desa_count, detected_columns = prepare_frame(df, desa_count)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                st.stop()
+            # Dilewati otomatis jika isinya sama dengan snapshot terakhir sumber ini
+            history_store = get_snapshot_store()
+            with stage('history'):
+                history_store.append(df, history_source, taken_at=taken_at)
+            if not detected_columns['realisasi']:
+                st.warning("⚠️ Kolom REALISASI tidak ditemukan. Semua realisasi diset ke 0.")
+
+            # Metrics Row
+            totals = summarize(df)
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total Potensi", f"{totals['potensi']:,}")
+            with col2:
+                st.metric("Total Realisasi", f"{totals['realisasi']:,}")
+            with col3:
+                st.metric("Total Sisa", f"{totals['sisa']:,}")
+            with col4:
+                st.metric("Rata-rata Capaian", f"{totals['capaian']:.1f}%")
+
+            st.divider()
+
+            if region_index is not None:
+                # Rekap kecamatan -> kabupaten/kota -> provinsi
+                st.subheader("🏙️ Rekap Kabupaten/Kota")
+                rollup_key = (boundaries.fingerprint, metrics_fingerprint(df))
+                regency_df = get_rollup_cache().get(rollup_key)
+                if regency_df is None:
+                    with stage('rollup'):
+                        regency_df = rollup(df, boundaries, frame_matcher(df, region_index.ambiguous))
+                    get_rollup_cache().put(rollup_key, regency_df)
+                if selected_regency is not None:
+                    selected_row = regency_df[regency_df['Kabupaten'] == regency_names[selected_regency]]
+                    if not selected_row.empty:
+                        row = selected_row.iloc[0]
+                        col1, col2, col3, col4 = st.columns(4)
+                        col1.metric(f"Potensi {row['Kabupaten']}", f"{row['Potensi']:,}")
+                        col2.metric("Realisasi", f"{row['Realisasi']:,}")
+                        col3.metric("Sisa", f"{row['Sisa']:,}")
+                        col4.metric("Capaian", f"{row['Persentase']:.1f}%")
+                st.dataframe(
+                    regency_df.style.format({'Potensi': '{:,}', 'Realisasi': '{:,}', 'Sisa': '{:,}',
+                                             'Persentase': '{:.1f}%'}),
+                    use_container_width=True,
+                    hide_index=True
                 )
-
-                matched = 0
-                unmatched = []
-                color_palette = get_colorful_palette()
-                color_index = 0
-
-                for feature in geojson_data.get('features', []):
-                    kecamatan_name = (
-                            feature['properties'].get('NAME_3') or
-                            feature['properties'].get('name') or
-                            feature['properties'].get('NAMOBJ') or
-                            "Unknown"
-                    )
-
-                    kec_normalized = normalize_name(kecamatan_name)
-                    kecamatan_data = df[df['Kecamatan_normalized'] == kec_normalized]
-
-                    if not kecamatan_data.empty:
-                        matched += 1
-                        row = kecamatan_data.iloc[0]
-                        potensi = row['Potensi']
-                        realisasi = row['Realisasi']
-                        sisa = row['Sisa']
-                        persen = row['Persentase']
-
-                        # Gunakan warna warni untuk peta
-                        map_color = color_palette[color_index % len(color_palette)]
-                        color_index += 1
-
-                        # Warna progress bar di popup tetap berdasarkan persentase
-                        progress_color = get_color_by_percentage(persen)
-
-                        popup_html = f"""
-                        <div style='font-family: Arial; width: 220px;'>
-                            <h4 style='margin: 0; color: #004aad;'>{kecamatan_name}</h4>
-                            <hr style='margin: 5px 0;'>
-                            <table style='width:100%; font-size:13px;'>
-                                <tr><td><b>Potensi:</b></td><td style='text-align:right;'>{potensi:,}</td></tr>
-                                <tr><td><b>Realisasi:</b></td><td style='text-align:right;'>{realisasi:,}</td></tr>
-                                <tr><td><b>Sisa:</b></td><td style='text-align:right;'>{sisa:,}</td></tr>
-                                <tr><td><b>Capaian:</b></td><td style='text-align:right;'><b>{persen:.1f}%</b></td></tr>
-                            </table>
-                            <div style='margin-top:8px; background:#eee; height:12px; border-radius:6px; overflow:hidden;'>
-                                <div style='background:{progress_color}; height:100%; width:{persen:.1f}%;'></div>
-                            </div>
-                        </div>
-                        """
-
-                        folium.GeoJson(
-                            feature,
-                            style_function=lambda x, color=map_color: {
-                                'fillColor': color,
-                                'color': 'white',
-                                'weight': 2,
-                                'fillOpacity': 0.7
-                            },
-                            tooltip=f"<b>{kecamatan_name}</b><br>Capaian: {persen:.1f}%",
-                            popup=folium.Popup(popup_html, max_width=280)
-                        ).add_to(m)
+                st.divider()
+
+            # Layout: Map + Charts
+            col_map, col_chart = st.columns([3, 2])
+
+            with col_map:
+                st.subheader("🗺️ Peta Interaktif Realisasi")
+
+                if boundaries:
+                    map_center, map_zoom = MAP_CENTER, MAP_ZOOM
+                    if region_index is not None:
+                        # Feature yang berpotongan dengan viewport (peta live) atau kabupaten terpilih;
+                        # level detail dipilih dari jumlah vertex yang terlihat saja
+                        minx, miny, maxx, maxy = region_index.regency_bounds(selected_regency)
+                        map_zoom = zoom_for_bounds((minx, miny, maxx, maxy), MAP_HEIGHT)
+                        map_center = ((miny + maxy) / 2, (minx + maxx) / 2)
+                        viewport = live_viewport(map_center, map_zoom) if live_map else None
+                        visible_bounds, visible_zoom = viewport or (None, map_zoom)
+                        tolerance, map_boundaries = region_index.visible(visible_zoom, visible_bounds, selected_regency)
+                    else:
+                        # Pilih level detail batas sesuai zoom dan jumlah vertex
+                        tolerance, map_boundaries = choose_level(load_boundary_levels(boundaries_key, boundaries),
+                                                                 MAP_ZOOM)
+                    palette = list(MAP_PALETTE)
+
+                    rendered = cached_map(map_boundaries, df, palette, live_map, map_center, map_zoom,
+                                          region_index.ambiguous if region_index is not None else frozenset())
+
+                    map_event = None
+                    if live_map:
+                        map_event = live_choropleth(
+                            map_boundaries.fingerprint,
+                            lambda: load_geometry_payload(map_boundaries.fingerprint, map_boundaries),
+                            rendered['data'],
+                            location=map_center,
+                            zoom=map_zoom,
+                            tiles=MAP_TILES,
+                            height=MAP_HEIGHT,
+                            boxes=region_index.boxes(selected_regency) if region_index is not None else None
+                        )
                     else:
-                        unmatched.append(kecamatan_name)
-                        folium.GeoJson(
-                            feature,
-                            style_function=lambda x: {
-                                'fillColor': '#e0e0e0',
-                                'color': 'white',
-                                'weight': 2,
-                                'fillOpacity': 0.5
-                            },
-                            tooltip=f"<b>{kecamatan_name}</b><br>(Tidak ada data)"
-                        ).add_to(m)
-
-                folium_static(m, width=None, height=600)
-
-                st.info(f"✅ Matched: {matched}/{len(geojson_data.get('features', []))} kecamatan")
-
-                # Legend
-                st.markdown("""
+                        components.html(rendered['html'], height=MAP_HEIGHT + 10)
+
+                    st.info(f"✅ Matched: {rendered['matched']}/{len(map_boundaries)} kecamatan")
+                    st.caption(f"Detail batas: toleransi {tolerance:g}° ({len(map_boundaries.coords):,} titik"
+                               + (f", {len(map_boundaries)}/{len(boundaries)} kecamatan terlihat)"
+                                  if region_index is not None else ")"))
+
+                    with st.expander("🔍 Laporan Pencocokan Kecamatan"):
+                        st.dataframe(rendered['report'], use_container_width=True)
+                        if rendered['unused']:
+                            unused_label = "Data di luar tampilan peta" if region_index is not None \
+                                else "Data tanpa wilayah di peta"
+                            st.warning(f"⚠️ {unused_label}: {', '.join(rendered['unused'])}")
+                        if rendered['ambiguous']:
+                            st.warning("⚠️ Nama kecamatan ada di beberapa kabupaten, tidak diwarnai (tambahkan kolom "
+                                       f"KABUPATEN atau kode kecamatan): {', '.join(rendered['ambiguous'])}")
+
+                    # Drill-down: batas desa hanya dibaca untuk kecamatan yang dipilih
+                    partition_store = get_partition_store()
+                    if partition_store is not None:
+                        st.subheader("🏘️ Drill-down Desa")
+                        if desa_count is None:
+                            st.caption("Data tidak memiliki kolom DESA/KELURAHAN")
+                        else:
+                            kecamatan_names = partition_store.names()
+                            gids = [None] + list(kecamatan_names)
+                            # Klik di peta live memilih kecamatan
+                            clicked = (map_event or {}).get('clicked')
+                            selected_gid = st.selectbox(
+                                "Kecamatan:",
+                                gids,
+                                index=gids.index(clicked) if clicked in kecamatan_names else 0,
+                                format_func=lambda gid: "— pilih atau klik di peta live —" if gid is None
+                                else kecamatan_names[gid]
+                            )
+                            if selected_gid:
+                                desa_df = desa_metrics(desa_count, {'GID_3': selected_gid,
+                                                                    'NAME_3': kecamatan_names[selected_gid]})
+                                if desa_df is None or desa_df.empty:
+                                    st.warning(f"⚠️ Tidak ada data desa untuk {kecamatan_names[selected_gid]}")
+                                else:
+                                    minx, miny, maxx, maxy = partition_store.bounds(selected_gid)
+                                    desa_zoom = zoom_for_bounds((minx, miny, maxx, maxy), MAP_HEIGHT)
+                                    desa_center = ((miny + maxy) / 2, (minx + maxx) / 2)
+                                    _, desa_boundaries = choose_level(partition_store.load(selected_gid), desa_zoom)
+                                    rendered_desa = cached_map(desa_boundaries, desa_df, palette, False,
+                                                               desa_center, desa_zoom)
+                                    components.html(rendered_desa['html'], height=MAP_HEIGHT + 10)
+                                    st.info(f"✅ Matched: {rendered_desa['matched']}/{len(desa_boundaries)} desa"
+                                            f" · Potensi {desa_df['Potensi'].sum():,}"
+                                            f" · Realisasi {desa_df['Realisasi'].sum():,}")
+                                    if rendered_desa['unused']:
+                                        st.warning(f"⚠️ Desa tanpa batas di peta: {', '.join(rendered_desa['unused'])}")
+
+                    # Legend
+                    st.markdown("""
                 **Legend Peta:**
                 - 🌈 Setiap kecamatan dengan warna berbeda
                 - ⚪ Abu-abu: Tidak ada data
@@ -501,128 +758,99 @@ if df is not None and not df.empty:
                 - 🔴 Merah: <50% (Kurang)
                 """)
 
-        with col_chart:
-            st.subheader("📊 Proporsi Potensi")
+            with col_chart, stage('charts'):
+                st.subheader("📊 Proporsi Potensi")
 
-            # Pie Chart - hanya untuk kecamatan dengan data
-            df_pie = df[df['Potensi'] > 0].sort_values('Potensi', ascending=False)
-
-            if len(df_pie) > 0:
-                fig_pie = px.pie(
-                    df_pie,
-                    values='Potensi',
-                    names='Kecamatan',
-                    color_discrete_sequence=px.colors.qualitative.Set3,
-                    hole=0.3  # Donut chart
-                )
-                fig_pie.update_traces(
-                    textposition='inside',
-                    textinfo='label+percent',
-                    textfont_size=10,
-                    hovertemplate='<b>%{label}</b><br>Potensi: %{value:,}<br>Persentase: %{percent}<extra></extra>'
-                )
-                fig_pie.update_layout(
-                    height=400,
-                    showlegend=False,
-                    margin=dict(l=10, r=10, t=10, b=10)
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
+                fig_pie = potensi_pie(df)
+                if fig_pie is not None:
+                    st.plotly_chart(fig_pie, use_container_width=True)
+                else:
+                    st.warning("Tidak ada data potensi untuk ditampilkan")
+
+                st.subheader("📈 Top 10 Kecamatan")
+                st.plotly_chart(top10_bar(df), use_container_width=True)
+
+            # Trend Section
+            st.divider()
+            st.subheader("📈 Tren Akuisisi")
+            if history_store.snapshot_count(history_source) >= 2:
+                # Plotly baru di-import saat grafik dirender, setelah sidebar tampil
+                import plotly.express as px
+
+                period_label = st.radio("Periode:", list(PERIODS), horizontal=True)
+                trend = history_store.trend(history_source, PERIODS[period_label])
+
+                col_level, col_delta = st.columns(2)
+                with col_level:
+                    fig_trend = px.line(
+                        trend, x='Periode', y=['Potensi', 'Realisasi'], markers=True,
+                        color_discrete_sequence=['#0074e0', '#28a745']
+                    )
+                    fig_trend.update_layout(height=350, yaxis_title="Jumlah", legend_title="",
+                                            margin=dict(l=10, r=10, t=30, b=10))
+                    st.plotly_chart(fig_trend, use_container_width=True)
+                with col_delta:
+                    fig_delta = px.bar(trend, x='Periode', y='Delta Realisasi', color_discrete_sequence=['#28a745'])
+                    fig_delta.update_layout(height=350, yaxis_title="Realisasi baru per periode",
+                                            margin=dict(l=10, r=10, t=30, b=10))
+                    st.plotly_chart(fig_delta, use_container_width=True)
             else:
-                st.warning("Tidak ada data potensi untuk ditampilkan")
-
-            st.subheader("📈 Top 10 Kecamatan")
-
-            # Bar Chart - Horizontal
-            top10 = df.nlargest(10, 'Potensi').sort_values('Potensi', ascending=True)
-
-            fig_bar = go.Figure()
-
-            # Add Potensi bars
-            fig_bar.add_trace(go.Bar(
-                y=top10['Kecamatan'],
-                x=top10['Potensi'],
-                name='Potensi',
-                orientation='h',
-                marker_color='#0074e0',
-                text=top10['Potensi'],
-                textposition='outside',
-                texttemplate='%{text:,}',
-                hovertemplate='<b>%{y}</b><br>Potensi: %{x:,}<extra></extra>'
-            ))
-
-            # Add Realisasi bars
-            fig_bar.add_trace(go.Bar(
-                y=top10['Kecamatan'],
-                x=top10['Realisasi'],
-                name='Realisasi',
-                orientation='h',
-                marker_color='#28a745',
-                text=top10['Realisasi'],
-                textposition='inside',
-                texttemplate='%{text:,}',
-                hovertemplate='<b>%{y}</b><br>Realisasi: %{x:,}<extra></extra>'
-            ))
-
-            fig_bar.update_layout(
-                barmode='overlay',
-                height=450,
-                xaxis_title="Jumlah",
-                yaxis_title="",
-                font=dict(size=11),
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                margin=dict(l=10, r=10, t=30, b=10)
-            )
-
-            st.plotly_chart(fig_bar, use_container_width=True)
-
-        # Table Section
-        st.divider()
-        st.subheader("📋 Tabel Monitoring Lengkap")
-
-
-        # Add progress bar HTML
-        def create_progress_html(persen):
-            color = get_color_by_percentage(persen)
-            return f"""
-            <div style='background:#eee; border-radius:8px; height:20px; overflow:hidden;'>
-                <div style='background:{color}; height:100%; width:{persen:.1f}%; 
-                     color:white; text-align:center; font-size:11px; font-weight:bold;
-                     line-height:20px;'>{persen:.1f}%</div>
-            </div>
-            """
-
-
-        df_display = df[['Kecamatan', 'Potensi', 'Realisasi', 'Sisa', 'Persentase']].copy()
-        df_display = df_display.sort_values('Persentase', ascending=False).reset_index(drop=True)
-        df_display.index = df_display.index + 1
-
-        # Format numbers
-        df_display['Potensi'] = df_display['Potensi'].apply(lambda x: f"{x:,}")
-        df_display['Realisasi'] = df_display['Realisasi'].apply(lambda x: f"{x:,}")
-        df_display['Sisa'] = df_display['Sisa'].apply(lambda x: f"{x:,}")
-        df_display['Progress'] = df_display['Persentase'].apply(create_progress_html)
-
-        st.markdown(
-            df_display[['Kecamatan', 'Potensi', 'Realisasi', 'Sisa', 'Progress']].to_html(escape=False, index=True),
-            unsafe_allow_html=True)
+                st.caption("Grafik tren muncul setelah ada minimal 2 snapshot berbeda dari sumber data ini.")
+
+            # Table Section
+            st.divider()
+            st.subheader("📋 Tabel Monitoring Lengkap")
+
+            # Filter & urutan dihitung di server; hanya baris halaman aktif yang dikirim ke browser
+            with stage('table'):
+                col_query, col_band, col_sort, col_size = st.columns([3, 3, 2, 1])
+                table_query = col_query.text_input("Cari kecamatan:", key='table_query')
+                table_bands = col_band.multiselect("Band capaian:", list(CAPAIAN_BANDS), key='table_bands')
+                table_sort = col_sort.selectbox("Urutkan:", list(TABLE_SORTS), key='table_sort')
+                page_size = col_size.selectbox("Baris:", TABLE_PAGE_SIZES, key='table_page_size')
+
+                table_key = ('table', frame_fingerprint(df[MAP_COLUMNS]), table_query.strip().lower(),
+                             tuple(sorted(table_bands)), table_sort)
+                positions = get_table_cache().get(table_key)
+                if positions is None:
+                    sort_by, ascending = TABLE_SORTS[table_sort]
+                    positions = table_rows(df, table_query, table_bands, sort_by, ascending)
+                    get_table_cache().put(table_key, positions)
+
+                page_count = max(1, -(-len(positions) // page_size))
+                page = 1
+                if page_count > 1:
+                    # Key ikut filter/urutan: halaman kembali ke 1 saat filter berubah
+                    page = st.selectbox("Halaman:", range(1, page_count + 1),
+                                        key='table_page_' + fingerprint(table_key[2:], page_size)[:12],
+                                        format_func=lambda number: f"{number} / {page_count}")
+                page = min(page, page_count)
+
+                st.dataframe(
+                    table_page(df, positions, page - 1, page_size),
+                    column_config={
+                        'Potensi': st.column_config.NumberColumn(format='localized'),
+                        'Realisasi': st.column_config.NumberColumn(format='localized'),
+                        'Sisa': st.column_config.NumberColumn(format='localized'),
+                        'Persentase': st.column_config.ProgressColumn('Progress', format='%.1f%%',
+                                                                      min_value=0, max_value=100),
+                    },
+                    use_container_width=True
+                )
+                first_row = (page - 1) * page_size
+                st.caption(f"Baris {min(first_row + 1, len(positions)):,}-{min(first_row + page_size, len(positions)):,}"
+                           f" dari {len(positions):,} kecamatan (total {len(df):,})")
 
-    except Exception as e:
-        st.error(f"❌ Error processing data: {str(e)}")
-        st.exception(e)
+        except Exception as e:
+            st.error(f"❌ Error processing data: {str(e)}")
+            st.exception(e)
 
-else:
-    # Initial state
-    st.info("👆 Konfigurasi data source di sidebar untuk memulai")
+    else:
+        # Initial state
+        st.info("👆 Konfigurasi data source di sidebar untuk memulai")
 
-    st.markdown("### 📖 Fitur Dashboard")
-    st.markdown("""
+        st.markdown("### 📖 Fitur Dashboard")
+        st.markdown("""
     **Visualisasi:**
     - 🗺️ Peta interaktif dengan warna berdasarkan persentase realisasi
     - 📊 Pie chart proporsi potensi
@@ -641,10 +869,42 @@ else:
     - ✅ Popup detail di peta dengan progress bar
     """)
 
-# Footer
-st.divider()
-st.markdown("""
+    # Footer
+    st.divider()
+    st.markdown("""
     <div style='text-align: center; color: #666;'>
         <p>© 2025 BPJAMSOSTEK - Dashboard Monitoring Akuisisi Potensi Kabupaten Bogor</p>
     </div>
 """, unsafe_allow_html=True)
+finally:
+    # Juga saat st.stop(), rerun yang disela, atau exception: tracemalloc dan profiler tidak boleh bocor,
+    # dan rerun tetap dicatat (p50/p95 dan log JSON)
+    recorder.stop()
+    script_context = get_script_run_ctx()
+    run_record = recorder.record(
+        session=script_context.session_id if script_context else None,
+        data_source=data_source,
+        map_source=map_source,
+        rows=0 if df is None else len(df)
+    )
+    get_recent_runs().add(run_record)
+    if DIAGNOSTICS_LOG:
+        try:
+            append_log(DIAGNOSTICS_LOG, run_record)
+        except OSError:
+            pass
+
+
+# Diagnostik: tahap rerun ini dan p50/p95 semua session di proses ini
+with st.sidebar.expander("🩺 Diagnostik"):
+    st.caption(f"Rerun ini: {recorder.wall_ms:,.0f} ms (wall & CPU dalam ms, memori dalam KB)")
+    st.dataframe(recorder.table(), use_container_width=True, hide_index=True)
+    recent_runs = get_recent_runs().records()
+    st.caption(f"p50/p95 wall time, {len(recent_runs)} rerun terakhir semua session:")
+    st.dataframe(stage_percentiles(recent_runs), use_container_width=True, hide_index=True)
+    st.checkbox("Ukur alokasi memori (tracemalloc)", key='diagnostics_memory',
+                help="Berlaku mulai rerun berikutnya; menambah overhead")
+    st.checkbox("Profil cProfile", key='diagnostics_profile',
+                help=f"Dump .prof per rerun ke {PROFILE_DIR}/ (buka dengan snakeviz atau pstats)")
+    if recorder.profile_path:
+        st.caption(f"Profil rerun ini: {recorder.profile_path}")
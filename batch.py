@@ -0,0 +1,160 @@
+import io
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from ingest import (MISSING_KECAMATAN_MESSAGE, MISSING_POTENSI_MESSAGE, detect_metric_columns, file_digest,
+                    find_desa_column, ingest_upload)
+from pipeline import aggregate_desa, clean_kecamatan_names
+
+# Ekstensi yang diproses dari upload, direktori atau isi zip
+BATCH_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+PARTIAL_COLUMNS = ['Kecamatan', 'Potensi', 'Realisasi']
+DESA_COLUMNS = ['Kecamatan', 'Desa', 'Potensi', 'Realisasi']
+
+
+def expand_upload(name, data):
+    """List (nama, bytes) dari satu file; isi .zip dibongkar (file lain di zip diabaikan)"""
+    if not name.lower().endswith('.zip'):
+        return [(name, data)]
+    files = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and info.filename.lower().endswith(BATCH_EXTENSIONS):
+                files.append((info.filename, archive.read(info)))
+    return files
+
+
+def read_directory(path):
+    """List (nama relatif, bytes) semua workbook/CSV/zip di direktori (rekursif, urut nama)"""
+    files = []
+    for root, _, names in os.walk(path):
+        for filename in sorted(names):
+            if filename.lower().endswith(BATCH_EXTENSIONS + ('.zip',)):
+                full_path = os.path.join(root, filename)
+                with open(full_path, 'rb') as f:
+                    files.extend(expand_upload(os.path.relpath(full_path, path), f.read()))
+    return sorted(files, key=lambda item: item[0])
+
+
+def _to_partial(result):
+    """Hasil ingest_upload -> (agregat per kecamatan, agregat per desa atau None)"""
+    if result['kind'] == 'potensi_akuisisi':
+        return result['df'][PARTIAL_COLUMNS], result.get('desa_count')
+
+    # CSV / sheet tunggal: deteksi kolom seperti di app
+    df = result['df'].rename(columns=lambda col: str(col).lower())
+    kec_col, pot_col, real_col = detect_metric_columns(df.columns)
+    if not kec_col:
+        raise ValueError(MISSING_KECAMATAN_MESSAGE)
+    if not pot_col:
+        raise ValueError(MISSING_POTENSI_MESSAGE)
+    desa_col = find_desa_column(df.columns)
+    desa = aggregate_desa(df, kec_col, desa_col, pot_col, real_col) if desa_col and desa_col != kec_col else None
+    partial = pd.DataFrame({
+        'Kecamatan': clean_kecamatan_names(df[kec_col]),
+        'Potensi': pd.to_numeric(df[pot_col], errors='coerce').fillna(0),
+        'Realisasi': pd.to_numeric(df[real_col], errors='coerce').fillna(0) if real_col else 0,
+    })[df[kec_col].notna().to_numpy()]
+    return partial, desa
+
+
+def partial_aggregate(name, data, streaming=False, locator=None):
+    """Parse satu file dan ringkas menjadi agregat per kecamatan (dijalankan di worker proses).
+
+    Yang dikirim balik ke proses utama hanya frame kecil per kecamatan
+    (dan per desa jika ada), bukan baris mentah.
+    """
+    start = time.perf_counter()
+    result = ingest_upload(io.BytesIO(data), name, streaming=streaming, locator=locator)
+    partial, desa = _to_partial(result)
+    partial = partial.groupby('Kecamatan', as_index=False, sort=False)[['Potensi', 'Realisasi']].sum()
+    return {
+        'name': name,
+        'kind': result['kind'],
+        'partial': partial,
+        'desa': desa,
+        'located': result.get('located', 0),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def merge_partials(partials, columns=PARTIAL_COLUMNS):
+    """Gabungkan agregat parsial (urutan bebas, asosiatif) dengan menjumlahkan per key"""
+    keys = columns[:-2]
+    frames = [frame for frame in partials if frame is not None and len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    merged = pd.concat(frames, ignore_index=True).groupby(keys, as_index=False, sort=False)[columns[-2:]].sum()
+    merged['Potensi'] = merged['Potensi'].astype(int)
+    merged['Realisasi'] = merged['Realisasi'].astype(int)
+    return merged.sort_values('Potensi', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def ingest_batch(files, streaming=False, locator=None, max_workers=None, progress=None):
+    """Ingest banyak file (list (nama, bytes)) secara paralel di process pool.
+
+    File yang gagal dicatat di ``errors`` tanpa menghentikan file lain.
+    Return dict kind='batch' dengan df (Kecamatan/Potensi/Realisasi),
+    desa_count, ringkasan per file (``files``), errors dan located.
+    """
+    workers = min(len(files), max_workers or os.cpu_count() or 1)
+    outcomes = []
+    errors = []
+    if workers <= 1:
+        for done, (name, data) in enumerate(files, 1):
+            try:
+                outcomes.append(partial_aggregate(name, data, streaming, locator))
+            except Exception as e:
+                errors.append((name, str(e)))
+            if progress:
+                progress(done / len(files))
+    else:
+        # spawn: fork dari server Streamlit (banyak thread) bisa mewarisi lock yang sedang dipegang
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {
+                executor.submit(partial_aggregate, name, data, streaming, locator): name for name, data in files
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    errors.append((futures[future], str(e)))
+                if progress:
+                    progress(done / len(files))
+
+    outcomes.sort(key=lambda outcome: outcome['name'])
+    with_desa = [outcome['desa'] for outcome in outcomes if outcome['desa'] is not None]
+    summary = pd.DataFrame([{
+        'File': outcome['name'],
+        'Jenis': outcome['kind'],
+        'Kecamatan': len(outcome['partial']),
+        'Potensi': int(outcome['partial']['Potensi'].sum()),
+        'Realisasi': int(outcome['partial']['Realisasi'].sum()),
+        'Detik': round(outcome['seconds'], 2),
+    } for outcome in outcomes], columns=['File', 'Jenis', 'Kecamatan', 'Potensi', 'Realisasi', 'Detik'])
+    return {
+        'kind': 'batch',
+        'streaming': streaming,
+        'df': merge_partials([outcome['partial'] for outcome in outcomes]),
+        'desa_count': merge_partials(with_desa, DESA_COLUMNS) if with_desa else None,
+        'files': summary,
+        'errors': sorted(errors),
+        'located': sum(outcome['located'] for outcome in outcomes),
+    }
+
+
+def cached_batch(cache, files, streaming=False, locator=None, progress=None):
+    """ingest_batch dengan cache berdasarkan hash isi semua file (urutan file tidak berpengaruh)"""
+    key = ('batch', tuple(sorted((name, file_digest(data)) for name, data in files)), bool(streaming),
+           locator is not None)
+    result = cache.get(key)
+    cached = result is not None
+    if not cached:
+        result = ingest_batch(files, streaming=streaming, locator=locator, progress=progress)
+        cache.put(key, result)
+    return dict(result, df=result['df'].copy(), cached=cached)
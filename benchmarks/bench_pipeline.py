@@ -0,0 +1,94 @@
+"""Perbandingan waktu pipeline lama (apply per baris) vs pipeline vektor.
+
+Jalankan dari root repo:
+
+    python benchmarks/bench_pipeline.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import build_display_table, clean_kecamatan_names, compute_metrics  # noqa: E402
+
+
+def synthetic_frame(rows, seed=0):
+    """DataFrame Kecamatan/Potensi/Realisasi acak dengan prefix kode seperti di sheet POTENSI"""
+    rng = np.random.default_rng(seed)
+    names = np.array(['Citeureup', 'Babakan Madang', 'Cibinong', 'Gunung Putri', 'Leuwiliang'])
+    codes = rng.integers(320101, 320140, rows).astype(str)
+    kecamatan = pd.Series(codes, dtype=object) + ' Kecamatan ' + names[rng.integers(0, len(names), rows)]
+    potensi = rng.integers(0, 50_000, rows)
+    realisasi = (potensi * rng.random(rows)).astype(int)
+    return pd.DataFrame({'Kecamatan': kecamatan, 'Potensi': potensi, 'Realisasi': realisasi})
+
+
+def legacy_pipeline(df):
+    """Salinan jalur lama di app.py sebelum divektorisasi"""
+    def clean_kecamatan_name(name):
+        name = str(name).strip()
+        name = pd.Series(name).str.replace(r'^\d+\s*', '', regex=True).iloc[0]
+        name = pd.Series(name).str.replace(r'^Kecamatan\s+', '', case=False, regex=True).iloc[0]
+        return name.strip()
+
+    def create_progress_html(persen):
+        color = '#28a745' if persen >= 80 else '#ffc107' if persen >= 50 else '#dc3545' if persen > 0 else '#e0e0e0'
+        return f"<div style='background:{color}; width:{persen:.1f}%;'>{persen:.1f}%</div>"
+
+    df = df.copy()
+    df['Kecamatan'] = df['Kecamatan'].apply(clean_kecamatan_name)
+    df['Sisa'] = df['Potensi'] - df['Realisasi']
+    df['Persentase'] = df.apply(
+        lambda row: (row['Realisasi'] / row['Potensi'] * 100) if row['Potensi'] > 0 else 0,
+        axis=1
+    )
+    df['Kecamatan_normalized'] = df['Kecamatan'].apply(
+        lambda name: name.lower().strip().replace(" ", "").replace("-", ""))
+
+    df_display = df.sort_values('Persentase', ascending=False).reset_index(drop=True)
+    df_display['Potensi'] = df_display['Potensi'].apply(lambda x: f"{x:,}")
+    df_display['Realisasi'] = df_display['Realisasi'].apply(lambda x: f"{x:,}")
+    df_display['Sisa'] = df_display['Sisa'].apply(lambda x: f"{x:,}")
+    df_display['Progress'] = df_display['Persentase'].apply(create_progress_html)
+    return df_display
+
+
+def vectorized_pipeline(df):
+    df = df.copy()
+    df['Kecamatan'] = clean_kecamatan_names(df['Kecamatan'])
+    df = compute_metrics(df)
+    return build_display_table(df)
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    legacy, legacy_time = timed(legacy_pipeline, df)
+    vector, vector_time = timed(vectorized_pipeline, df)
+
+    # Hasil harus sama dengan jalur lama
+    assert legacy['Potensi'].tolist() == vector['Potensi'].tolist()
+    assert legacy['Sisa'].tolist() == vector['Sisa'].tolist()
+    assert np.allclose(legacy['Persentase'], vector['Persentase'])
+
+    print(f"rows={args.rows:,}")
+    print(f"legacy     {legacy_time:8.3f} s")
+    print(f"vectorized {vector_time:8.3f} s  ({legacy_time / vector_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
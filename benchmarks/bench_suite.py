@@ -0,0 +1,209 @@
+"""Benchmark per tahap pipeline (ingest, cleaning, merge, matching, peta, grafik) dengan data sintetis.
+
+Jalankan dari root repo:
+
+    python benchmarks/bench_suite.py --rows 1000 100000 --polygons 40 1000 --output bench.json
+    python benchmarks/bench_suite.py --compare bench.json            # bandingkan dengan run sebelumnya
+
+Setiap tahap diukur terpisah: waktu (min dan median dari --repeat kali) dan
+puncak memori Python (tracemalloc, run terpisah). Hasil ditulis sebagai
+JSON; dengan --compare, tahap yang lebih lambat dari --threshold kali
+baseline dilaporkan dan exit code menjadi 1.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from charts import potensi_pie, top10_bar  # noqa: E402
+from choropleth import MAP_PALETTE, render_choropleth  # noqa: E402
+from core import prepare_frame  # noqa: E402
+from generators import kecamatan_names, name_variants, synthetic_boundaries, synthetic_csv, synthetic_workbook  # noqa: E402
+from ingest import ingest_upload, merge_counts  # noqa: E402
+from livemap import build_live_update  # noqa: E402
+from matching import KecamatanMatcher  # noqa: E402
+from pipeline import build_display_table, compute_metrics, get_color_by_percentage  # noqa: E402
+from topology import build_levels, choose_level  # noqa: E402
+
+RESULT_VERSION = 1
+
+
+def measure(func, repeat):
+    """(waktu min, waktu median, puncak memori byte); memori diukur di run terpisah"""
+    # Pemanasan: import lazy (plotly/folium) tidak ikut terukur
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), statistics.median(times), peak
+
+
+def ingest_file(path, streaming=False):
+    with open(path, 'rb') as f:
+        return ingest_upload(io.BytesIO(f.read()), os.path.basename(path), streaming=streaming)
+
+
+def row_stages(rows, data_dir, max_xlsx_rows):
+    """Tahap yang skalanya mengikuti jumlah baris data"""
+    csv_path = os.path.join(data_dir, f"data_{rows}.csv")
+    if not os.path.exists(csv_path):
+        synthetic_csv(csv_path, rows)
+    raw = pd.read_csv(csv_path)
+
+    rng = np.random.default_rng(rows)
+    names = kecamatan_names(40)
+    potensi_rows = pd.DataFrame({'KECAMATAN': name_variants(names, rows, rng), 'NILAI': rng.integers(1, 50, rows)})
+    akuisisi_rows = pd.DataFrame({'KECAMATAN': name_variants(names, rows // 2, rng)})
+
+    def merge():
+        potensi_count = potensi_rows.groupby('KECAMATAN')['NILAI'].sum().reset_index()
+        potensi_count.columns = ['Kecamatan', 'Potensi']
+        akuisisi_count = akuisisi_rows['KECAMATAN'].value_counts().reset_index()
+        akuisisi_count.columns = ['Kecamatan', 'Realisasi']
+        return merge_counts(potensi_count, akuisisi_count)
+
+    stages = {
+        'ingest_csv': lambda: ingest_file(csv_path),
+        'ingest_csv_stream': lambda: ingest_file(csv_path, streaming=True),
+        'clean': lambda: prepare_frame(raw),
+        'merge': merge,
+    }
+    if rows <= max_xlsx_rows:
+        xlsx_path = os.path.join(data_dir, f"data_{rows}.xlsx")
+        if not os.path.exists(xlsx_path):
+            synthetic_workbook(xlsx_path, rows)
+        stages['ingest_xlsx'] = lambda: ingest_file(xlsx_path)
+        stages['ingest_xlsx_stream'] = lambda: ingest_file(xlsx_path, streaming=True)
+    return stages
+
+
+def polygon_stages(polygons):
+    """Tahap yang skalanya mengikuti jumlah polygon batas wilayah"""
+    boundaries = synthetic_boundaries(polygons)
+    rng = np.random.default_rng(polygons)
+    names = [properties['NAME_3'] for properties in boundaries.properties]
+    potensi = rng.integers(100, 50_000, polygons)
+    df = compute_metrics(pd.DataFrame({
+        'Kecamatan': name_variants(names, polygons, rng, noise=0.1).str.replace(r'^\d+\s*', '', regex=True),
+        'Potensi': potensi,
+        'Realisasi': (potensi * rng.random(polygons)).astype(int),
+    }))
+    levels = build_levels(boundaries)
+    _, level = choose_level(levels, 10)
+
+    def charts():
+        for figure in (potensi_pie(df), top10_bar(df)):
+            figure.to_json()
+        return build_display_table(df)
+
+    return {
+        'matching': lambda: KecamatanMatcher(df['Kecamatan']).match_properties(boundaries.properties),
+        'simplify': lambda: build_levels(boundaries),
+        'map_html': lambda: render_choropleth(level, df, KecamatanMatcher(df['Kecamatan']), list(MAP_PALETTE),
+                                              get_color_by_percentage, location=[-6.6, 106.85], zoom=10),
+        'map_live': lambda: build_live_update(level, df, KecamatanMatcher(df['Kecamatan']), list(MAP_PALETTE),
+                                              get_color_by_percentage),
+        'charts': charts,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Cetak rasio waktu terhadap baseline; return jumlah regresi (rasio > threshold)"""
+    previous = {(r['stage'], r['size_kind'], r['size']): r for r in baseline['results']}
+    regressions = 0
+    print(f"\n{'stage':20s} {'size':>10s} {'baseline':>10s} {'now':>10s} {'ratio':>7s}")
+    for result in results:
+        before = previous.get((result['stage'], result['size_kind'], result['size']))
+        if before is None:
+            continue
+        ratio = result['min_s'] / before['min_s'] if before['min_s'] else float('inf')
+        flag = '  REGRESI' if ratio > threshold else ''
+        regressions += bool(flag)
+        print(f"{result['stage']:20s} {result['size']:>10,} {before['min_s']:>10.4f} {result['min_s']:>10.4f} "
+              f"{ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='*', default=[1_000, 100_000],
+                        help="Ukuran data (baris), mis. 1000 100000 5000000")
+    parser.add_argument('--polygons', type=int, nargs='*', default=[40, 1_000],
+                        help="Jumlah polygon batas, mis. 40 1000 5000")
+    parser.add_argument('--stages', nargs='*', help="Hanya tahap ini (default: semua)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-xlsx-rows', type=int, default=200_000,
+                        help="Workbook Excel hanya dibuat sampai ukuran ini (openpyxl lambat)")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'visualisasi-bench'),
+                        help="Direktori cache data sintetis")
+    parser.add_argument('--output', help="Tulis hasil JSON ke file ini")
+    parser.add_argument('--compare', help="JSON hasil run sebelumnya sebagai baseline")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Rasio waktu yang dianggap regresi")
+    args = parser.parse_args()
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    plans = [('rows', size, lambda size=size: row_stages(size, args.data_dir, args.max_xlsx_rows))
+             for size in args.rows]
+    plans += [('polygons', size, lambda size=size: polygon_stages(size)) for size in args.polygons]
+
+    results = []
+    print(f"{'stage':20s} {'size':>10s} {'min (s)':>10s} {'median (s)':>11s} {'peak (MB)':>10s}")
+    for size_kind, size, build in plans:
+        for stage, func in build().items():
+            if args.stages and stage not in args.stages:
+                continue
+            best, median, peak = measure(func, args.repeat)
+            results.append({'stage': stage, 'size_kind': size_kind, 'size': size, 'repeat': args.repeat,
+                            'min_s': round(best, 6), 'median_s': round(median, 6), 'peak_bytes': int(peak)})
+            print(f"{stage:20s} {size:>10,} {best:>10.4f} {median:>11.4f} {peak / 1024 ** 2:>10.1f}", flush=True)
+
+    report = {'version': RESULT_VERSION, 'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Generator data sintetis untuk benchmark: workbook POTENSI/AKUISISI, CSV dan batas wilayah.
+
+Semua generator deterministik (seed), jadi hasil benchmark antar run bisa
+dibandingkan. Nama kecamatan di data sengaja diberi variasi (prefix kode,
+kata "Kecamatan", huruf besar/kecil, salah ketik) seperti sheet asli.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geostore import BoundarySet  # noqa: E402
+from tools.mock_apps_script import KECAMATAN  # noqa: E402
+
+
+def kecamatan_names(count):
+    """count nama kecamatan unik: nama Bogor asli, lalu nama sintetis"""
+    names = list(KECAMATAN[:count])
+    syllables = ['ci', 'su', 'ka', 'ra', 'ja', 'ba', 'ng', 'lu', 'wi', 'ta', 'ma', 'pa', 'gu', 'de', 'no']
+    rng = np.random.default_rng(count)
+    while len(names) < count:
+        name = ''.join(rng.choice(syllables, rng.integers(3, 5))).title()
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def name_variants(names, rows, rng, noise=0.2):
+    """rows nama kecamatan acak; sebagian (noise) diberi prefix kode/"Kecamatan"/huruf kapital/typo"""
+    base = np.array(names, dtype=object)[rng.integers(0, len(names), rows)]
+    kind = rng.integers(0, 4, rows)
+    noisy = rng.random(rows) < noise
+    result = pd.Series(base, dtype=object)
+    codes = pd.Series(rng.integers(320101, 320199, rows).astype(str), dtype=object)
+    result = result.mask(noisy & (kind == 0), codes + ' ' + result)
+    result = result.mask(noisy & (kind == 1), 'Kecamatan ' + result)
+    result = result.mask(noisy & (kind == 2), result.str.upper())
+    # Typo: satu huruf terakhir diganti
+    result = result.mask(noisy & (kind == 3), result.str[:-1] + 'x')
+    return result
+
+
+def synthetic_csv(path, rows, kecamatan=40, desa=True, seed=0):
+    """CSV kecamatan/desa/potensi/realisasi (satu baris per transaksi)"""
+    rng = np.random.default_rng(seed)
+    names = kecamatan_names(kecamatan)
+    potensi = rng.integers(1, 500, rows)
+    df = pd.DataFrame({'kecamatan': name_variants(names, rows, rng)})
+    if desa:
+        df['desa'] = 'Desa ' + pd.Series(rng.integers(1, 15, rows).astype(str), dtype=object)
+    df['potensi'] = potensi
+    df['realisasi'] = (potensi * rng.random(rows)).astype(int)
+    df.to_csv(path, index=False)
+    return path
+
+
+def synthetic_workbook(path, rows, kecamatan=40, desa=True, seed=0):
+    """Workbook POTENSI (rows baris bernilai) dan AKUISISI (rows/2 baris) seperti file kantor cabang"""
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(seed)
+    names = kecamatan_names(kecamatan)
+    workbook = Workbook(write_only=True)
+    sheets = [
+        ('POTENSI', ['NO', 'KECAMATAN'] + (['DESA'] if desa else []) + ['NILAI POTENSI'], rows),
+        ('AKUISISI', ['NIK', 'KECAMATAN'] + (['DESA'] if desa else []), rows // 2),
+    ]
+    for title, header, count in sheets:
+        sheet = workbook.create_sheet(title)
+        sheet.append(header)
+        kecamatan_column = name_variants(names, count, rng).tolist()
+        desa_column = ('Desa ' + pd.Series(rng.integers(1, 15, count).astype(str), dtype=object)).tolist()
+        values = rng.integers(1, 50, count).tolist()
+        for i in range(count):
+            row = [i + 1, kecamatan_column[i]]
+            if desa:
+                row.append(desa_column[i])
+            if title == 'POTENSI':
+                row.append(values[i])
+            sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def synthetic_boundaries(polygons, seed=0, vertices_per_edge=8, regencies=1):
+    """BoundarySet berisi grid polygon bertetangga (batas bersama) dengan properties gaya GADM.
+
+    Titik di tiap sisi diberi jitter yang sama untuk kedua tetangga, sehingga
+    topologi (arc bersama) realistis untuk benchmark penyederhanaan.
+    """
+    rng = np.random.default_rng(seed)
+    columns = int(np.ceil(np.sqrt(polygons)))
+    rows = int(np.ceil(polygons / columns))
+    size = 0.9 / columns
+    # Jitter per garis grid (horizontal/vertikal), dipakai bersama oleh dua sel
+    h_jitter = rng.normal(0, size * 0.04, (rows + 1, columns, vertices_per_edge + 1))
+    v_jitter = rng.normal(0, size * 0.04, (rows, columns + 1, vertices_per_edge + 1))
+    h_jitter[..., [0, -1]] = 0
+    v_jitter[..., [0, -1]] = 0
+
+    # Koordinat garis grid dihitung sekali, supaya titik sisi bersama identik (bit-per-bit) di kedua sel
+    xs = (106.4 + np.arange(columns + 1) * size).tolist()
+    ys = (-6.3 - np.arange(rows + 1) * size).tolist()
+
+    names = kecamatan_names(polygons)
+    features = []
+    for index in range(polygons):
+        r, c = divmod(index, columns)
+        x0, x1, y0, y1 = xs[c], xs[c + 1], ys[r + 1], ys[r]
+        # linspace memakai titik ujung persis, jadi sudut sel juga identik
+        x_line = np.linspace(x0, x1, vertices_per_edge + 1).tolist()
+        y_line = np.linspace(y0, y1, vertices_per_edge + 1).tolist()
+        bottom = [(x, y0 + j) for x, j in zip(x_line, h_jitter[r + 1, c])]
+        right = [(x1 + j, y) for y, j in zip(y_line, v_jitter[r, c + 1])]
+        top = [(x, y1 + j) for x, j in zip(x_line, h_jitter[r, c])][::-1]
+        left = [(x0 + j, y) for y, j in zip(y_line, v_jitter[r, c])][::-1]
+        ring = bottom + right[1:] + top[1:] + left[1:]
+        regency = index * regencies // polygons
+        features.append({
+            'type': 'Feature',
+            'properties': {
+                'GID_2': f'SYN.{regency + 1}_1', 'NAME_2': f'Kabupaten {regency + 1}',
+                'GID_3': f'SYN.{regency + 1}.{index + 1}_1', 'NAME_3': names[index], 'TYPE_3': 'Kecamatan',
+            },
+            'geometry': {'type': 'Polygon', 'coordinates': [[list(point) for point in ring]]},
+        })
+    return BoundarySet.from_geojson({'type': 'FeatureCollection', 'features': features})
@@ -0,0 +1,212 @@
+"""Uji beban: N session bersamaan terhadap app.py dengan mock Google Apps Script lokal.
+
+Jalankan dari root repo:
+
+    python benchmarks/load_test.py --sessions 1 4 16 --iterations 5
+    python benchmarks/load_test.py --sessions 8 --sheet-rows 2000 --latency 0.5 --output load.json
+
+Setiap session adalah AppTest terpisah yang berjalan di thread sendiri
+dalam satu proses, sama seperti server Streamlit: semua session berbagi
+GIL dan cache st.cache_resource (scheduler, cache peta, cache upload).
+Skenario per iterasi: muat data Google Sheets dari mock, ganti sumber peta,
+nyalakan peta live, lalu upload CSV. Dilaporkan p50/p95/p99 latensi per
+rerun, throughput (rerun/detik), RSS proses server (akhir dan puncak
+selama tahap uji), dan p95 per tahap dari log instrumentasi (lihat
+instrument.py).
+"""
+import argparse
+import datetime
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generators import kecamatan_names, name_variants  # noqa: E402
+from instrument import read_log, stage_percentiles  # noqa: E402
+from tools.mock_apps_script import serve  # noqa: E402
+
+APP = os.path.join(ROOT, 'app.py')
+MAP_SOURCES = ["Gunakan Peta Bawaan", "Placeholder", "Gunakan Peta Bawaan"]
+
+
+def rss_bytes():
+    """RSS proses saat ini (Linux /proc), fallback ke puncak RSS dari getrusage"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def upload_csv(rows, seed):
+    """CSV kecamatan,potensi,realisasi (bytes) dengan variasi nama seperti file asli"""
+    rng = np.random.default_rng(seed)
+    names = name_variants(kecamatan_names(40), rows, rng)
+    potensi = rng.integers(1, 500, rows)
+    realisasi = (potensi * rng.random(rows)).astype(int)
+    lines = ['kecamatan,potensi,realisasi'] + [f'"{n}",{p},{r}' for n, p, r in zip(names, potensi, realisasi)]
+    return '\n'.join(lines).encode('utf-8')
+
+
+class Session:
+    """Satu session simulasi; setiap aksi adalah satu rerun yang diukur"""
+
+    def __init__(self, number, url, csv_data, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.number = number
+        self.url = url
+        self.csv_data = csv_data
+        self.app = AppTest.from_file(APP, default_timeout=timeout)
+        self.latencies = []
+        self.errors = []
+
+    def _rerun(self, action):
+        start = time.perf_counter()
+        action()
+        self.latencies.append(time.perf_counter() - start)
+        if self.app.exception:
+            self.errors.append(str(self.app.exception[0].message))
+
+    def _widget(self, widgets, label):
+        return next(widget for widget in widgets if label in widget.label)
+
+    def run(self, iterations):
+        app = self.app
+        self._rerun(app.run)
+        for iteration in range(iterations):
+            # Google Sheets (mock) + ganti sumber peta + peta live
+            self._rerun(lambda: self._widget(app.radio, "sumber data").set_value("Google Sheets").run())
+            self._rerun(lambda: self._widget(app.text_input, "Apps Script").set_value(self.url).run())
+            for source in MAP_SOURCES:
+                self._rerun(lambda: self._widget(app.radio, "GeoJSON").set_value(source).run())
+            self._rerun(lambda: self._widget(app.checkbox, "Peta live").set_value(iteration % 2 == 0).run())
+            # Upload CSV (isi sama untuk semua session: cache upload dipakai bersama)
+            self._rerun(lambda: self._widget(app.radio, "sumber data").set_value("Upload File").run())
+            self._rerun(lambda: app.file_uploader[0].set_value(('data.csv', self.csv_data, 'text/csv')).run())
+
+
+def run_level(sessions, iterations, url, csv_data, timeout):
+    """Jalankan N session bersamaan; return ringkasan latensi, throughput dan RSS"""
+    workers = [Session(number, url, csv_data, timeout) for number in range(sessions)]
+    failures = []
+
+    def drive(session):
+        try:
+            session.run(iterations)
+        except Exception as e:
+            failures.append(f"session {session.number}: {e!r}")
+
+    threads = [threading.Thread(target=drive, args=(session,), name=f"session-{session.number}")
+               for session in workers]
+    # RSS proses (yang memegang semua session) disampel selama tahap uji untuk nilai puncaknya
+    peak_rss = [rss_bytes()]
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.wait(0.1):
+            peak_rss[0] = max(peak_rss[0], rss_bytes())
+
+    sampler = threading.Thread(target=sample_rss, name='rss-sampler', daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    rss = rss_bytes()
+
+    latencies = np.array([latency for session in workers for latency in session.latencies]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+    return {
+        'sessions': sessions,
+        'reruns': int(len(latencies)),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(float(p50), 1),
+        'p95_ms': round(float(p95), 1),
+        'p99_ms': round(float(p99), 1),
+        'rss_mb': round(rss / 1024 ** 2, 1),
+        'rss_peak_mb': round(max(peak_rss[0], rss) / 1024 ** 2, 1),
+        'errors': failures + [error for session in workers for error in session.errors],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Jumlah session bersamaan per tahap uji")
+    parser.add_argument('--iterations', type=int, default=3, help="Iterasi skenario per session")
+    parser.add_argument('--sheet-rows', type=int, default=40, help="Jumlah baris yang dikirim mock Apps Script")
+    parser.add_argument('--latency', type=float, default=0.2, help="Jeda respons mock (detik)")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Peluang mock membalas 503 (0-1)")
+    parser.add_argument('--change-every', type=float, default=5.0, help="Data mock berubah setiap N detik")
+    parser.add_argument('--upload-rows', type=int, default=5_000, help="Jumlah baris CSV yang di-upload")
+    parser.add_argument('--timeout', type=float, default=120, help="Batas waktu satu rerun (detik)")
+    parser.add_argument('--output', help="Tulis hasil JSON ke file ini")
+    args = parser.parse_args()
+
+    server, state = serve(rows=args.sheet_rows, latency=args.latency, fail_rate=args.fail_rate,
+                          change_every=args.change_every)
+    url = f"http://127.0.0.1:{server.server_address[1]}/exec"
+    # Mock lokal bukan script.google.com; izinkan host-nya di validasi URL app
+    os.environ['DASHBOARD_SHEET_HOSTS'] = '127.0.0.1'
+    csv_data = upload_csv(args.upload_rows, seed=args.upload_rows)
+
+    # Log instrumentasi terpisah agar p95 per tahap bisa dihitung per tahap uji
+    log_dir = tempfile.mkdtemp(prefix='load-test-')
+    # Snapshot mock tidak boleh masuk riwayat asli di root repo
+    os.environ['DASHBOARD_HISTORY_DB'] = os.path.join(log_dir, 'history.sqlite')
+    os.chdir(ROOT)
+
+    results = []
+    print(f"{'sessions':>8s} {'reruns':>7s} {'rerun/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} "
+          f"{'RSS MB':>7s} {'peak MB':>7s} {'errors':>6s}")
+    for sessions in args.sessions:
+        log_path = os.path.join(log_dir, f"sessions-{sessions}.jsonl")
+        # Log diagnostik app hanya ditulis jika variabel ini diset; satu file per level
+        os.environ['DASHBOARD_DIAGNOSTICS_LOG'] = log_path
+        requests_before = state.requests
+        result = run_level(sessions, args.iterations, url, csv_data, args.timeout)
+        result['upstream_requests'] = state.requests - requests_before
+        if os.path.exists(log_path):
+            stages = stage_percentiles(read_log(log_path), (50, 95))
+            result['stages'] = stages.set_index('stage')[['p50', 'p95']].to_dict('index')
+        results.append(result)
+        print(f"{sessions:>8d} {result['reruns']:>7d} {result['throughput_rps']:>8.2f} {result['p50_ms']:>8.1f} "
+              f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['rss_mb']:>7.1f} "
+              f"{result['rss_peak_mb']:>7.1f} {len(result['errors']):>6d}", flush=True)
+        for error in result['errors'][:3]:
+            print(f"    ! {error}")
+
+    slowest = max(results, key=lambda r: r['sessions'])
+    if slowest.get('stages'):
+        print(f"\np95 per tahap ({slowest['sessions']} session, ms):")
+        for name, values in sorted(slowest['stages'].items(), key=lambda item: -item[1]['p95'])[:10]:
+            print(f"  {name:24s} {values['p95']:>9.1f}")
+
+    server.shutdown()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+                'config': vars(args),
+                'results': results,
+            }, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
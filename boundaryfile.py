@@ -0,0 +1,301 @@
+import json
+import struct
+import threading
+from collections.abc import Sequence
+
+import numpy as np
+
+from geostore import BoundarySet, freeze, thaw
+from topology import SIMPLIFY_TOLERANCES, Topology
+
+FORMAT_VERSION = 3
+
+# Resolusi kuantisasi koordinat (derajat); 1e-7 ~ 1 cm, lossless untuk data GADM
+QUANTUM = 1e-7
+
+# Ekstensi file format ringkas
+COMPACT_SUFFIX = '.bnd'
+
+# Pembuka file: magic, versi, panjang header JSON
+_PREAMBLE = struct.Struct('<6sHI')
+_MAGIC = b'BNDSET'
+# Perataan awal setiap array (byte)
+_ALIGN = 64
+
+
+def _align(size):
+    return -(-size // _ALIGN) * _ALIGN
+
+
+def _narrow(array):
+    """Array integer dengan tipe bertanda tersempit yang memuat semua nilainya"""
+    low, high = (int(array.min()), int(array.max())) if array.size else (0, 0)
+    dtype = next(t for t in (np.int8, np.int16, np.int32, np.int64)
+                 if np.iinfo(t).min <= low and high <= np.iinfo(t).max)
+    return array.astype(dtype)
+
+
+def _encode_arcs(arcs, translate, quantum):
+    """Kuantisasi arc lalu delta-encode; titik awal setiap arc disimpan terpisah (absolut).
+
+    Selisih dibagi FPB-nya (step) lalu disimpan dengan tipe integer
+    tersempit yang cukup: data GADM dibulatkan ke 1e-4 derajat, jadi
+    selisihnya biasanya muat di int16. Return (starts, lengths, deltas, step).
+    """
+    lengths = np.array([len(arc) for arc in arcs], dtype=np.int64)
+    if not arcs:
+        return np.empty((0, 2), dtype=np.int32), _narrow(lengths), np.empty((0, 2), dtype=np.int8), 1
+    quantized = np.rint((np.concatenate(arcs) - translate) / quantum).astype(np.int64)
+    if quantized.max(initial=0) > np.iinfo(np.int32).max:
+        raise ValueError("Cakupan koordinat terlalu luas untuk quantum ini; perbesar quantum")
+    firsts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    inner = np.ones(len(quantized), dtype=bool)
+    inner[firsts] = False
+    deltas = np.diff(quantized, axis=0, prepend=quantized[:1])[inner]
+    step = int(np.gcd.reduce(deltas.ravel())) if deltas.size else 0
+    step = abs(step) or 1
+    return quantized[firsts].astype(np.int32), _narrow(lengths), _narrow(deltas // step), step
+
+
+def _decode_arcs(starts, lengths, deltas, step):
+    """Kebalikan _encode_arcs: koordinat terkuantisasi (int64) semua arc beserta offset arc"""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(lengths, dtype=np.int64)
+    steps = np.zeros((offsets[-1], 2), dtype=np.int64)
+    inner = np.ones(len(steps), dtype=bool)
+    inner[offsets[:-1]] = False
+    steps[inner] = deltas.astype(np.int64) * step
+    total = np.cumsum(steps, axis=0)
+    base = starts.astype(np.int64) - total[offsets[:-1]]
+    return total + np.repeat(base, lengths, axis=0), offsets
+
+
+def _ring_point_index(arc_refs, ring_offsets, arc_offsets):
+    """Index titik (ke array arc) untuk setiap ring, beserta offset ring baru.
+
+    Arc ke-2 dst. dalam satu ring melewati titik pertamanya karena sama
+    dengan titik terakhir arc sebelumnya. Arc terbalik (ref negatif, ~index)
+    dibaca dari belakang.
+    """
+    reverse = arc_refs < 0
+    index = np.where(reverse, ~arc_refs, arc_refs).astype(np.int64)
+    start = arc_offsets[index]
+    end = arc_offsets[index + 1]
+    skip = np.ones(len(arc_refs), dtype=np.int64)
+    skip[ring_offsets[:-1]] = 0
+    counts = end - start - skip
+
+    ref_of_point = np.repeat(np.arange(len(arc_refs)), counts)
+    first_point = np.concatenate([[0], np.cumsum(counts)[:-1]]) if len(counts) else counts
+    within = np.arange(counts.sum()) - first_point[ref_of_point] + skip[ref_of_point]
+    points = np.where(
+        reverse[ref_of_point],
+        end[ref_of_point] - 1 - within,
+        start[ref_of_point] + within,
+    )
+
+    ring_counts = np.add.reduceat(counts, ring_offsets[:-1]) if len(counts) else np.zeros(0, dtype=np.int64)
+    return points, np.concatenate([[0], np.cumsum(ring_counts)]).astype(np.int64)
+
+
+def _encode_properties(properties):
+    """Properti per kolom: nilai tunggal, kamus (values + codes) atau data apa adanya.
+
+    Kolom seperti COUNTRY/NAME_1 yang sama di semua feature hanya disimpan
+    sekali. Jika urutan key tidak sama di semua feature, disimpan per baris.
+    """
+    properties = [thaw(props) for props in properties]
+    keys = []
+    for props in properties:
+        keys.extend(key for key in props if key not in keys)
+    if any(list(props) != [key for key in keys if key in props] for props in properties):
+        return {'rows': properties}
+
+    columns = {}
+    for key in keys:
+        present = [i for i, props in enumerate(properties) if key in props]
+        values = [properties[i][key] for i in present]
+        texts = [json.dumps(value, sort_keys=True) for value in values]
+        distinct = list(dict.fromkeys(texts))
+        if len(distinct) == 1:
+            column = {'value': values[0]}
+        elif len(distinct) * 2 <= len(values):
+            codes = {text: code for code, text in enumerate(distinct)}
+            column = {'values': [json.loads(text) for text in distinct], 'codes': [codes[text] for text in texts]}
+        else:
+            column = {'data': values}
+        if len(present) < len(properties):
+            column['present'] = present
+        columns[key] = column
+    return {'count': len(properties), 'columns': columns}
+
+
+def _decode_properties(table):
+    """Kebalikan _encode_properties: list dict per feature"""
+    if 'rows' in table:
+        return table['rows']
+    properties = [{} for _ in range(table['count'])]
+    for key, column in table['columns'].items():
+        present = column.get('present', range(table['count']))
+        if 'value' in column:
+            values = [column['value']] * len(present)
+        elif 'codes' in column:
+            values = [column['values'][code] for code in column['codes']]
+        else:
+            values = column['data']
+        for i, value in zip(present, values):
+            properties[i][key] = value
+    return properties
+
+
+def save_compact(path, boundaries, tolerances=SIMPLIFY_TOLERANCES, quantum=QUANTUM):
+    """Simpan BoundarySet beserta level sederhananya dalam format ringkas (header JSON + array mentah).
+
+    Seperti TopoJSON: batas bersama disimpan sekali sebagai arc, per level
+    hasil penyederhanaan arc (batas antar-wilayah tetap berimpit), dengan
+    koordinat terkuantisasi dan delta-encoded tanpa kompresi. Properti
+    disimpan per kolom di header.
+    """
+    unsupported = set(boundaries.geometry_types) - {None, *BoundarySet.POLYGONAL}
+    if unsupported:
+        raise ValueError(f"Tipe geometry tidak didukung format ringkas: {', '.join(sorted(map(str, unsupported)))}")
+
+    topology = Topology.from_boundaries(boundaries)
+    translate = boundaries.coords.min(axis=0) if len(boundaries.coords) else np.zeros(2)
+    arc_refs = _narrow(np.array(
+        [~index if reverse else index for refs in topology.ring_arcs for index, reverse in refs],
+        dtype=np.int64))
+    ring_arc_offsets = np.concatenate([[0], np.cumsum([len(refs) for refs in topology.ring_arcs])]).astype(np.int32)
+
+    # Level 0 selalu resolusi penuh
+    tolerances = sorted(set(tolerances) | {0.0})
+    arrays = {
+        'arc_refs': arc_refs,
+        'ring_arc_offsets': ring_arc_offsets,
+        'part_offsets': boundaries.part_offsets,
+        'feature_offsets': boundaries.feature_offsets,
+    }
+    steps = []
+    for level, tolerance in enumerate(tolerances):
+        starts, lengths, deltas, step = _encode_arcs(topology.simplified_arcs(tolerance), translate, quantum)
+        if level == 0:
+            # Ujung arc tidak pernah dibuang penyederhanaan: titik awal cukup disimpan sekali
+            arrays['arc_starts'] = starts
+        elif not np.array_equal(starts, arrays['arc_starts']):
+            raise ValueError("Titik awal arc berubah setelah penyederhanaan")
+        arrays[f'arc_lengths_{level}'] = lengths
+        arrays[f'arc_deltas_{level}'] = deltas
+        steps.append(step)
+        # Offset ring per level (kecil) agar jumlah vertex terbaca tanpa decode
+        arc_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        arrays[f'ring_offsets_{level}'] = _ring_point_index(arc_refs, ring_arc_offsets, arc_offsets)[1]
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        arrays[name] = array
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({
+        'quantum': quantum,
+        'translate': [float(value) for value in translate],
+        'tolerances': [float(tolerance) for tolerance in tolerances],
+        'steps': steps,
+        'geometry_types': list(boundaries.geometry_types),
+        'properties': _encode_properties(boundaries.properties),
+        'arrays': layout,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    start = _align(_PREAMBLE.size + len(header))
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(_MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(start + layout[name][2])
+            f.write(array.tobytes())
+        # Array kosong di akhir tetap harus berada di dalam file
+        f.truncate(start + offset)
+
+
+class CompactLevels(Sequence):
+    """Level (toleransi, BoundarySet) dari file ringkas; koordinat tiap level di-decode saat pertama diakses.
+
+    Toleransi, jumlah vertex dan offset tersedia langsung dari header dan
+    buffer, jadi choose_level dan RegionIndex tidak memaksa decode level yang
+    tidak dirender. Level yang sudah di-decode disimpan. Aman dipakai
+    bersama antar-thread.
+    """
+
+    def __init__(self, buffer, header, start):
+        self._buffer = buffer
+        self._layout = header['arrays']
+        self._start = start
+        self.quantum = header['quantum']
+        self.translate = np.array(header['translate'], dtype=np.float64)
+        self.tolerances = tuple(header['tolerances'])
+        self._steps = header['steps']
+        self.arc_refs = self._array('arc_refs')
+        self.ring_arc_offsets = self._array('ring_arc_offsets')
+        self.part_offsets = self._array('part_offsets')
+        self.feature_offsets = self._array('feature_offsets')
+        self.geometry_types = tuple(header['geometry_types'])
+        self.properties = tuple(freeze(properties) for properties in _decode_properties(header['properties']))
+        self.vertex_counts = tuple(
+            int(self._array(f'ring_offsets_{level}')[-1]) for level in range(len(self.tolerances)))
+        self._levels = [None] * len(self.tolerances)
+        self._lock = threading.Lock()
+
+    def _array(self, name):
+        dtype, shape, offset = self._layout[name]
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        return np.frombuffer(self._buffer, dtype=dtype, count=count, offset=self._start + offset).reshape(shape)
+
+    def __len__(self):
+        return len(self.tolerances)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self))[index]
+        level = self._levels[index]
+        if level is None:
+            with self._lock:
+                level = self._levels[index]
+                if level is None:
+                    level = self._levels[index] = (self.tolerances[index], self._decode(index))
+        return level
+
+    def _decode(self, level):
+        quantized, arc_offsets = _decode_arcs(self._array('arc_starts'), self._array(f'arc_lengths_{level}'),
+                                              self._array(f'arc_deltas_{level}'), self._steps[level])
+        points, _ = _ring_point_index(self.arc_refs, self.ring_arc_offsets, arc_offsets)
+        coords = np.round(quantized[points] * self.quantum + self.translate, 7)
+        return BoundarySet(coords, self._array(f'ring_offsets_{level}'), self.part_offsets, self.feature_offsets,
+                           self.geometry_types, self.properties)
+
+    def feature_vertex_counts(self, level):
+        """Jumlah vertex per feature di satu level, tanpa decode koordinat"""
+        ring_offsets = self._array(f'ring_offsets_{level}')
+        return np.diff(ring_offsets[self.part_offsets[self.feature_offsets]])
+
+    @property
+    def nbytes(self):
+        """Ukuran semua level setelah di-decode (byte); batas atas untuk LRU"""
+        return len(self._buffer) + sum(count * 16 for count in self.vertex_counts)
+
+
+def load_compact(path):
+    """Baca file format ringkas menjadi CompactLevels (toleransi, BoundarySet), level 0 resolusi penuh"""
+    with open(path, 'rb') as f:
+        buffer = f.read()
+    if len(buffer) < _PREAMBLE.size:
+        raise ValueError(f"Bukan file boundary ringkas: {path}")
+    magic, version, size = _PREAMBLE.unpack_from(buffer)
+    if magic != _MAGIC:
+        raise ValueError(f"Bukan file boundary ringkas: {path}")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versi format boundary tidak dikenal: {version} (buat ulang dengan tools/convert_boundaries.py)")
+    header = json.loads(buffer[_PREAMBLE.size:_PREAMBLE.size + size])
+    return CompactLevels(buffer, header, _align(_PREAMBLE.size + size))
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def estimate_nbytes(obj):
+    """Perkiraan ukuran objek di memori (DataFrame dihitung deep)"""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(obj, pd.DataFrame) else int(usage)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+def fingerprint(*parts):
+    """Hash stabil (hex) dari nilai yang bisa di-serialize ke JSON, untuk key cache"""
+    data = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def frame_fingerprint(df):
+    """Hash isi DataFrame (nilai, index dan nama kolom), murah untuk frame kecil-menengah"""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(fingerprint(list(map(str, df.columns))).encode('ascii'))
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Cache LRU thread-safe yang dibatasi jumlah entry dan total ukuran (byte).
+
+    Dipakai bersama oleh semua session (lewat st.cache_resource), jadi nilai
+    yang disimpan tidak boleh diubah oleh pemanggil.
+    """
+
+    def __init__(self, max_entries=16, max_bytes=256 * 1024 ** 2, sizeof=estimate_nbytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """Simpan value; value yang lebih besar dari max_bytes tidak disimpan"""
+        nbytes = self.sizeof(value)
+        if nbytes > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            while len(self._entries) > self.max_entries or self._nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._nbytes -= evicted
+        return True
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
@@ -0,0 +1,85 @@
+# Grafik plotly yang dipakai dashboard dan laporan statis (tools/render_reports.py).
+# plotly di-import di dalam fungsi supaya modul ini murah di-import.
+
+
+def potensi_pie(df):
+    """Donut proporsi Potensi per kecamatan; None jika tidak ada potensi"""
+    import plotly.express as px
+
+    # Pie Chart - hanya untuk kecamatan dengan data
+    df_pie = df[df['Potensi'] > 0].sort_values('Potensi', ascending=False)
+    if len(df_pie) == 0:
+        return None
+
+    fig_pie = px.pie(
+        df_pie,
+        values='Potensi',
+        names='Kecamatan',
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        hole=0.3  # Donut chart
+    )
+    fig_pie.update_traces(
+        textposition='inside',
+        textinfo='label+percent',
+        textfont_size=10,
+        hovertemplate='<b>%{label}</b><br>Potensi: %{value:,}<br>Persentase: %{percent}<extra></extra>'
+    )
+    fig_pie.update_layout(
+        height=400,
+        showlegend=False,
+        margin=dict(l=10, r=10, t=10, b=10)
+    )
+    return fig_pie
+
+
+def top10_bar(df):
+    """Bar horizontal Potensi vs Realisasi untuk 10 kecamatan dengan potensi terbesar"""
+    import plotly.graph_objects as go
+
+    top10 = df.nlargest(10, 'Potensi').sort_values('Potensi', ascending=True)
+
+    fig_bar = go.Figure()
+
+    # Add Potensi bars
+    fig_bar.add_trace(go.Bar(
+        y=top10['Kecamatan'],
+        x=top10['Potensi'],
+        name='Potensi',
+        orientation='h',
+        marker_color='#0074e0',
+        text=top10['Potensi'],
+        textposition='outside',
+        texttemplate='%{text:,}',
+        hovertemplate='<b>%{y}</b><br>Potensi: %{x:,}<extra></extra>'
+    ))
+
+    # Add Realisasi bars
+    fig_bar.add_trace(go.Bar(
+        y=top10['Kecamatan'],
+        x=top10['Realisasi'],
+        name='Realisasi',
+        orientation='h',
+        marker_color='#28a745',
+        text=top10['Realisasi'],
+        textposition='inside',
+        texttemplate='%{text:,}',
+        hovertemplate='<b>%{y}</b><br>Realisasi: %{x:,}<extra></extra>'
+    ))
+
+    fig_bar.update_layout(
+        barmode='overlay',
+        height=450,
+        xaxis_title="Jumlah",
+        yaxis_title="",
+        font=dict(size=11),
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(l=10, r=10, t=30, b=10)
+    )
+    return fig_bar
@@ -0,0 +1,183 @@
+import html
+
+from instrument import stage
+from pipeline import NO_DATA_COLOR
+
+# Warna warni untuk peta (satu warna per kecamatan, berulang)
+MAP_PALETTE = (
+    '#4CAF50', '#2196F3', '#FF9800', '#E91E63', '#9C27B0',
+    '#FF5722', '#00BCD4', '#FFEB3B', '#795548', '#607D8B',
+    '#3F51B5', '#009688', '#FFC107', '#CDDC39', '#FF4081',
+    '#00ACC1', '#7CB342', '#D32F2F', '#512DA8', '#689F38',
+    '#F44336', '#03A9F4', '#8BC34A', '#E65100', '#673AB7',
+    '#00897B', '#6D4C41', '#5E35B1', '#1E88E5', '#43A047'
+)
+
+# Template tooltip & popup dibaca dari properties setiap feature di browser,
+# sehingga HTML tidak diduplikasi per kecamatan. String di properties disisipkan
+# sebagai HTML, jadi sudah di-escape di feature_properties.
+FEATURE_TEMPLATE_JS = """
+function (feature, layer) {
+    var p = feature.properties;
+    var fmt = function (x) { return Number(x).toLocaleString('en-US'); };
+    if (!p.has_data) {
+        layer.bindTooltip('<b>' + p.kecamatan + '</b><br>(Tidak ada data)');
+        return;
+    }
+    var persen = Number(p.persentase).toFixed(1);
+    layer.bindTooltip('<b>' + p.kecamatan + '</b><br>Capaian: ' + persen + '%');
+    layer.bindPopup(
+        "<div style='font-family: Arial; width: 220px;'>" +
+        "<h4 style='margin: 0; color: #004aad;'>" + p.kecamatan + "</h4>" +
+        "<hr style='margin: 5px 0;'>" +
+        "<table style='width:100%; font-size:13px;'>" +
+        "<tr><td><b>Potensi:</b></td><td style='text-align:right;'>" + fmt(p.potensi) + "</td></tr>" +
+        "<tr><td><b>Realisasi:</b></td><td style='text-align:right;'>" + fmt(p.realisasi) + "</td></tr>" +
+        "<tr><td><b>Sisa:</b></td><td style='text-align:right;'>" + fmt(p.sisa) + "</td></tr>" +
+        "<tr><td><b>Capaian:</b></td><td style='text-align:right;'><b>" + persen + "%</b></td></tr>" +
+        "</table>" +
+        "<div style='margin-top:8px; background:#eee; height:12px; border-radius:6px; overflow:hidden;'>" +
+        "<div style='background:" + p.progress_color + "; height:100%; width:" + persen + "%;'></div>" +
+        "</div></div>",
+        {maxWidth: 280}
+    );
+}
+"""
+
+
+def feature_name(properties):
+    """Nama kecamatan dari properties GeoJSON"""
+    return (
+            properties.get('NAME_3') or
+            properties.get('name') or
+            properties.get('NAMOBJ') or
+            "Unknown"
+    )
+
+
+def feature_key(properties, index):
+    """Key unik feature untuk lookup style (GID_3, fallback ke urutan feature)"""
+    return str(properties.get('GID_3') or index)
+
+
+def feature_properties(feature_properties_list, df, matcher, palette, progress_color):
+    """Properties (metrik + warna progress) dan style per feature, tanpa geometry.
+
+    Return (properties, styles, unmatched); properties berurutan seperti
+    features, styles di-key dengan feature_key.
+    """
+    with stage('matching'):
+        positions = matcher.match_properties(feature_properties_list)
+
+    potensi = df['Potensi'].to_numpy()
+    realisasi = df['Realisasi'].to_numpy()
+    sisa = df['Sisa'].to_numpy()
+    persentase = df['Persentase'].to_numpy()
+
+    properties_list = []
+    styles = {}
+    unmatched = []
+    color_index = 0
+
+    for index, (source_properties, position) in enumerate(zip(feature_properties_list, positions)):
+        key = feature_key(source_properties, index)
+        kecamatan_name = feature_name(source_properties)
+        # Nama dari file batas upload bisa berisi HTML/script
+        properties = {'key': key, 'kecamatan': html.escape(str(kecamatan_name)), 'has_data': False}
+
+        if position is not None:
+            persen = float(persentase[position])
+            properties.update({
+                'has_data': True,
+                'potensi': int(potensi[position]),
+                'realisasi': int(realisasi[position]),
+                'sisa': int(sisa[position]),
+                'persentase': round(persen, 2),
+                # Warna progress bar di popup tetap berdasarkan persentase
+                'progress_color': progress_color(persen),
+            })
+            # Gunakan warna warni untuk peta
+            styles[key] = {
+                'fillColor': palette[color_index % len(palette)],
+                'color': 'white',
+                'weight': 2,
+                'fillOpacity': 0.7
+            }
+            color_index += 1
+        else:
+            unmatched.append(kecamatan_name)
+            styles[key] = {
+                'fillColor': NO_DATA_COLOR,
+                'color': 'white',
+                'weight': 2,
+                'fillOpacity': 0.5
+            }
+        properties_list.append(properties)
+
+    return properties_list, styles, unmatched
+
+
+def build_choropleth_data(boundaries, df, matcher, palette, progress_color):
+    """Gabungkan metrik ke properties feature dan buat lookup style per GID_3.
+
+    Geometry dibangun dari array BoundarySet hanya untuk render ini (tidak
+    disimpan), jadi batas yang di-cache tetap berupa array ringkas.
+    """
+    properties_list, styles, unmatched = feature_properties(boundaries.properties, df, matcher, palette,
+                                                           progress_color)
+
+    features = []
+    for index, properties in enumerate(properties_list):
+        features.append({
+            'type': 'Feature',
+            'properties': properties,
+            'geometry': boundaries.geometry(index),
+        })
+
+    feature_collection = {'type': 'FeatureCollection', 'features': features}
+    return feature_collection, styles, unmatched
+
+
+def add_choropleth_layer(m, feature_collection, styles):
+    """Tambahkan satu layer GeoJSON untuk semua kecamatan"""
+    import folium
+    from folium.utilities import JsCode
+
+    folium.GeoJson(
+        feature_collection,
+        name='Kecamatan',
+        style_function=lambda feature: styles[feature['properties']['key']],
+        on_each_feature=JsCode(FEATURE_TEMPLATE_JS),
+    ).add_to(m)
+    return m
+
+
+def render_choropleth(boundaries, df, matcher, palette, progress_color, location, zoom, tiles='OpenStreetMap'):
+    """Render peta choropleth lengkap menjadi HTML siap tampil.
+
+    Hasilnya (html, jumlah match, laporan pencocokan) tidak bergantung pada
+    session, sehingga bisa di-cache dengan key fingerprint input.
+    """
+    # folium berat; di-import hanya saat peta HTML benar-benar dirender
+    import folium
+
+    m = folium.Map(location=location, zoom_start=zoom, tiles=tiles)
+    feature_collection, styles, unmatched = build_choropleth_data(
+        boundaries,
+        df,
+        matcher=matcher,
+        palette=palette,
+        progress_color=progress_color
+    )
+    with stage('folium'):
+        add_choropleth_layer(m, feature_collection, styles)
+        # Sama seperti folium_static: Map dibungkus Figure lalu di-render
+        html = folium.Figure().add_child(m).render()
+    return {
+        'html': html,
+        'matched': len(feature_collection['features']) - len(unmatched),
+        'unmatched': unmatched,
+        'report': matcher.report(),
+        'unused': matcher.unused,
+        'ambiguous': matcher.ambiguous,
+    }
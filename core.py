@@ -0,0 +1,58 @@
+import os
+
+from ingest import (MISSING_KECAMATAN_MESSAGE, MISSING_POTENSI_MESSAGE, detect_metric_columns, find_desa_column,
+                    find_kabupaten_column, ingest_upload)
+from pipeline import aggregate_desa, prepare_metrics
+
+# Alur data dashboard tanpa Streamlit/folium/plotly, untuk dipakai dari script:
+#
+#     result = core.load_file('data.xlsx')
+#     df, desa_count, columns = core.prepare_frame(result['df'], result.get('desa_count'))
+#     core.summarize(df)
+
+
+def load_file(path, streaming=False, sheet=None, locator=None):
+    """ingest_upload untuk file di disk (CSV/Excel), hasilnya sama seperti upload di dashboard"""
+    with open(path, 'rb') as f:
+        return ingest_upload(f, os.path.basename(path), streaming=streaming, sheet=sheet, locator=locator)
+
+
+def prepare_frame(df, desa_count=None):
+    """Frame mentah -> (metrik per kecamatan, agregat desa atau None, kolom terdeteksi).
+
+    Nama kolom dibuat huruf kecil lalu kolom kecamatan/potensi/realisasi
+    dideteksi seperti di dashboard; ValueError jika kecamatan atau potensi
+    tidak ditemukan. Agregat desa dihitung dari kolom DESA/KELURAHAN bila
+    belum diberikan oleh ingest. Kolom kabupaten/kota (jika ada) ikut dibawa
+    sebagai Kabupaten, supaya nama kecamatan yang sama di kabupaten berbeda
+    bisa dibedakan saat dicocokkan dengan peta.
+    """
+    df = df.rename(columns=lambda col: str(col).lower())
+    kec_col, pot_col, real_col = detect_metric_columns(df.columns)
+    if not kec_col:
+        raise ValueError(MISSING_KECAMATAN_MESSAGE)
+    if not pot_col:
+        raise ValueError(MISSING_POTENSI_MESSAGE)
+
+    desa_col = find_desa_column(df.columns)
+    if desa_count is None and desa_col and desa_col != kec_col:
+        desa_count = aggregate_desa(df, kec_col, desa_col, pot_col, real_col)
+
+    kab_col = find_kabupaten_column(df.columns)
+    if kab_col in (kec_col, pot_col, real_col):
+        kab_col = None
+    columns = {'kecamatan': kec_col, 'potensi': pot_col, 'realisasi': real_col, 'desa': desa_col,
+               'kabupaten': kab_col}
+    return prepare_metrics(df, kec_col, pot_col, real_col, kab_col), desa_count, columns
+
+
+def summarize(df):
+    """Total Potensi, Realisasi, Sisa dan rata-rata capaian (%) dari frame metrik"""
+    potensi = int(df['Potensi'].sum())
+    realisasi = int(df['Realisasi'].sum())
+    return {
+        'potensi': potensi,
+        'realisasi': realisasi,
+        'sisa': int(df['Sisa'].sum()),
+        'capaian': realisasi / potensi * 100 if potensi > 0 else 0.0,
+    }
@@ -0,0 +1,136 @@
+import hashlib
+import threading
+import time
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Status yang layak dicoba ulang (rate limit / gangguan sementara di sisi Google)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Host web app Apps Script; host lain (mis. mock lokal) harus diizinkan eksplisit
+APPS_SCRIPT_HOSTS = ('script.google.com',)
+
+
+class FetchError(Exception):
+    """Gagal mengambil data dari Apps Script (jaringan, HTTP atau status != ok)"""
+
+
+def check_sheet_url(url, extra_hosts=()):
+    """URL yang sudah dirapikan; ValueError jika bukan web app Apps Script (https://script.google.com/macros/s/.../exec).
+
+    Host di extra_hosts (hostname atau hostname:port) diterima apa adanya,
+    juga lewat http, untuk server lokal seperti tools/mock_apps_script.py.
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if host and (host in extra_hosts or parts.netloc.lower() in extra_hosts):
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError("URL harus diawali http:// atau https://")
+        return url
+    if parts.scheme != 'https' or host not in APPS_SCRIPT_HOSTS:
+        raise ValueError("URL harus web app Google Apps Script (https://script.google.com/macros/s/.../exec)")
+    if parts.username or parts.password or parts.port not in (None, 443):
+        raise ValueError("URL Apps Script tidak boleh memuat kredensial atau port")
+    if not (parts.path.startswith('/macros/s/') and parts.path.endswith(('/exec', '/dev'))):
+        raise ValueError("Path URL Apps Script harus berbentuk /macros/s/<id>/exec")
+    return url
+
+
+def make_session(pool_size=8, retries=3, backoff=0.5):
+    """requests.Session dengan connection pool dan retry exponential backoff untuk GET"""
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class SheetFetcher:
+    """Pengambil data Apps Script ({status, data}) dengan validasi ulang kondisional.
+
+    Dipanggil oleh RefreshScheduler (satu request per URL per interval).
+    Validasi ulang memakai If-None-Match bila server mengirim ETag, parameter
+    version bila respons membawa field version, dan hash isi respons sebagai
+    cadangan. Data yang tidak berubah tidak di-parse ulang menjadi DataFrame:
+    entry lama (objek df yang sama) dikembalikan dengan checked_at baru.
+    """
+
+    def __init__(self, session=None, timeout=10):
+        self.session = session or make_session()
+        self.timeout = timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, url):
+        """Validasi ulang secara sinkron dan kembalikan entry terbaru; raise FetchError jika gagal"""
+        with self._lock:
+            previous = self._entries.get(url)
+
+        headers = {}
+        params = {}
+        if previous is not None:
+            if previous['etag']:
+                headers['If-None-Match'] = previous['etag']
+            if previous['version'] is not None:
+                params['version'] = previous['version']
+
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise FetchError(f"Gagal menghubungi Apps Script: {e}") from e
+
+        now = time.time()
+        if previous is not None and response.status_code == 304:
+            entry = dict(previous, checked_at=now, error=None)
+        else:
+            if response.status_code != 200:
+                raise FetchError(f"Apps Script membalas HTTP {response.status_code}")
+            entry = self._parse(response, previous, now)
+
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def _parse(self, response, previous, now):
+        # Isi identik: lewati decode JSON dan pembuatan DataFrame
+        digest = hashlib.sha256(response.content).hexdigest()
+        if previous is not None and digest == previous['digest']:
+            return dict(previous, etag=response.headers.get('ETag'), checked_at=now, error=None)
+
+        try:
+            payload = response.json()
+        except ValueError as e:
+            raise FetchError("Respons Apps Script bukan JSON") from e
+
+        status = payload.get('status')
+        if previous is not None and status == 'not_modified':
+            return dict(previous, checked_at=now, error=None)
+        if status != 'ok':
+            raise FetchError(payload.get('message') or f"Status Apps Script: {status}")
+
+        return {
+            'df': pd.DataFrame(payload.get('data', [])),
+            'version': payload.get('version'),
+            'etag': response.headers.get('ETag'),
+            'digest': digest,
+            'updated_at': now,
+            'checked_at': now,
+            'error': None,
+        }
+
+    def forget(self, url):
+        """Buang entry URL yang tidak dipantau lagi"""
+        with self._lock:
+            self._entries.pop(url, None)
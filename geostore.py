@@ -0,0 +1,183 @@
+import hashlib
+import json
+from types import MappingProxyType
+
+import numpy as np
+
+
+def freeze(obj):
+    """Salinan read-only: list -> tuple, dict -> MappingProxyType (rekursif)"""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: freeze(value) for key, value in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(item) for item in obj)
+    return obj
+
+
+def thaw(obj):
+    """Kebalikan freeze, untuk objek yang perlu di-serialize ke JSON"""
+    if isinstance(obj, MappingProxyType):
+        return {key: thaw(value) for key, value in obj.items()}
+    if isinstance(obj, tuple):
+        return [thaw(item) for item in obj]
+    return obj
+
+
+def _take_ranges(offsets, items):
+    """Gabungan range [offsets[i], offsets[i + 1]) untuk setiap i di items, beserta offset barunya"""
+    starts = offsets[items]
+    counts = offsets[items + 1] - starts
+    new_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    index = np.repeat(starts - new_offsets[:-1], counts) + np.arange(new_offsets[-1])
+    return index, new_offsets
+
+
+def _readonly(array):
+    array.flags.writeable = False
+    return array
+
+
+class BoundarySet:
+    """Kumpulan batas wilayah dalam bentuk ringkas dan read-only.
+
+    Koordinat semua polygon disimpan dalam satu array (N, 2) dengan array
+    offset untuk ring, part dan feature, sedangkan properties disimpan
+    sebagai tabel terpisah. Satu instance dipakai bersama oleh semua session
+    (lewat st.cache_resource), jadi tidak ada yang boleh diubah.
+    """
+
+    POLYGONAL = ('Polygon', 'MultiPolygon')
+
+    def __init__(self, coords, ring_offsets, part_offsets, feature_offsets, geometry_types, properties,
+                 other_geometries=None):
+        self.coords = _readonly(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+        self.ring_offsets = _readonly(np.asarray(ring_offsets, dtype=np.int64))
+        self.part_offsets = _readonly(np.asarray(part_offsets, dtype=np.int64))
+        self.feature_offsets = _readonly(np.asarray(feature_offsets, dtype=np.int64))
+        self.geometry_types = tuple(geometry_types)
+        self.properties = tuple(p if isinstance(p, MappingProxyType) else freeze(dict(p or {})) for p in properties)
+        # Geometry selain (Multi)Polygon disimpan apa adanya (sudah di-freeze)
+        self.other_geometries = MappingProxyType(dict(other_geometries or {}))
+        self._fingerprint = None
+
+    @classmethod
+    def from_geojson(cls, data):
+        """Bangun BoundarySet dari dict GeoJSON (FeatureCollection, Feature atau geometry)"""
+        if data.get('type') == 'FeatureCollection':
+            features = data.get('features', [])
+        elif data.get('type') == 'Feature':
+            features = [data]
+        else:
+            features = [{'type': 'Feature', 'properties': {}, 'geometry': data}]
+
+        coords = []
+        ring_offsets = [0]
+        part_offsets = [0]
+        feature_offsets = [0]
+        geometry_types = []
+        properties = []
+        other_geometries = {}
+
+        for index, feature in enumerate(features):
+            geometry = feature.get('geometry')
+            geometry_type = geometry.get('type') if geometry else None
+            geometry_types.append(geometry_type)
+            properties.append(feature.get('properties'))
+
+            if geometry_type in cls.POLYGONAL:
+                parts = geometry['coordinates']
+                if geometry_type == 'Polygon':
+                    parts = [parts]
+                for part in parts:
+                    for ring in part:
+                        coords.extend((point[0], point[1]) for point in ring)
+                        ring_offsets.append(len(coords))
+                    part_offsets.append(len(ring_offsets) - 1)
+            elif geometry is not None:
+                other_geometries[index] = freeze(geometry)
+            feature_offsets.append(len(part_offsets) - 1)
+
+        return cls(coords, ring_offsets, part_offsets, feature_offsets, geometry_types, properties,
+                   other_geometries)
+
+    def __len__(self):
+        return len(self.geometry_types)
+
+    @property
+    def nbytes(self):
+        """Ukuran array koordinat dan offset (byte)"""
+        return sum(a.nbytes for a in (self.coords, self.ring_offsets, self.part_offsets, self.feature_offsets))
+
+    @property
+    def fingerprint(self):
+        """Hash isi (koordinat, offset, properties), dihitung sekali; dipakai sebagai key cache"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for array in (self.coords, self.ring_offsets, self.part_offsets, self.feature_offsets):
+                digest.update(array.tobytes())
+            extra = [self.geometry_types, thaw(self.properties), thaw(self.other_geometries)]
+            digest.update(json.dumps(extra, sort_keys=True, default=str).encode('utf-8'))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def subset(self, indices):
+        """BoundarySet baru yang hanya berisi feature indices (urutan dipertahankan)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        parts, feature_offsets = _take_ranges(self.feature_offsets, indices)
+        rings, part_offsets = _take_ranges(self.part_offsets, parts)
+        points, ring_offsets = _take_ranges(self.ring_offsets, rings)
+        positions = {int(index): position for position, index in enumerate(indices)}
+        return BoundarySet(
+            self.coords[points], ring_offsets, part_offsets, feature_offsets,
+            [self.geometry_types[i] for i in indices],
+            [self.properties[i] for i in indices],
+            {positions[i]: geometry for i, geometry in self.other_geometries.items() if i in positions},
+        )
+
+    def rings(self, index):
+        """List part, masing-masing list array ring (view, tanpa copy), untuk feature ke-index"""
+        parts = []
+        for part in range(self.feature_offsets[index], self.feature_offsets[index + 1]):
+            rings = []
+            for ring in range(self.part_offsets[part], self.part_offsets[part + 1]):
+                rings.append(self.coords[self.ring_offsets[ring]:self.ring_offsets[ring + 1]])
+            parts.append(rings)
+        return parts
+
+    def geometry(self, index):
+        """Geometry GeoJSON baru (list biasa, boleh diubah pemanggil) untuk feature ke-index"""
+        geometry_type = self.geometry_types[index]
+        if geometry_type not in self.POLYGONAL:
+            return thaw(self.other_geometries.get(index))
+        parts = [[ring.tolist() for ring in rings] for rings in self.rings(index)]
+        if geometry_type == 'Polygon':
+            return {'type': 'Polygon', 'coordinates': parts[0] if parts else []}
+        return {'type': 'MultiPolygon', 'coordinates': parts}
+
+    def bounds(self):
+        """Array (F, 4) berisi minx, miny, maxx, maxy per feature (NaN jika tanpa polygon)"""
+        result = np.full((len(self), 4), np.nan)
+        for index in range(len(self)):
+            start = self.ring_offsets[self.part_offsets[self.feature_offsets[index]]]
+            end = self.ring_offsets[self.part_offsets[self.feature_offsets[index + 1]]]
+            if end > start:
+                points = self.coords[start:end]
+                result[index, :2] = points.min(axis=0)
+                result[index, 2:] = points.max(axis=0)
+        return result
+
+    @property
+    def geojson(self):
+        """FeatureCollection baru (list/dict biasa) untuk ekspor.
+
+        Dibangun ulang setiap dipanggil dan tidak disimpan di instance:
+        objek Python per titik jauh lebih besar dari array koordinat. Kode
+        render memakai properties, geometry(index) dan array offset.
+        """
+        return {
+            'type': 'FeatureCollection',
+            'features': [
+                {'type': 'Feature', 'properties': thaw(self.properties[index]), 'geometry': self.geometry(index)}
+                for index in range(len(self))
+            ],
+        }
@@ -0,0 +1,175 @@
+import datetime
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache import frame_fingerprint
+
+# Kolom yang disimpan per snapshot (setelah prepare_metrics)
+SNAPSHOT_COLUMNS = ['Kecamatan', 'Potensi', 'Realisasi']
+
+# Label periode tren -> frekuensi pandas
+PERIODS = {'Harian': 'D', 'Mingguan': 'W-MON', 'Bulanan': 'MS'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kecamatan (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS snapshot (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    taken_at INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot_value (
+    snapshot_id INTEGER NOT NULL,
+    kecamatan_id INTEGER NOT NULL,
+    potensi INTEGER NOT NULL,
+    realisasi INTEGER NOT NULL,
+    PRIMARY KEY (snapshot_id, kecamatan_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS latest (
+    source TEXT NOT NULL,
+    kecamatan_id INTEGER NOT NULL,
+    potensi INTEGER NOT NULL,
+    realisasi INTEGER NOT NULL,
+    PRIMARY KEY (source, kecamatan_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily (
+    source TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    kecamatan_id INTEGER NOT NULL,
+    potensi INTEGER NOT NULL,
+    realisasi INTEGER NOT NULL,
+    delta_potensi INTEGER NOT NULL,
+    delta_realisasi INTEGER NOT NULL,
+    PRIMARY KEY (source, day, kecamatan_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshot_source ON snapshot (source, taken_at);
+"""
+
+
+class SnapshotStore:
+    """Riwayat snapshot Potensi/Realisasi per kecamatan di SQLite (append-only).
+
+    Nilai mentah setiap snapshot disimpan di snapshot_value dengan id
+    kecamatan integer. Saat append, tabel latest (nilai terakhir per
+    sumber) dan daily (nilai akhir hari + delta harian) ikut diperbarui,
+    sehingga tren cukup membaca daily tanpa memindai ulang semua snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(_SCHEMA)
+        self._kecamatan_ids = dict(self._connection.execute('SELECT name, id FROM kecamatan'))
+
+    def _kecamatan_id(self, name):
+        if name not in self._kecamatan_ids:
+            cursor = self._connection.execute('INSERT INTO kecamatan (name) VALUES (?)', (name,))
+            self._kecamatan_ids[name] = cursor.lastrowid
+        return self._kecamatan_ids[name]
+
+    def append(self, df, source, taken_at=None):
+        """Simpan df sebagai snapshot baru; return id snapshot, atau None jika isinya sama dengan snapshot terakhir.
+
+        Delta dihitung terhadap nilai terakhir kecamatan yang sama pada
+        sumber yang sama; kecamatan yang baru muncul dianggap delta 0.
+        """
+        # Diurutkan per nama supaya urutan baris di sumber tidak mengubah digest
+        frame = df[SNAPSHOT_COLUMNS].groupby('Kecamatan', sort=True, observed=True).sum()
+        digest = frame_fingerprint(frame)
+        taken_at = int(time.time() if taken_at is None else taken_at)
+        day = datetime.date.fromtimestamp(taken_at).toordinal()
+
+        with self._lock, self._connection:
+            last = self._connection.execute(
+                'SELECT digest FROM snapshot WHERE source = ? ORDER BY taken_at DESC, id DESC LIMIT 1',
+                (source,)).fetchone()
+            if last and last[0] == digest:
+                return None
+
+            snapshot_id = self._connection.execute(
+                'INSERT INTO snapshot (source, taken_at, digest) VALUES (?, ?, ?)',
+                (source, taken_at, digest)).lastrowid
+            latest = {
+                kecamatan_id: (potensi, realisasi)
+                for kecamatan_id, potensi, realisasi in self._connection.execute(
+                    'SELECT kecamatan_id, potensi, realisasi FROM latest WHERE source = ?', (source,))
+            }
+
+            rows = []
+            for name, potensi, realisasi in zip(frame.index, frame['Potensi'].tolist(), frame['Realisasi'].tolist()):
+                kecamatan_id = self._kecamatan_id(str(name))
+                previous_potensi, previous_realisasi = latest.get(kecamatan_id, (potensi, realisasi))
+                rows.append((kecamatan_id, int(potensi), int(realisasi),
+                             int(potensi - previous_potensi), int(realisasi - previous_realisasi)))
+
+            self._connection.executemany(
+                'INSERT INTO snapshot_value VALUES (?, ?, ?, ?)',
+                [(snapshot_id, kecamatan_id, potensi, realisasi) for kecamatan_id, potensi, realisasi, _, _ in rows])
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO latest VALUES (?, ?, ?, ?)',
+                [(source, kecamatan_id, potensi, realisasi) for kecamatan_id, potensi, realisasi, _, _ in rows])
+            self._connection.executemany(
+                """INSERT INTO daily VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (source, day, kecamatan_id) DO UPDATE SET
+                       potensi = excluded.potensi,
+                       realisasi = excluded.realisasi,
+                       delta_potensi = delta_potensi + excluded.delta_potensi,
+                       delta_realisasi = delta_realisasi + excluded.delta_realisasi""",
+                [(source, day) + row for row in rows])
+        return snapshot_id
+
+    def snapshot_count(self, source):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM snapshot WHERE source = ?', (source,)).fetchone()[0]
+
+    def trend(self, source, period='D', kecamatan=None):
+        """Total per periode: Potensi & Realisasi (nilai akhir periode) serta delta dalam periode.
+
+        Kecamatan yang tidak muncul pada suatu hari memakai nilai terakhirnya.
+        """
+        query = ('SELECT day, kecamatan_id, potensi, realisasi, delta_potensi, delta_realisasi '
+                 'FROM daily WHERE source = ?')
+        params = [source]
+        if kecamatan is not None:
+            if kecamatan not in self._kecamatan_ids:
+                return _empty_trend()
+            query += ' AND kecamatan_id = ?'
+            params.append(self._kecamatan_ids[kecamatan])
+        with self._lock:
+            daily = pd.read_sql_query(query, self._connection, params=params)
+        if daily.empty:
+            return _empty_trend()
+
+        daily['Tanggal'] = pd.to_datetime(daily['day'].map(datetime.date.fromordinal))
+        levels = (daily.pivot(index='Tanggal', columns='kecamatan_id', values=['potensi', 'realisasi'])
+                  .sort_index().ffill().fillna(0))
+        totals = pd.DataFrame({
+            'Potensi': levels['potensi'].sum(axis=1),
+            'Realisasi': levels['realisasi'].sum(axis=1),
+        })
+        deltas = daily.groupby('Tanggal')[['delta_potensi', 'delta_realisasi']].sum()
+
+        grouper = pd.Grouper(freq=period, label='left', closed='left')
+        result = pd.concat([
+            totals.groupby(grouper).last(),
+            deltas.groupby(grouper).sum().rename(columns={
+                'delta_potensi': 'Delta Potensi', 'delta_realisasi': 'Delta Realisasi'}),
+        ], axis=1).dropna(subset=['Potensi'])
+        return result.astype(np.int64).rename_axis('Periode').reset_index()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _empty_trend():
+    return pd.DataFrame(columns=['Periode', 'Potensi', 'Realisasi', 'Delta Potensi', 'Delta Realisasi'])
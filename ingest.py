@@ -0,0 +1,526 @@
+import hashlib
+import io
+import os
+from collections import Counter, defaultdict
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from instrument import timed
+from pipeline import clean_desa_names, clean_kecamatan_names
+
+
+def clean_columns(columns):
+    """Nama kolom di-strip dan dijadikan huruf besar"""
+    return [str(col).strip().upper() for col in columns]
+
+
+def find_kecamatan_column(columns):
+    """Cari kolom kecamatan - prioritaskan nama yang persis sama"""
+    if 'KECAMATAN' in columns:
+        return 'KECAMATAN'
+    if 'KODE KECAMATAN' in columns:
+        return 'KODE KECAMATAN'
+    for c in columns:
+        if 'KEC' in c:
+            return c
+    return None
+
+
+def find_desa_column(columns):
+    """Kolom desa/kelurahan (tidak peka huruf besar/kecil), None jika tidak ada"""
+    names = {col: str(col).strip().upper() for col in columns}
+    for col, name in names.items():
+        if name in ('DESA', 'KELURAHAN', 'DESA/KELURAHAN', 'DESA_KELURAHAN', 'KEL/DESA'):
+            return col
+    for col, name in names.items():
+        if 'DESA' in name or 'KELURAHAN' in name:
+            return col
+    return None
+
+
+def find_kabupaten_column(columns):
+    """Kolom kabupaten/kota (tidak peka huruf besar/kecil), None jika tidak ada"""
+    names = {col: str(col).strip().upper() for col in columns}
+    for col, name in names.items():
+        if name in ('KABUPATEN', 'KOTA', 'KABUPATEN/KOTA', 'KABUPATEN_KOTA', 'KAB/KOTA', 'KAB', 'REGENCY'):
+            return col
+    for col, name in names.items():
+        if 'KABUPATEN' in name or 'KAB/KOTA' in name:
+            return col
+    return None
+
+
+def find_potensi_value_column(columns, kec_col):
+    """Kolom nilai potensi (numerik), None jika potensi dihitung dari jumlah baris"""
+    for col in columns:
+        if col != kec_col and ('POTENSI' in str(col).upper() or 'NILAI' in str(col).upper()):
+            return col
+    return None
+
+
+def detect_metric_columns(columns):
+    """Deteksi kolom kecamatan, potensi dan realisasi (opsional) dari nama kolom huruf kecil"""
+    kec_col = None
+    pot_col = None
+    real_col = None
+
+    # Detect kecamatan column
+    for c in columns:
+        if any(x in c for x in ['kec', 'wilayah', 'daerah', 'lokasi']):
+            kec_col = c
+            break
+
+    # Detect potensi column
+    for c in columns:
+        if any(x in c for x in ['potensi', 'pot', 'target', 'nilai']):
+            pot_col = c
+            break
+
+    # Detect realisasi column (optional)
+    for c in columns:
+        if any(x in c for x in ['realisasi', 'real', 'capaian', 'akuisisi']):
+            real_col = c
+            break
+
+    return kec_col, pot_col, real_col
+
+
+def find_coordinate_columns(columns):
+    """Kolom bujur (lon) dan lintang (lat), tidak peka huruf besar/kecil; None jika tidak ada"""
+    lon_col = None
+    lat_col = None
+    for col in columns:
+        name = str(col).strip().upper()
+        if lon_col is None and name in ('LON', 'LNG', 'LONG', 'LONGITUDE', 'BUJUR'):
+            lon_col = col
+        elif lat_col is None and name in ('LAT', 'LATITUDE', 'LINTANG'):
+            lat_col = col
+    return lon_col, lat_col
+
+
+def _coordinates(df, lon_col, lat_col):
+    lon = pd.to_numeric(df[lon_col], errors='coerce').to_numpy(dtype=np.float64)
+    lat = pd.to_numeric(df[lat_col], errors='coerce').to_numpy(dtype=np.float64)
+    return lon, lat
+
+
+def assign_kecamatan_by_location(df, kec_col, locator, default_col='KECAMATAN'):
+    """Isi kolom kecamatan dari koordinat lewat locator (lon, lat) -> nama.
+
+    Baris tanpa koordinat valid atau di luar peta tetap memakai teks
+    kecamatan aslinya. Return (df, kec_col, jumlah baris yang ditemukan
+    lewat koordinat); df tidak diubah jika tidak ada kolom koordinat.
+    """
+    lon_col, lat_col = find_coordinate_columns(df.columns)
+    if locator is None or not (lon_col and lat_col):
+        return df, kec_col, 0
+
+    names = locator(*_coordinates(df, lon_col, lat_col))
+    found = pd.notna(names)
+    if kec_col is None:
+        kec_col = default_col
+        original = np.full(len(df), None, dtype=object)
+    else:
+        original = df[kec_col].to_numpy(dtype=object)
+    df = df.assign(**{kec_col: np.where(found, names, original)})
+    return df, kec_col, int(found.sum())
+
+
+def _locate_frame(df, locator):
+    """assign_kecamatan_by_location untuk CSV/sheet biasa (nama kolom huruf kecil seperti di app)"""
+    if locator is None:
+        return df, 0
+    df = df.rename(columns=lambda col: str(col).lower())
+    kec_col, _, _ = detect_metric_columns(df.columns)
+    df, _, located = assign_kecamatan_by_location(df, kec_col, locator, default_col='kecamatan')
+    return df, located
+
+
+MISSING_KECAMATAN_MESSAGE = (
+    "Kolom KECAMATAN tidak ditemukan. Pastikan ada kolom dengan kata 'kecamatan', 'wilayah', atau 'daerah'")
+MISSING_POTENSI_MESSAGE = (
+    "Kolom POTENSI tidak ditemukan. Pastikan ada kolom dengan kata 'potensi', 'target', atau 'nilai'")
+
+
+@timed('merge')
+def merge_counts(potensi_count, akuisisi_count):
+    """Gabungkan agregat POTENSI & AKUISISI per kecamatan menjadi frame Kecamatan/Potensi/Realisasi"""
+    # Remove code prefixes and "Kecamatan" prefix (e.g., "320138 Kecamatan Cibinong")
+    # Varian nama yang bersih menjadi kecamatan yang sama dijumlahkan dulu, supaya merge tetap satu-ke-satu
+    potensi_count = potensi_count.assign(Kecamatan=clean_kecamatan_names(potensi_count['Kecamatan']))
+    akuisisi_count = akuisisi_count.assign(Kecamatan=clean_kecamatan_names(akuisisi_count['Kecamatan']))
+    potensi_count = potensi_count.groupby('Kecamatan', as_index=False, sort=False)['Potensi'].sum()
+    akuisisi_count = akuisisi_count.groupby('Kecamatan', as_index=False, sort=False)['Realisasi'].sum()
+
+    df = pd.merge(potensi_count, akuisisi_count, on='Kecamatan', how='outer').fillna(0)
+    df['Potensi'] = df['Potensi'].astype(int)
+    df['Realisasi'] = df['Realisasi'].astype(int)
+    return df
+
+
+def merge_desa_counts(potensi, akuisisi):
+    """Gabungkan Series agregat (index kecamatan, desa) menjadi frame Kecamatan/Desa/Potensi/Realisasi"""
+    df = pd.concat([potensi.rename('Potensi'), akuisisi.rename('Realisasi')], axis=1).fillna(0)
+    df.index.names = ['Kecamatan', 'Desa']
+    df = df.reset_index()
+    df['Kecamatan'] = clean_kecamatan_names(df['Kecamatan'])
+    df['Desa'] = clean_desa_names(df['Desa'])
+    df = df.groupby(['Kecamatan', 'Desa'], as_index=False, sort=False)[['Potensi', 'Realisasi']].sum()
+    df['Potensi'] = df['Potensi'].astype(int)
+    df['Realisasi'] = df['Realisasi'].astype(int)
+    return df
+
+
+def _missing_kecamatan_error(kec_col_pot, kec_col_aku):
+    return ValueError(f"Kolom kecamatan tidak ditemukan. Potensi: {kec_col_pot}, Akuisisi: {kec_col_aku}")
+
+
+@timed('excel')
+def read_potensi_akuisisi(file, locator=None):
+    """Baca sheet POTENSI & AKUISISI dengan pandas dan agregasi per kecamatan.
+
+    Mengembalikan (df, info) dengan info berisi kolom yang terdeteksi dan
+    agregat per sheet untuk preview. Dengan ``locator``, baris yang punya
+    koordinat lat/lon ditempatkan ke kecamatan lewat point-in-polygon.
+    """
+    df_potensi = pd.read_excel(file, sheet_name='POTENSI')
+    df_akuisisi = pd.read_excel(file, sheet_name='AKUISISI')
+
+    # Remove empty rows
+    df_potensi = df_potensi.dropna(how='all')
+    df_akuisisi = df_akuisisi.dropna(how='all')
+
+    # Clean column names
+    df_potensi.columns = clean_columns(df_potensi.columns)
+    df_akuisisi.columns = clean_columns(df_akuisisi.columns)
+
+    kec_col_pot = find_kecamatan_column(df_potensi.columns)
+    kec_col_aku = find_kecamatan_column(df_akuisisi.columns)
+    df_potensi, kec_col_pot, located_pot = assign_kecamatan_by_location(df_potensi, kec_col_pot, locator)
+    df_akuisisi, kec_col_aku, located_aku = assign_kecamatan_by_location(df_akuisisi, kec_col_aku, locator)
+    if not (kec_col_pot and kec_col_aku):
+        raise _missing_kecamatan_error(kec_col_pot, kec_col_aku)
+
+    # Remove rows where kecamatan is empty
+    df_potensi = df_potensi[df_potensi[kec_col_pot].notna()]
+    df_akuisisi = df_akuisisi[df_akuisisi[kec_col_aku].notna()]
+
+    potensi_value_col = find_potensi_value_column(df_potensi.columns, kec_col_pot)
+    if potensi_value_col:
+        # Sum the potensi values per kecamatan
+        values = pd.to_numeric(df_potensi[potensi_value_col], errors='coerce').fillna(0)
+        potensi_count = values.groupby(df_potensi[kec_col_pot]).sum().reset_index()
+    else:
+        # Count rows per kecamatan
+        potensi_count = df_potensi[kec_col_pot].value_counts().reset_index()
+    potensi_count.columns = ['Kecamatan', 'Potensi']
+
+    # For AKUISISI, always count rows (number of people acquired)
+    akuisisi_count = df_akuisisi[kec_col_aku].value_counts().reset_index()
+    akuisisi_count.columns = ['Kecamatan', 'Realisasi']
+
+    # Agregat per desa untuk drill-down, jika kedua sheet punya kolom desa
+    desa_col_pot = find_desa_column(df_potensi.columns)
+    desa_col_aku = find_desa_column(df_akuisisi.columns)
+    desa_count = None
+    if desa_col_pot and desa_col_aku:
+        potensi_values = values if potensi_value_col else pd.Series(1, index=df_potensi.index)
+        desa_count = merge_desa_counts(
+            potensi_values.groupby([df_potensi[kec_col_pot], df_potensi[desa_col_pot]]).sum(),
+            df_akuisisi.groupby([kec_col_aku, desa_col_aku]).size(),
+        )
+
+    df = merge_counts(potensi_count, akuisisi_count)
+    info = {
+        'potensi_columns': list(df_potensi.columns),
+        'akuisisi_columns': list(df_akuisisi.columns),
+        'potensi_value_col': potensi_value_col,
+        'potensi_count': potensi_count,
+        'akuisisi_count': akuisisi_count,
+        'located': located_pot + located_aku,
+        'desa_count': desa_count,
+    }
+    return df, info
+
+
+def _iter_sheet(workbook, sheet_name):
+    """Header (sudah dibersihkan) dan iterator baris sisanya dari sheet read-only"""
+    rows = workbook[sheet_name].iter_rows(values_only=True)
+    for header in rows:
+        if any(value is not None for value in header):
+            columns = [f"UNNAMED: {i}" if value is None else value for i, value in enumerate(header)]
+            return clean_columns(columns), rows
+    return [], iter(())
+
+
+def _to_number(value):
+    """Setara pd.to_numeric(errors='coerce').fillna(0) untuk satu sel"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return 0 if value != value else value
+    try:
+        number = float(str(value).strip())
+    except ValueError:
+        return 0
+    return 0 if number != number else number
+
+
+def _kecamatan_rows(rows, columns, kec_col, locator, stats, batch=100_000):
+    """(kecamatan, row) untuk setiap baris sheet.
+
+    Jika ada kolom koordinat dan locator, baris diproses per batch dan
+    kecamatan diambil dari point-in-polygon (teks asli jika titik di luar
+    peta); jumlah baris yang ditemukan ditambahkan ke stats['located'].
+    """
+    kec_idx = columns.index(kec_col) if kec_col else None
+    lon_col, lat_col = find_coordinate_columns(columns) if locator else (None, None)
+
+    def cell(row, idx):
+        return row[idx] if idx is not None and idx < len(row) else None
+
+    if not (lon_col and lat_col):
+        for row in rows:
+            yield cell(row, kec_idx), row
+        return
+
+    lon_idx = columns.index(lon_col)
+    lat_idx = columns.index(lat_col)
+    while True:
+        chunk = list(islice(rows, batch))
+        if not chunk:
+            return
+        coordinates = pd.DataFrame({
+            'lon': pd.Series([cell(row, lon_idx) for row in chunk], dtype=object),
+            'lat': pd.Series([cell(row, lat_idx) for row in chunk], dtype=object),
+        })
+        names = locator(*_coordinates(coordinates, 'lon', 'lat'))
+        stats['located'] += int(pd.notna(names).sum())
+        for row, name in zip(chunk, names):
+            yield (cell(row, kec_idx) if name is None else name), row
+
+
+def _pair_series(counts):
+    """Dict {(kecamatan, desa): nilai} -> Series dengan MultiIndex (boleh kosong)"""
+    keys = list(counts)
+    index = pd.MultiIndex.from_arrays([[k for k, _ in keys], [d for _, d in keys]])
+    return pd.Series([counts[key] for key in keys], index=index, dtype=float)
+
+
+@timed('excel')
+def stream_potensi_akuisisi(file, locator=None):
+    """Seperti read_potensi_akuisisi, tapi membaca baris demi baris (openpyxl read-only).
+
+    Hanya baris header yang dipakai untuk deteksi kolom; agregat per
+    kecamatan dibangun bertahap sehingga memori tidak bergantung pada
+    jumlah baris sheet. Hanya untuk file .xlsx.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        potensi_columns, potensi_rows = _iter_sheet(workbook, 'POTENSI')
+        akuisisi_columns, akuisisi_rows = _iter_sheet(workbook, 'AKUISISI')
+
+        kec_col_pot = find_kecamatan_column(potensi_columns)
+        kec_col_aku = find_kecamatan_column(akuisisi_columns)
+        if locator is not None:
+            # Sheet tanpa kolom kecamatan tetap bisa dipakai jika punya koordinat
+            if kec_col_pot is None and all(find_coordinate_columns(potensi_columns)):
+                kec_col_pot = 'KECAMATAN'
+            if kec_col_aku is None and all(find_coordinate_columns(akuisisi_columns)):
+                kec_col_aku = 'KECAMATAN'
+        if not (kec_col_pot and kec_col_aku):
+            raise _missing_kecamatan_error(kec_col_pot, kec_col_aku)
+
+        potensi_value_col = find_potensi_value_column(potensi_columns, kec_col_pot)
+        value_idx = potensi_columns.index(potensi_value_col) if potensi_value_col else None
+        stats = {'located': 0}
+
+        # Agregat per desa hanya jika kedua sheet punya kolom desa
+        desa_col_pot = find_desa_column(potensi_columns)
+        desa_col_aku = find_desa_column(akuisisi_columns)
+        with_desa = bool(desa_col_pot and desa_col_aku)
+        desa_idx_pot = potensi_columns.index(desa_col_pot) if with_desa else None
+        desa_idx_aku = akuisisi_columns.index(desa_col_aku) if with_desa else None
+        desa_potensi = defaultdict(int)
+        desa_akuisisi = Counter()
+
+        potensi = defaultdict(int)
+        potensi_kec_col = kec_col_pot if kec_col_pot in potensi_columns else None
+        for kecamatan, row in _kecamatan_rows(potensi_rows, potensi_columns, potensi_kec_col, locator, stats):
+            if kecamatan is None:
+                continue
+            if value_idx is None:
+                amount = 1
+            else:
+                value = row[value_idx] if value_idx < len(row) else None
+                amount = 0 if value is None else _to_number(value)
+            potensi[kecamatan] += amount
+            if with_desa and desa_idx_pot < len(row) and row[desa_idx_pot] is not None:
+                desa_potensi[(kecamatan, row[desa_idx_pot])] += amount
+
+        akuisisi = Counter()
+        akuisisi_kec_col = kec_col_aku if kec_col_aku in akuisisi_columns else None
+        for kecamatan, row in _kecamatan_rows(akuisisi_rows, akuisisi_columns, akuisisi_kec_col, locator, stats):
+            if kecamatan is None:
+                continue
+            akuisisi[kecamatan] += 1
+            if with_desa and desa_idx_aku < len(row) and row[desa_idx_aku] is not None:
+                desa_akuisisi[(kecamatan, row[desa_idx_aku])] += 1
+    finally:
+        workbook.close()
+
+    potensi_count = pd.DataFrame(list(potensi.items()), columns=['Kecamatan', 'Potensi'])
+    potensi_count = potensi_count.sort_values('Potensi', ascending=False, kind='stable').reset_index(drop=True)
+    akuisisi_count = pd.DataFrame(akuisisi.most_common(), columns=['Kecamatan', 'Realisasi'])
+
+    desa_count = None
+    if with_desa:
+        desa_count = merge_desa_counts(_pair_series(desa_potensi), _pair_series(desa_akuisisi))
+
+    df = merge_counts(potensi_count, akuisisi_count)
+    info = {
+        'potensi_columns': potensi_columns,
+        'akuisisi_columns': akuisisi_columns,
+        'potensi_value_col': potensi_value_col,
+        'potensi_count': potensi_count,
+        'akuisisi_count': akuisisi_count,
+        'located': stats['located'],
+        'desa_count': desa_count,
+    }
+    return df, info
+
+
+def excel_sheet_names(file, streaming=False):
+    """Daftar sheet; mode streaming tidak memuat isi workbook"""
+    if streaming:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True)
+        try:
+            return workbook.sheetnames
+        finally:
+            workbook.close()
+    return pd.ExcelFile(file).sheet_names
+
+
+def stream_csv(file, chunksize=250_000, progress=None, locator=None, stats=None):
+    """Baca CSV per chunk dan jumlahkan potensi/realisasi per kecamatan.
+
+    Header dibaca lebih dulu untuk deteksi kolom, lalu hanya kolom tersebut
+    yang dibaca (kecamatan sebagai category). Hasilnya frame kecil dengan
+    nama kolom huruf kecil yang sama seperti hasil deteksi, sehingga bisa
+    langsung diproses seperti CSV biasa. ``progress`` (opsional) dipanggil
+    dengan fraksi byte yang sudah dibaca. Dengan ``locator``, kecamatan
+    ditentukan dari kolom lat/lon per chunk; jumlah baris yang ditemukan
+    ditambahkan ke ``stats['located']``.
+    """
+    header = pd.read_csv(file, nrows=0).columns
+    file.seek(0)
+    original = {str(col).lower(): col for col in header}
+    kec_col, pot_col, real_col = detect_metric_columns(list(original))
+    coordinate_cols = [col for col in find_coordinate_columns(list(original)) if col] if locator else []
+    if len(coordinate_cols) < 2:
+        coordinate_cols = []
+    if not kec_col and not coordinate_cols:
+        raise ValueError(MISSING_KECAMATAN_MESSAGE)
+    if not pot_col:
+        raise ValueError(MISSING_POTENSI_MESSAGE)
+
+    value_cols = [col for col in (pot_col, real_col) if col]
+    read_cols = [col for col in [kec_col] + value_cols + coordinate_cols if col]
+    file.seek(0, 2)
+    total_bytes = file.tell() or 1
+    file.seek(0)
+
+    totals = None
+    reader = pd.read_csv(
+        file,
+        usecols=[original[col] for col in read_cols],
+        dtype={original[kec_col]: 'category'} if kec_col and not coordinate_cols else None,
+        chunksize=chunksize,
+        # Tiap chunk di-parse utuh supaya tipe kolom konsisten (memori tetap dibatasi chunksize)
+        low_memory=False,
+    )
+    for chunk in reader:
+        chunk.columns = [str(col).lower() for col in chunk.columns]
+        for col in value_cols:
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce', downcast='integer').fillna(0)
+        if coordinate_cols:
+            chunk, kec_col, located = assign_kecamatan_by_location(chunk, kec_col, locator, default_col='kecamatan')
+            if stats is not None:
+                stats['located'] = stats.get('located', 0) + located
+        partial = chunk.groupby(kec_col, observed=True)[value_cols].sum()
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+        if progress:
+            progress(min(file.tell() / total_bytes, 1.0))
+
+    if totals is None:
+        return pd.DataFrame(columns=[kec_col or 'kecamatan'] + value_cols)
+
+    # Gabungkan nama yang hanya beda spasi di awal/akhir
+    totals.index = totals.index.astype(str).str.strip()
+    totals = totals.groupby(level=0).sum()
+    return totals.reset_index().rename(columns={'index': kec_col})
+
+
+@timed('parse')
+def ingest_upload(file, name, streaming=False, sheet=None, progress=None, locator=None):
+    """Parse file upload (CSV/Excel) menjadi dict hasil ingest.
+
+    ``kind`` menunjukkan jalur yang dipakai: ``csv``, ``potensi_akuisisi``
+    atau ``sheet`` (satu sheet dipilih, default sheet pertama). Info deteksi
+    kolom dari jalur POTENSI/AKUISISI ikut disertakan. ``located`` adalah
+    jumlah baris yang kecamatannya ditentukan dari koordinat (``locator``).
+    """
+    if name.endswith('.csv'):
+        if streaming:
+            stats = {'located': 0}
+            df = stream_csv(file, progress=progress, locator=locator, stats=stats)
+            return {'kind': 'csv', 'streaming': True, 'df': df, 'located': stats['located']}
+        df, located = _locate_frame(pd.read_csv(file), locator)
+        return {'kind': 'csv', 'streaming': False, 'df': df, 'located': located}
+
+    # Mode streaming hanya untuk .xlsx (openpyxl read-only)
+    streaming = streaming and name.endswith('.xlsx')
+    sheet_names = excel_sheet_names(file, streaming=streaming)
+    file.seek(0)
+
+    # Check if we have POTENSI and AKUISISI sheets
+    if 'POTENSI' in sheet_names and 'AKUISISI' in sheet_names:
+        if streaming:
+            df, info = stream_potensi_akuisisi(file, locator=locator)
+        else:
+            df, info = read_potensi_akuisisi(file, locator=locator)
+        return dict(info, kind='potensi_akuisisi', streaming=streaming, df=df, sheet_names=sheet_names)
+
+    # Single sheet or different names
+    if sheet not in sheet_names:
+        sheet = sheet_names[0]
+    df, located = _locate_frame(pd.read_excel(file, sheet_name=sheet), locator)
+    return {'kind': 'sheet', 'streaming': False, 'df': df, 'sheet_names': sheet_names, 'sheet': sheet,
+            'located': located}
+
+
+def file_digest(data):
+    """SHA-256 isi file, dipakai sebagai key cache ingest"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def cached_ingest(cache, data, name, streaming=False, sheet=None, progress=None, locator=None):
+    """ingest_upload dengan cache berdasarkan hash isi file dan opsi ingest.
+
+    ``cache`` adalah LRUCache yang dipakai bersama, jadi df yang dikembalikan
+    selalu salinan; key ``cached`` bernilai True jika parsing dilewati.
+    """
+    key = (file_digest(data), os.path.splitext(name)[1].lower(), bool(streaming), sheet, locator is not None)
+    result = cache.get(key)
+    cached = result is not None
+    if not cached:
+        result = ingest_upload(io.BytesIO(data), name, streaming=streaming, sheet=sheet, progress=progress,
+                               locator=locator)
+        cache.put(key, result)
+    return dict(result, df=result['df'].copy(), cached=cached)
@@ -0,0 +1,263 @@
+import contextvars
+import cProfile
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+import pandas as pd
+
+# Kolom hasil per tahap (ms / KB)
+STAGE_FIELDS = ['calls', 'wall_ms', 'cpu_ms', 'alloc_kb', 'peak_kb']
+# Ukuran log JSON Lines sebelum dirotasi (satu cadangan .1)
+LOG_MAX_BYTES = 50 * 1024 ** 2
+
+_active = contextvars.ContextVar('stage_recorder', default=None)
+_inactive = nullcontext()
+
+# tracemalloc bersifat global untuk proses; dihitung pemakainya agar
+# session yang selesai tidak mematikan tracing session lain
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_log_lock = threading.Lock()
+# Profiler cProfile yang sedang aktif (satu per proses, mulai Python 3.12 ditolak
+# jika ada yang lain); pemiliknya dicatat agar profiler yang bocor bisa dimatikan
+_profile_lock = threading.Lock()
+_profile_owner = None
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+
+
+class StageRecorder:
+    """Pencatat waktu (wall & CPU thread) dan alokasi per tahap untuk satu rerun.
+
+    Tahap bersarang dicatat dengan nama bertitik, mis. 'map.matching'.
+    Alokasi diukur dengan tracemalloc (opsional, ada overhead) dan mencakup
+    thread lain yang berjalan bersamaan, jadi dibaca sebagai perkiraan.
+    Dengan profile_dir, seluruh rerun juga diprofil cProfile dan hasilnya
+    ditulis sebagai file .prof.
+    """
+
+    def __init__(self, memory=False, profile_dir=None):
+        self.memory = memory
+        self.profile_dir = profile_dir
+        self.profile_path = None
+        self.stages = {}
+        self.wall_ms = None
+        self._stack = []
+        self._token = None
+        self._profiler = None
+        self._thread = None
+        self._started = None
+
+    def start(self):
+        """Mulai pencatatan; pemanggilan kedua sebelum stop() diabaikan"""
+        if self._token is not None:
+            return self
+        self._started = time.perf_counter()
+        self._token = _active.set(self)
+        if self.memory:
+            _start_tracing()
+            tracemalloc.reset_peak()
+        if self.profile_dir:
+            self._start_profiler()
+        return self
+
+    def _start_profiler(self):
+        """Aktifkan cProfile jika tidak ada rerun lain yang sedang diprofil"""
+        global _profile_owner
+        with _profile_lock:
+            owner = _profile_owner
+            if owner is not None and owner._profiler is not None:
+                if owner._thread.is_alive() and owner._thread is not threading.current_thread():
+                    # Rerun lain sedang diprofil; rerun ini jalan tanpa profil
+                    return
+                # Rerun sebelumnya berhenti tanpa stop(): profilernya dimatikan tanpa dump
+                owner._profiler.disable()
+                owner._profiler = None
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Profiler di luar recorder sedang aktif di proses ini
+                return
+            self._profiler = profiler
+            self._thread = threading.current_thread()
+            _profile_owner = self
+
+    def stop(self):
+        """Hentikan pencatatan; return total wall time (ms)"""
+        global _profile_owner
+        if self._token is None:
+            return self.wall_ms
+        _active.reset(self._token)
+        self._token = None
+        if self.memory:
+            _stop_tracing()
+        with _profile_lock:
+            profiler, self._profiler = self._profiler, None
+            if _profile_owner is self:
+                _profile_owner = None
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+            self.profile_path = os.path.join(self.profile_dir, f"rerun-{stamp}.prof")
+            profiler.dump_stats(self.profile_path)
+        self.wall_ms = (time.perf_counter() - self._started) * 1000
+        return self.wall_ms
+
+    @contextmanager
+    def stage(self, name):
+        path = '.'.join([frame['name'] for frame in self._stack] + [name])
+        frame = {'name': name, 'peak': 0}
+        # Entry dibuat saat mulai agar urutan tabel mengikuti urutan tahap
+        entry = self.stages.setdefault(path, dict.fromkeys(STAGE_FIELDS, 0))
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Puncak induk sejauh ini disimpan sebelum peak di-reset untuk tahap ini
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['current'] = current
+        self._stack.append(frame)
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            self._stack.pop()
+            alloc = peak = 0
+            if self.memory:
+                current, traced_peak = tracemalloc.get_traced_memory()
+                peak = max(frame['peak'], traced_peak)
+                alloc = current - frame['current']
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+                tracemalloc.reset_peak()
+                peak -= frame['current']
+            entry['calls'] += 1
+            entry['wall_ms'] += wall * 1000
+            entry['cpu_ms'] += cpu * 1000
+            entry['alloc_kb'] += alloc / 1024
+            entry['peak_kb'] = max(entry['peak_kb'], peak / 1024)
+
+    def table(self):
+        """DataFrame satu baris per tahap, urut sesuai waktu mulai"""
+        rows = [{'stage': path, **{field: round(value, 1) for field, value in entry.items()}}
+                for path, entry in self.stages.items()]
+        return pd.DataFrame(rows, columns=['stage'] + STAGE_FIELDS)
+
+    def record(self, **context):
+        """Dict siap-JSON untuk log: waktu, total, tahap dan konteks (mis. session, sumber data)"""
+        return {
+            'timestamp': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'wall_ms': round(self.wall_ms or 0, 2),
+            'memory': self.memory,
+            'profile': self.profile_path,
+            'stages': {path: {field: round(value, 2) for field, value in entry.items()}
+                       for path, entry in self.stages.items()},
+            **context,
+        }
+
+
+def stage(name):
+    """Context manager tahap pada recorder aktif di thread/konteks ini; no-op jika tidak ada"""
+    recorder = _active.get()
+    return _inactive if recorder is None else recorder.stage(name)
+
+
+def timed(name):
+    """Decorator: seluruh pemanggilan fungsi dicatat sebagai tahap name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def append_log(path, record, max_bytes=LOG_MAX_BYTES):
+    """Tambahkan satu record sebagai satu baris JSON (JSON Lines).
+
+    Jika file sudah mencapai max_bytes, file dipindah ke path + '.1'
+    (menimpa cadangan sebelumnya) dan log dimulai ulang.
+    """
+    line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+    with _log_lock:
+        if max_bytes and os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+            os.replace(path, path + '.1')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+def read_log(path):
+    """Record dari file JSON Lines; baris rusak (mis. tulisan terpotong) dilewati"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def stage_percentiles(records, percentiles=(50, 95), field='wall_ms'):
+    """Persentil field per tahap dari banyak record (rerun); baris 'total' untuk seluruh rerun"""
+    if field in ('alloc_kb', 'peak_kb'):
+        # Rerun tanpa tracemalloc tidak punya angka memori
+        records = [record for record in records if record.get('memory')]
+    samples = {'total': [record['wall_ms'] for record in records]} if field == 'wall_ms' else {}
+    for record in records:
+        for path, entry in record.get('stages', {}).items():
+            samples.setdefault(path, []).append(entry[field])
+
+    rows = []
+    for path, values in samples.items():
+        if not values:
+            continue
+        row = {'stage': path, 'runs': len(values)}
+        for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+            row[f"p{percentile}"] = round(float(value), 1)
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['stage', 'runs'] + [f"p{p}" for p in percentiles])
+
+
+class RecentRuns:
+    """Record rerun terakhir (semua session di proses ini) untuk persentil di panel diagnostik"""
+
+    def __init__(self, max_runs=500):
+        self._records = deque(maxlen=max_runs)
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._records.append(record)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
@@ -0,0 +1,106 @@
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from choropleth import FEATURE_TEMPLATE_JS, feature_key, feature_properties
+
+# Komponen tanpa build step: satu file HTML yang berbicara langsung dengan
+# protokol postMessage Streamlit
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'livemap')
+_livemap = components.declare_component('livemap', path=_FRONTEND_DIR)
+
+
+def geometry_payload(boundaries):
+    """FeatureCollection berisi geometry dan key saja (dikirim sekali per session)"""
+    features = []
+    for index, properties in enumerate(boundaries.properties):
+        geometry = boundaries.geometry(index)
+        if geometry:
+            features.append({
+                'type': 'Feature',
+                'properties': {'key': feature_key(properties, index)},
+                'geometry': geometry,
+            })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def build_live_update(boundaries, df, matcher, palette, progress_color):
+    """Payload data per key (properties + style), tanpa koordinat.
+
+    Bentuk hasil sama dengan render_choropleth ('data' menggantikan 'html'),
+    sehingga bisa di-cache dengan cara yang sama.
+    """
+    properties_list, styles, unmatched = feature_properties(
+        boundaries.properties, df, matcher, palette, progress_color)
+    data = {
+        properties['key']: {'properties': properties, 'style': styles[properties['key']]}
+        for properties in properties_list
+    }
+    return {
+        'data': data,
+        'matched': len(properties_list) - len(unmatched),
+        'unmatched': unmatched,
+        'report': matcher.report(),
+        'unused': matcher.unused,
+        'ambiguous': matcher.ambiguous,
+    }
+
+
+def view_id(location, zoom):
+    """Id view awal; browser hanya memindahkan peta jika id ini berubah"""
+    return f"{location[0]:.6f},{location[1]:.6f},{zoom}"
+
+
+def live_viewport(location, zoom, key='livemap'):
+    """(bounds, zoom) viewport terakhir yang dilaporkan browser untuk view ini, atau None.
+
+    Viewport dari view sebelumnya (mis. kabupaten lain) diabaikan.
+    """
+    value = st.session_state.get(key) or {}
+    if value.get('view') != view_id(location, zoom) or not value.get('bounds'):
+        return None
+    return tuple(value['bounds']), value['zoom']
+
+
+def live_choropleth(geometry_id, geometry, data, location, zoom, tiles='OpenStreetMap', height=600,
+                    key='livemap', boxes=None):
+    """Tampilkan peta yang geometry-nya dikirim sekali; rerun berikutnya hanya mengirim data.
+
+    geometry adalah callable yang hanya dipanggil saat geometry perlu dikirim:
+    geometry_id baru, atau browser meminta ulang (iframe dibuat ulang dan
+    kehilangan layer-nya). Nilai kembalian adalah dict dari browser; key
+    'clicked' berisi key feature (GID_3) yang terakhir diklik, 'bounds' dan
+    'zoom' berisi viewport terakhir (lihat live_viewport).
+
+    Viewport hanya dilaporkan jika boxes (RegionIndex.boxes) diberikan, dan
+    hanya jika zoom atau himpunan bbox yang terlihat berubah, supaya pan
+    kecil tidak memicu rerun. boxes dikirim bersama geometry.
+    """
+    sent = st.session_state.setdefault(f'_{key}_sent', {'geometry_id': None, 'nonce': None})
+    request = st.session_state.get(key) or {}
+    resend = request.get('missing') == geometry_id and request.get('nonce') != sent['nonce']
+    send_geometry = sent['geometry_id'] != geometry_id or resend
+    if send_geometry:
+        sent['geometry_id'] = geometry_id
+        sent['nonce'] = request.get('nonce')
+
+    import folium
+
+    tile_layer = folium.TileLayer(tiles)
+    return _livemap(
+        geometry_id=geometry_id,
+        view_id=view_id(location, zoom),
+        geometry=geometry() if send_geometry else None,
+        template=FEATURE_TEMPLATE_JS if send_geometry else None,
+        track_viewport=boxes is not None,
+        boxes=boxes if send_geometry else None,
+        data=data,
+        location=list(location),
+        zoom=zoom,
+        tiles=tile_layer.tiles,
+        attribution=tile_layer.options.get('attribution', ''),
+        height=height,
+        key=key,
+        default=None,
+    )
@@ -0,0 +1,279 @@
+import re
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+# Ejaan alternatif yang sering muncul di data lapangan -> nama baku (sudah dinormalisasi)
+ALIASES = {
+    'darmaga': 'dramaga',
+    'klapanunggal': 'kelapanunggal',
+    'bojonggde': 'bojonggede',
+    'citeurep': 'citeureup',
+    'cibungbulan': 'cibungbulang',
+    'parungpanjan': 'parungpanjang',
+    'tanjungsri': 'tanjungsari',
+    'megamendun': 'megamendung',
+    'gunungputeri': 'gunungputri',
+}
+
+# Nilai kosong pada atribut GADM
+_EMPTY_VALUES = {'', 'na', 'none', 'nan'}
+
+
+def normalize_name(name):
+    """Normalize nama kecamatan untuk matching"""
+    return name.lower().strip().replace(" ", "").replace("-", "")
+
+
+def canonical_name(name):
+    """Nama ternormalisasi setelah diterjemahkan lewat tabel alias"""
+    normalized = normalize_name(str(name))
+    return ALIASES.get(normalized, normalized)
+
+
+def _ngrams(text, n):
+    padded = f"{' ' * (n - 1)}{text}{' ' * (n - 1)}"
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def feature_keys(properties):
+    """Kandidat key dari properties GeoJSON, urut dari yang paling dipercaya"""
+    keys = []
+    for field in ('NAME_3', 'name', 'NAMOBJ'):
+        value = properties.get(field)
+        if value and str(value).strip().lower() not in _EMPTY_VALUES:
+            keys.append(('exact', canonical_name(value)))
+    # VARNAME_3 bisa berisi beberapa nama dipisah "|"
+    for value in str(properties.get('VARNAME_3') or '').split('|'):
+        if value.strip().lower() not in _EMPTY_VALUES:
+            keys.append(('alias', canonical_name(value)))
+    for field in ('CC_3', 'HASC_3'):
+        value = properties.get(field)
+        if value and str(value).strip().lower() not in _EMPTY_VALUES:
+            keys.append(('code', str(value).strip().lower()))
+    return keys
+
+
+def canonical_regency(name):
+    """Nama kabupaten/kota ternormalisasi: 'Kab. Bogor', 'Kabupaten Bogor' dan 'Bogor' sama, 'Kota Bogor' beda"""
+    if name is None or str(name).strip().lower() in _EMPTY_VALUES:
+        return ''
+    name = re.sub(r'(?i)^\s*(kabupaten|kab\.?)\s+|\s+regency\s*$', '', str(name))
+    name = re.sub(r'(?i)^\s*(.+?)\s+city\s*$', r'kota \1', name)
+    return normalize_name(name)
+
+
+def feature_regency(properties):
+    """Kabupaten/kota feature (NAME_2 GADM) ternormalisasi; '' jika tidak ada"""
+    return canonical_regency(properties.get('NAME_2'))
+
+
+def ambiguous_names(properties_list):
+    """Nama kecamatan (ternormalisasi) yang dipakai feature di lebih dari satu kabupaten/kota (GID_2)"""
+    regencies = defaultdict(set)
+    for properties in properties_list:
+        regency = properties.get('GID_2') or properties.get('NAME_2')
+        for method, key in feature_keys(properties):
+            if method == 'exact':
+                regencies[key].add(regency)
+    return frozenset(key for key, found in regencies.items() if len(found) > 1)
+
+
+class KecamatanMatcher:
+    """Index nama/kode kecamatan -> posisi baris DataFrame.
+
+    Dibangun sekali per DataFrame. Lookup exact memakai dict, sedangkan nama
+    yang tidak ketemu dicocokkan lewat index n-gram karakter.
+
+    Dengan regencies (kabupaten per baris), baris hanya dicocokkan ke feature
+    di kabupaten yang sama. Nama di ambiguous (nama kecamatan yang ada di
+    beberapa kabupaten, lihat ambiguous_names) hanya dicocokkan lewat kode
+    atau ke baris yang kabupatennya diketahui; sisanya tidak diwarnai dan
+    dilaporkan di self.ambiguous, karena polygon yang benar tidak bisa
+    ditentukan dari nama saja.
+    """
+
+    def __init__(self, names, regencies=None, ambiguous=frozenset(), ngram=3, threshold=0.55):
+        self.names = [str(name) for name in names]
+        # Kabupaten ternormalisasi per baris ('' = tidak diketahui); None jika data tanpa kolom kabupaten
+        self.regencies = None if regencies is None else [canonical_regency(name) for name in regencies]
+        self._scoped = self.regencies is not None
+        self.ambiguous_names = frozenset(ambiguous)
+        self.ngram = ngram
+        self.threshold = threshold
+
+        # key -> posisi baris, urut baris; yang pertama (di kabupaten yang cocok) menang
+        self.index = defaultdict(list)
+        for position, name in enumerate(self.names):
+            keys = [canonical_name(name)]
+            # Kolom "KODE KECAMATAN" berisi kode angka, kadang diikuti nama
+            code = re.match(r'^(\d+)\s*(.*)$', name.strip())
+            if code:
+                keys.append(code.group(1))
+                if code.group(2):
+                    keys.append(canonical_name(code.group(2)))
+            for key in dict.fromkeys(keys):
+                self.index[key].append(position)
+        self.index = dict(self.index)
+
+        # Index n-gram per key (bukan per baris): satu baris bisa punya beberapa key,
+        # mis. "320138cibinong" dan "cibinong", dan skor Dice dihitung per key
+        self.gram_index = defaultdict(set)
+        self.gram_keys = []  # (posisi baris, jumlah n-gram) per key
+        for key, positions in self.index.items():
+            if key.isdigit():
+                continue
+            grams = _ngrams(key, ngram)
+            key_id = len(self.gram_keys)
+            self.gram_keys.append((positions, len(grams)))
+            for gram in grams:
+                self.gram_index[gram].add(key_id)
+
+        self.report_rows = []
+        self.unused = list(self.names)
+        self.ambiguous_rows = frozenset()
+        self.ambiguous = []
+
+    def _regency(self, position):
+        return self.regencies[position] if self._scoped else ''
+
+    def _is_ambiguous(self, properties):
+        return bool(self.ambiguous_names) and any(
+            method == 'exact' and key in self.ambiguous_names for method, key in feature_keys(properties))
+
+    def _candidate(self, positions, scope, strict, exclude=()):
+        """Baris pertama di positions yang boleh dipakai feature di kabupaten scope.
+
+        strict: nama feature ambigu, hanya baris dengan kabupaten yang sama yang diterima.
+        """
+        for position in positions:
+            if position in exclude:
+                continue
+            regency = self._regency(position)
+            if strict and not (regency and regency == scope):
+                continue
+            if regency and scope and regency != scope:
+                continue
+            return position
+        return None
+
+    def lookup(self, properties):
+        """Cari baris lewat key exact/alias/kode, kembalikan (posisi, metode).
+
+        Metode 'ambigu' (posisi None) jika nama cocok tetapi kabupatennya tidak
+        bisa dipastikan.
+        """
+        scope = feature_regency(properties)
+        ambiguous = self._is_ambiguous(properties)
+        blocked = False
+        for method, key in feature_keys(properties):
+            positions = self.index.get(key, ())
+            strict = ambiguous and method != 'code'
+            position = self._candidate(positions, scope, strict)
+            if position is not None:
+                if method == 'exact' and key != normalize_name(self.names[position]):
+                    method = 'alias'
+                return position, method
+            blocked = blocked or (strict and bool(positions))
+        return None, ('ambigu' if blocked else None)
+
+    def fuzzy_lookup(self, properties, exclude=()):
+        """Cari baris paling mirip berdasarkan koefisien Dice n-gram (skor terbaik dari key-key baris itu)"""
+        best_position, best_score = None, 0.0
+        if self._is_ambiguous(properties):
+            return best_position, best_score
+        scope = feature_regency(properties)
+        for method, key in feature_keys(properties):
+            if method == 'code':
+                continue
+            grams = _ngrams(key, self.ngram)
+            shared = Counter()
+            for gram in grams:
+                for key_id in self.gram_index.get(gram, ()):
+                    shared[key_id] += 1
+            for key_id, count in shared.items():
+                positions, size = self.gram_keys[key_id]
+                position = self._candidate(positions, scope, False, exclude)
+                if position is None:
+                    continue
+                score = 2 * count / (len(grams) + size)
+                if score > best_score:
+                    best_position, best_score = position, score
+        if best_score >= self.threshold:
+            return best_position, best_score
+        return None, best_score
+
+    def match_features(self, features):
+        """match_properties untuk list feature GeoJSON"""
+        return self.match_properties([feature.get('properties') or {} for feature in features])
+
+    def match_properties(self, properties_list):
+        """Cocokkan properties semua feature, kembalikan list posisi baris (None jika tidak ada).
+
+        Pass pertama memakai lookup exact; fuzzy hanya dipakai untuk feature
+        sisa dan hanya ke baris yang belum terpakai, supaya satu baris tidak
+        menempel ke dua polygon. Baris bernama ambigu tanpa kabupaten tidak
+        ikut fuzzy dan dicatat di self.ambiguous.
+        """
+        if self.regencies is not None:
+            # Kolom kabupaten yang tidak satu pun cocok dengan NAME_2 peta (ejaan lain) diabaikan,
+            # daripada membuat semua baris gagal dicocokkan
+            regencies = {feature_regency(properties) for properties in properties_list}
+            self._scoped = bool(regencies & set(self.regencies) - {''})
+        positions = []
+        methods = []
+        scores = []
+        for properties in properties_list:
+            position, method = self.lookup(properties)
+            positions.append(position)
+            methods.append(method)
+            scores.append(1.0 if position is not None else 0.0)
+
+        claimed = {position for position in positions if position is not None}
+        blocked = {position for key in self.ambiguous_names for position in self.index.get(key, ())
+                   if not self._regency(position)}
+        excluded = claimed | blocked
+        for i, properties in enumerate(properties_list):
+            if positions[i] is not None or methods[i] == 'ambigu':
+                continue
+            position, score = self.fuzzy_lookup(properties, exclude=excluded)
+            scores[i] = score
+            if position is not None:
+                positions[i] = position
+                methods[i] = 'fuzzy'
+                claimed.add(position)
+                excluded.add(position)
+
+        self.report_rows = []
+        for properties, position, method, score in zip(properties_list, positions, methods, scores):
+            self.report_rows.append({
+                'Feature': properties.get('NAME_3') or properties.get('name') or properties.get('NAMOBJ'),
+                'GID_3': properties.get('GID_3'),
+                'Kecamatan Data': self.names[position] if position is not None else None,
+                'Metode': method or 'tidak cocok',
+                'Skor': round(score, 2),
+            })
+        self.unused = [name for position, name in enumerate(self.names)
+                       if position not in claimed and position not in blocked]
+        self.ambiguous_rows = frozenset(blocked - claimed)
+        self.ambiguous = list(dict.fromkeys(self.names[position] for position in sorted(self.ambiguous_rows)))
+        return positions
+
+    def representatives(self):
+        """Untuk setiap baris: posisi baris pertama dengan nama (dan kabupaten) yang sama.
+
+        Baris duplikat tidak dicocokkan sendiri (baris pertama menang), jadi
+        pemakai seperti rollup mengikuti hasil baris pertamanya.
+        """
+        first = {}
+        return [first.setdefault((canonical_name(name), self._regency(position)), position)
+                for position, name in enumerate(self.names)]
+
+    def report(self):
+        """Laporan pencocokan per feature sebagai DataFrame"""
+        return pd.DataFrame(self.report_rows, columns=['Feature', 'GID_3', 'Kecamatan Data', 'Metode', 'Skor'])
+
+
+def frame_matcher(df, ambiguous=frozenset()):
+    """KecamatanMatcher untuk frame metrik; kolom Kabupaten (jika ada) membedakan nama kecamatan ganda"""
+    return KecamatanMatcher(df['Kecamatan'], df['Kabupaten'] if 'Kabupaten' in df.columns else None, ambiguous)
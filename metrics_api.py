@@ -0,0 +1,215 @@
+import csv
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import MappingProxyType
+from urllib.parse import parse_qs, urlparse
+
+from cache import fingerprint, frame_fingerprint
+from choropleth import feature_name
+from core import summarize
+from matching import frame_matcher
+
+# Kolom tabel metrik yang dipublikasikan
+API_COLUMNS = ['Kecamatan', 'Potensi', 'Realisasi', 'Sisa', 'Persentase']
+# Respons lebih kecil dari ini tidak di-gzip (header gzip lebih besar dari hematnya)
+GZIP_MIN_BYTES = 512
+CONTENT_TYPES = {'json': 'application/json; charset=utf-8', 'csv': 'text/csv; charset=utf-8'}
+
+
+def unmatched_names(df, boundaries):
+    """Kecamatan di data tanpa batas di peta, dan kecamatan di peta tanpa data"""
+    matcher = frame_matcher(df)
+    positions = matcher.match_properties(boundaries.properties)
+    return {
+        'data': list(matcher.unused),
+        'map': [feature_name(properties) for properties, position in zip(boundaries.properties, positions)
+                if position is None],
+    }
+
+
+def _csv_bytes(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def _json_bytes(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _response(name, kind, body, digest):
+    """Body mentah + gzip beserta ETag per representasi (ETag berbeda untuk versi gzip)"""
+    compressed = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+    return MappingProxyType({
+        'content_type': CONTENT_TYPES[kind],
+        'body': body,
+        'etag': f'"{digest}-{name}.{kind}"',
+        'gzip': compressed,
+        'gzip_etag': f'"{digest}-{name}.{kind}-gz"',
+    })
+
+
+def build_snapshot(df, unmatched=None, source=None, updated_at=None):
+    """Semua respons API (JSON & CSV, mentah & gzip) dari frame metrik, dibuat sekali per perubahan data.
+
+    Return dict read-only {(nama, format): respons}; request hanya memilih
+    bytes yang sudah jadi, tanpa pandas maupun serialisasi.
+    """
+    frame = df[API_COLUMNS]
+    digest = hashlib.sha256(fingerprint(frame_fingerprint(frame), unmatched).encode('ascii')).hexdigest()[:20]
+    updated_at = time.time() if updated_at is None else updated_at
+    meta = {'version': digest, 'source': source, 'updated_at': round(updated_at, 3)}
+
+    rows = list(zip(frame['Kecamatan'].astype(str).tolist(), frame['Potensi'].astype(int).tolist(),
+                    frame['Realisasi'].astype(int).tolist(), frame['Sisa'].astype(int).tolist(),
+                    frame['Persentase'].astype(float).round(2).tolist()))
+    records = [dict(zip(('kecamatan', 'potensi', 'realisasi', 'sisa', 'persentase'), row)) for row in rows]
+    totals = summarize(df)
+    totals = dict(totals, capaian=round(totals['capaian'], 2), kecamatan=len(rows))
+    unmatched = unmatched or {'data': [], 'map': []}
+
+    responses = {
+        ('metrics', 'json'): _json_bytes(dict(meta, data=records)),
+        ('metrics', 'csv'): _csv_bytes(API_COLUMNS, rows),
+        ('totals', 'json'): _json_bytes(dict(meta, data=totals)),
+        ('totals', 'csv'): _csv_bytes(list(totals), [list(totals.values())]),
+        ('unmatched', 'json'): _json_bytes(dict(meta, data=unmatched)),
+        ('unmatched', 'csv'): _csv_bytes(['kecamatan', 'masalah'],
+                                         [(name, 'tanpa batas peta') for name in unmatched['data']]
+                                         + [(name, 'tanpa data') for name in unmatched['map']]),
+        ('health', 'json'): _json_bytes(dict(meta, status='ok', kecamatan=len(rows))),
+    }
+    return MappingProxyType({
+        'version': digest,
+        'updated_at': updated_at,
+        'responses': MappingProxyType({key: _response(key[0], key[1], body, digest)
+                                       for key, body in responses.items()}),
+    })
+
+
+class MetricsStore:
+    """Snapshot API terbaru; dibangun ulang hanya jika metrik atau batas peta berubah.
+
+    publish boleh dipanggil berulang (mis. dari listener RefreshScheduler):
+    fingerprint input dibandingkan dulu, matching dan serialisasi hanya
+    jalan saat berubah.
+    Snapshot diganti secara atomik, jadi thread server tidak perlu lock.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._key = None
+        self._lock = threading.Lock()
+
+    def publish(self, df, boundaries=None, source=None, updated_at=None):
+        """Perbarui snapshot; return True jika dibangun ulang"""
+        key = (frame_fingerprint(df[API_COLUMNS]), boundaries.fingerprint if boundaries is not None else None,
+               source)
+        with self._lock:
+            if key == self._key:
+                return False
+            unmatched = unmatched_names(df, boundaries) if boundaries is not None else None
+            self._snapshot = build_snapshot(df, unmatched, source=source, updated_at=updated_at)
+            self._key = key
+        return True
+
+    def snapshot(self):
+        return self._snapshot
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+def _accepts_gzip(header):
+    """True jika Accept-Encoding mengizinkan gzip (q > 0); token 'gzip;q=0' berarti ditolak"""
+    explicit = wildcard = None
+    for token in (header or '').split(','):
+        coding, _, params = token.partition(';')
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding in ('gzip', 'x-gzip'):
+            explicit = q if explicit is None else max(explicit, q)
+        elif coding == '*':
+            wildcard = q
+    q = explicit if explicit is not None else wildcard
+    return q is not None and q > 0
+
+
+def make_handler(store):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Header dan body dikirim terpisah; tanpa ini keep-alive tertahan delayed ACK (~40 ms/request)
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self._serve(head=False)
+
+        def do_HEAD(self):
+            self._serve(head=True)
+
+        def _serve(self, head):
+            url = urlparse(self.path)
+            name, _, kind = url.path.strip('/').partition('.')
+            kind = kind or parse_qs(url.query).get('format', ['json'])[0]
+            snapshot = store.snapshot()
+            if snapshot is None:
+                self._send(503, CONTENT_TYPES['json'], b'{"status":"loading"}', head=head)
+                return
+            response = snapshot['responses'].get((name or 'metrics', kind))
+            if response is None:
+                self._send(404, CONTENT_TYPES['json'], b'{"status":"not_found"}', head=head)
+                return
+
+            use_gzip = response['gzip'] is not None and _accepts_gzip(self.headers.get('Accept-Encoding'))
+            etag = response['gzip_etag'] if use_gzip else response['etag']
+            if _etag_matches(self.headers.get('If-None-Match'), etag):
+                self._send(304, response['content_type'], b'', etag=etag, head=True)
+                return
+            self._send(200, response['content_type'], response['gzip'] if use_gzip else response['body'],
+                       etag=etag, encoding='gzip' if use_gzip else None, head=head)
+
+        def _send(self, code, content_type, body, etag=None, encoding=None, head=False):
+            self.send_response(code)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+            if etag:
+                self.send_header('ETag', etag)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(store, host='127.0.0.1', port=8502):
+    """Jalankan server API di thread latar belakang; return server. port=0 memilih port bebas."""
+    server = ThreadingHTTPServer((host, port), make_handler(store))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-api', daemon=True).start()
+    return server
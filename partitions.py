@@ -0,0 +1,114 @@
+import json
+import os
+
+import numpy as np
+
+from boundaryfile import COMPACT_SUFFIX, load_compact, save_compact
+from cache import LRUCache
+from geostore import BoundarySet
+from matching import KecamatanMatcher
+from pipeline import compute_metrics
+from topology import SIMPLIFY_TOLERANCES
+
+INDEX_FILE = 'index.json'
+
+# Field desa (GADM level 4) -> field kecamatan yang dibaca matcher dan choropleth,
+# sehingga peta desa memakai jalur render yang sama dengan peta kecamatan
+DESA_FIELDS = {'GID_4': 'GID_3', 'NAME_4': 'NAME_3', 'VARNAME_4': 'VARNAME_3', 'CC_4': 'CC_3',
+               'TYPE_4': 'TYPE_3', 'ENGTYPE_4': 'ENGTYPE_3'}
+
+
+def desa_properties(properties):
+    """Properties desa dengan field *_4 dipetakan ke *_3; kecamatan induk di PARENT_GID/PARENT_NAME"""
+    result = {target: properties[source] for source, target in DESA_FIELDS.items() if source in properties}
+    result['PARENT_GID'] = properties.get('GID_3')
+    result['PARENT_NAME'] = properties.get('NAME_3')
+    return result
+
+
+def write_partitions(boundaries, directory, tolerances=SIMPLIFY_TOLERANCES):
+    """Pecah batas desa (GADM level 4) menjadi satu file ringkas (.bnd) per kecamatan (GID_3).
+
+    Menulis juga index.json (gid -> file, nama, jumlah desa, bounds) yang
+    cukup untuk menampilkan pilihan kecamatan tanpa membuka partisi.
+    """
+    os.makedirs(directory, exist_ok=True)
+    groups = {}
+    for feature, properties in enumerate(boundaries.properties):
+        gid = properties.get('GID_3')
+        if gid:
+            groups.setdefault(gid, []).append(feature)
+
+    all_bounds = boundaries.bounds()
+    index = {}
+    for gid, features in sorted(groups.items()):
+        partition = BoundarySet.from_geojson({'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature',
+             'properties': desa_properties(boundaries.properties[feature]),
+             'geometry': boundaries.geometry(feature)}
+            for feature in features
+        ]})
+        filename = f"{gid}{COMPACT_SUFFIX}"
+        save_compact(os.path.join(directory, filename), partition, tolerances)
+        bounds = all_bounds[features]
+        index[gid] = {
+            'file': filename,
+            'name': boundaries.properties[features[0]].get('NAME_3'),
+            'features': len(features),
+            'bounds': [float(np.nanmin(bounds[:, 0])), float(np.nanmin(bounds[:, 1])),
+                       float(np.nanmax(bounds[:, 2])), float(np.nanmax(bounds[:, 3]))],
+        }
+
+    with open(os.path.join(directory, INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    return index
+
+
+class PartitionStore:
+    """Batas desa per kecamatan yang dibaca dari disk hanya saat dibutuhkan.
+
+    Hanya index.json yang dibaca di awal. Partisi yang sudah dibuka disimpan
+    di LRU (dibatasi jumlah dan ukuran array), jadi kecamatan yang sering
+    dibuka tidak dibaca ulang dan memori tetap terbatas.
+    """
+
+    def __init__(self, directory, max_entries=8, max_bytes=64 * 1024 ** 2):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE), 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+        self.cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=lambda levels: levels.nbytes)
+
+    def __contains__(self, gid):
+        return gid in self.index
+
+    def names(self):
+        """Dict gid -> nama kecamatan, urut nama"""
+        return dict(sorted(((gid, entry['name']) for gid, entry in self.index.items()), key=lambda item: item[1]))
+
+    def bounds(self, gid):
+        return self.index[gid]['bounds']
+
+    def load(self, gid):
+        """Level (toleransi, BoundarySet) batas desa satu kecamatan; KeyError jika gid tidak ada"""
+        levels = self.cache.get(gid)
+        if levels is None:
+            levels = load_compact(os.path.join(self.directory, self.index[gid]['file']))
+            self.cache.put(gid, levels)
+        return levels
+
+
+def desa_metrics(desa_count, kecamatan_properties):
+    """Metrik desa untuk satu kecamatan, dengan kolom Kecamatan berisi nama desa.
+
+    desa_count berisi Kecamatan/Desa/Potensi/Realisasi; kecamatannya dicari
+    lewat matcher (exact/alias, lalu fuzzy) dari properties kecamatan peta.
+    Bentuk hasil sama dengan prepare_metrics sehingga bisa langsung dirender.
+    """
+    names = desa_count['Kecamatan'].drop_duplicates()
+    matcher = KecamatanMatcher(names)
+    position = matcher.match_properties([kecamatan_properties])[0]
+    if position is None:
+        return None
+    rows = desa_count[desa_count['Kecamatan'] == names.iloc[position]]
+    df = rows[['Desa', 'Potensi', 'Realisasi']].rename(columns={'Desa': 'Kecamatan'}).reset_index(drop=True)
+    return compute_metrics(df)
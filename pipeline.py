@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+PROGRESS_COLORS = ['#28a745', '#ffc107', '#dc3545']  # Hijau, Kuning, Merah
+NO_DATA_COLOR = '#e0e0e0'  # Abu-abu (tidak ada data)
+
+# Kolom tabel monitoring
+TABLE_COLUMNS = ['Kecamatan', 'Potensi', 'Realisasi', 'Sisa', 'Persentase']
+# Filter band capaian (sama dengan warna progress): label -> [batas bawah, batas atas)
+CAPAIAN_BANDS = {
+    '🟢 ≥80%': (80, np.inf),
+    '🟡 50-79%': (50, 80),
+    '🔴 <50%': (-np.inf, 50),
+}
+# Pilihan urutan tabel monitoring: label -> (kolom, ascending)
+TABLE_SORTS = {
+    'Capaian tertinggi': ('Persentase', False),
+    'Capaian terendah': ('Persentase', True),
+    'Sisa terbesar': ('Sisa', False),
+    'Potensi terbesar': ('Potensi', False),
+    'Nama kecamatan (A-Z)': ('Kecamatan', True),
+}
+
+
+def get_color_by_percentage(persen):
+    """Warna berdasarkan persentase realisasi (untuk progress bar)"""
+    if persen >= 80:
+        return PROGRESS_COLORS[0]
+    elif persen >= 50:
+        return PROGRESS_COLORS[1]
+    elif persen > 0:
+        return PROGRESS_COLORS[2]
+    else:
+        return NO_DATA_COLOR
+
+
+def colors_by_percentage(persen):
+    """Versi vektor dari get_color_by_percentage"""
+    persen = np.asarray(persen, dtype=float)
+    return np.select([persen >= 80, persen >= 50, persen > 0], PROGRESS_COLORS, NO_DATA_COLOR)
+
+
+def clean_kecamatan_names(names):
+    """Buang prefix kode angka (mis. "320138 ") dan kata "Kecamatan" dari nama"""
+    return (
+        names.astype(str)
+        .str.strip()
+        .str.replace(r'^\d+\s*', '', regex=True)
+        .str.replace(r'(?i)^kecamatan\s+', '', regex=True)
+        .str.strip()
+    )
+
+
+def clean_desa_names(names):
+    """Buang prefix kode angka dan kata "Desa"/"Kelurahan"/"Kel." dari nama desa"""
+    return (
+        names.astype(str)
+        .str.strip()
+        .str.replace(r'^\d+\s*', '', regex=True)
+        .str.replace(r'(?i)^(desa|kelurahan|kel\.)\s*', '', regex=True)
+        .str.strip()
+    )
+
+
+def normalize_names(names):
+    """Versi vektor dari matching.normalize_name"""
+    return names.str.lower().str.strip().str.replace(r'[ \-]', '', regex=True)
+
+
+def prepare_metrics(df, kec_col, pot_col, real_col=None, kab_col=None):
+    """Ambil kolom kecamatan/potensi/realisasi (dan kabupaten, opsional) lalu hitung Sisa dan Persentase"""
+    source = df
+    if real_col:
+        df = df[[kec_col, pot_col, real_col]].copy()
+        df.columns = ['Kecamatan', 'Potensi', 'Realisasi']
+        df['Realisasi'] = pd.to_numeric(df['Realisasi'], errors='coerce').fillna(0).astype(int)
+    else:
+        # No realisasi column - set to 0
+        df = df[[kec_col, pot_col]].copy()
+        df.columns = ['Kecamatan', 'Potensi']
+        df['Realisasi'] = 0
+
+    # Clean data
+    df['Kecamatan'] = df['Kecamatan'].str.strip()
+    df['Kecamatan'] = df['Kecamatan'].str.replace(r'(?i)kecamatan ', '', regex=True)
+    df['Potensi'] = pd.to_numeric(df['Potensi'], errors='coerce').fillna(0).astype(int)
+
+    df = compute_metrics(df)
+    if kab_col:
+        df['Kabupaten'] = source[kab_col].astype('string').str.strip().fillna('').to_numpy()
+    return df
+
+
+def aggregate_desa(df, kec_col, desa_col, pot_col, real_col=None):
+    """Jumlahkan potensi/realisasi per (kecamatan, desa) dari frame mentah CSV/sheet"""
+    frame = pd.DataFrame({
+        'Kecamatan': clean_kecamatan_names(df[kec_col]),
+        'Desa': clean_desa_names(df[desa_col]),
+        'Potensi': pd.to_numeric(df[pot_col], errors='coerce').fillna(0),
+        'Realisasi': pd.to_numeric(df[real_col], errors='coerce').fillna(0) if real_col else 0,
+    })
+    frame = frame[df[kec_col].notna().to_numpy() & df[desa_col].notna().to_numpy()]
+    frame = frame.groupby(['Kecamatan', 'Desa'], as_index=False, sort=False)[['Potensi', 'Realisasi']].sum()
+    frame['Potensi'] = frame['Potensi'].astype(int)
+    frame['Realisasi'] = frame['Realisasi'].astype(int)
+    return frame
+
+
+def compute_metrics(df):
+    """Hitung Sisa, Persentase dan nama ternormalisasi tanpa apply per baris"""
+    potensi = df['Potensi'].to_numpy(dtype=float)
+    realisasi = df['Realisasi'].to_numpy(dtype=float)
+
+    df['Sisa'] = df['Potensi'] - df['Realisasi']
+    df['Persentase'] = np.divide(
+        realisasi * 100, potensi,
+        out=np.zeros(len(df), dtype=float),
+        where=potensi > 0
+    )
+    df['Kecamatan_normalized'] = normalize_names(df['Kecamatan'])
+    return df
+
+
+def format_thousands(values):
+    """Format integer dengan pemisah ribuan (1234567 -> "1,234,567")"""
+    # str.format bawaan lebih cepat daripada regex .str.replace untuk kasus ini
+    return pd.Series(values).astype('int64').map('{:,}'.format)
+
+
+def format_percent(values):
+    """Format persentase dengan satu angka desimal ("12.3") tanpa format per elemen"""
+    tenths = np.rint(np.asarray(values, dtype=float) * 10).astype('int64')
+    sign = np.where(tenths < 0, '-', '')
+    tenths = np.abs(tenths)
+    whole = (tenths // 10).astype(str)
+    frac = (tenths % 10).astype(str)
+    return pd.Series(sign, dtype=object) + whole + '.' + frac
+
+
+def progress_html(persen):
+    """HTML progress bar untuk setiap baris tabel monitoring"""
+    persen = pd.Series(persen).reset_index(drop=True)
+    label = format_percent(persen)
+    colors = pd.Series(colors_by_percentage(persen), dtype=object)
+    return (
+        "<div style='background:#eee; border-radius:8px; height:20px; overflow:hidden;'>"
+        "<div style='background:" + colors + "; height:100%; width:" + label + "%; "
+        "color:white; text-align:center; font-size:11px; font-weight:bold; "
+        "line-height:20px;'>" + label + "%</div></div>"
+    )
+
+
+def build_display_table(df):
+    """Tabel monitoring terurut berdasarkan Persentase dengan angka terformat"""
+    df_display = df[['Kecamatan', 'Potensi', 'Realisasi', 'Sisa', 'Persentase']].copy()
+    df_display = df_display.sort_values('Persentase', ascending=False).reset_index(drop=True)
+
+    # Format numbers
+    for col in ['Potensi', 'Realisasi', 'Sisa']:
+        df_display[col] = format_thousands(df_display[col]).to_numpy()
+    df_display['Progress'] = progress_html(df_display['Persentase']).to_numpy()
+
+    df_display.index = df_display.index + 1
+    return df_display
+
+
+def table_rows(df, query='', bands=(), sort_by='Persentase', ascending=False):
+    """Posisi baris df yang lolos filter (nama kecamatan memuat query, band capaian), terurut.
+
+    Hasilnya array posisi kecil yang bisa di-cache per kombinasi filter;
+    halaman diambil dengan table_page tanpa menyalin seluruh frame.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if query:
+        mask &= df['Kecamatan'].astype(str).str.contains(query.strip(), case=False, regex=False).to_numpy()
+    if bands:
+        persen = df['Persentase'].to_numpy(dtype=float)
+        in_band = np.zeros(len(df), dtype=bool)
+        for band in bands:
+            lower, upper = CAPAIAN_BANDS[band]
+            in_band |= (persen >= lower) & (persen < upper)
+        mask &= in_band
+    positions = np.flatnonzero(mask)
+    values = df[sort_by].iloc[positions].reset_index(drop=True)
+    if sort_by == 'Kecamatan':
+        values = values.astype(str).str.lower()
+    return positions[values.sort_values(ascending=ascending, kind='stable').index.to_numpy()]
+
+
+def table_page(df, positions, page, page_size):
+    """Satu halaman tabel monitoring (page mulai 0); index = nomor urut setelah filter & urutan"""
+    start = page * page_size
+    rows = df[TABLE_COLUMNS].iloc[positions[start:start + page_size]].reset_index(drop=True)
+    rows.index = np.arange(start + 1, start + 1 + len(rows))
+    return rows
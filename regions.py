@@ -0,0 +1,171 @@
+import numpy as np
+
+from cache import LRUCache
+from matching import ambiguous_names
+from spatial import expand_ranges
+from topology import VERTEX_BUDGET, choose_level_index
+
+# Label baris data yang tidak cocok dengan kecamatan mana pun di peta
+UNMAPPED_REGENCY = 'Tidak terpetakan'
+# Label baris yang namanya ada di beberapa kabupaten sementara kabupatennya tidak diketahui
+AMBIGUOUS_REGENCY = 'Nama ganda (kabupaten tidak diketahui)'
+
+
+class RegionIndex:
+    """Index batas kecamatan multi-kabupaten (mis. satu provinsi).
+
+    Bounding box setiap feature dimasukkan ke grid seragam, sehingga query
+    viewport hanya memeriksa feature di sel yang tertutup viewport. Feature
+    juga dikelompokkan per kabupaten (GID_2). Subset yang dirender dibuat
+    dari level yang dipilih dan disimpan di LRU kecil, supaya rerun dengan
+    viewport yang sama memakai objek (dan fingerprint) yang sama.
+    """
+
+    def __init__(self, levels, grid=64):
+        self.levels = levels
+        boundaries = levels[0][1]
+        self.feature_bounds = boundaries.bounds()
+        self.feature_count = len(boundaries)
+        # Jumlah vertex per feature di setiap level, untuk budget subset yang terlihat
+        if hasattr(levels, 'feature_vertex_counts'):
+            # CompactLevels: dihitung dari offset tanpa decode koordinat semua level
+            self.tolerances = list(levels.tolerances)
+            self.vertex_counts = [levels.feature_vertex_counts(level) for level in range(len(levels))]
+        else:
+            self.tolerances = [tolerance for tolerance, _ in levels]
+            self.vertex_counts = [
+                np.diff(level.ring_offsets[level.part_offsets[level.feature_offsets]]) for _, level in levels
+            ]
+
+        self.regency_features = {}
+        self.regency_names = {}
+        for feature, properties in enumerate(boundaries.properties):
+            gid = properties.get('GID_2') or ''
+            self.regency_features.setdefault(gid, []).append(feature)
+            self.regency_names.setdefault(gid, properties.get('NAME_2') or gid or '-')
+        self.regency_features = {gid: np.array(features) for gid, features in self.regency_features.items()}
+        # Nama kecamatan yang dipakai di lebih dari satu kabupaten; dicocokkan hanya dengan kabupaten/kode
+        self.ambiguous = ambiguous_names(boundaries.properties)
+        self._subsets = LRUCache(max_entries=32, max_bytes=128 * 1024 ** 2, sizeof=lambda subset: subset.nbytes)
+
+        valid = np.flatnonzero(~np.isnan(self.feature_bounds).any(axis=1))
+        if len(valid) == 0:
+            self.bounds = None
+            return
+        b = self.feature_bounds[valid]
+        self.bounds = (b[:, 0].min(), b[:, 1].min(), b[:, 2].max(), b[:, 3].max())
+        self.nx = self.ny = grid
+        self.dx = (self.bounds[2] - self.bounds[0]) / grid or 1.0
+        self.dy = (self.bounds[3] - self.bounds[1]) / grid or 1.0
+
+        # Feature per sel grid (CSR); satu feature terdaftar di semua sel yang ditutup bbox-nya
+        ix0, iy0 = self._cell(b[:, 0], b[:, 1])
+        ix1, iy1 = self._cell(b[:, 2], b[:, 3])
+        owner, rows = expand_ranges(iy0, iy1)
+        row_owner, cols = expand_ranges(ix0[owner], ix1[owner])
+        cells = rows[row_owner] * self.nx + cols
+        features = valid[owner[row_owner]]
+        order = np.argsort(cells, kind='stable')
+        self.cell_features = features[order]
+        self.cell_offsets = np.searchsorted(cells[order], np.arange(self.nx * self.ny + 1))
+
+    def _cell(self, x, y):
+        ix = np.clip(np.floor((x - self.bounds[0]) / self.dx).astype(np.int64), 0, self.nx - 1)
+        iy = np.clip(np.floor((y - self.bounds[1]) / self.dy).astype(np.int64), 0, self.ny - 1)
+        return ix, iy
+
+    def regencies(self):
+        """Dict GID_2 -> nama kabupaten/kota, urut nama"""
+        return dict(sorted(self.regency_names.items(), key=lambda item: item[1]))
+
+    def regency_bounds(self, gid=None):
+        """Bounds (minx, miny, maxx, maxy) satu kabupaten, atau semua feature jika gid None"""
+        if gid is None:
+            return self.bounds
+        b = self.feature_bounds[self.regency_features[gid]]
+        return (np.nanmin(b[:, 0]), np.nanmin(b[:, 1]), np.nanmax(b[:, 2]), np.nanmax(b[:, 3]))
+
+    def boxes(self, regency=None):
+        """Bounding box [minx, miny, maxx, maxy] feature kandidat (semua, atau satu kabupaten), dibulatkan keluar.
+
+        Dikirim ke peta live supaya browser bisa menghitung sendiri feature
+        yang terlihat dan hanya melapor viewport jika himpunannya berubah.
+        """
+        features = self.regency_features.get(regency, []) if regency is not None else np.arange(self.feature_count)
+        b = self.feature_bounds[np.asarray(features, dtype=np.int64)]
+        b = b[~np.isnan(b).any(axis=1)]
+        rounded = np.column_stack([np.floor(b[:, :2] * 1e5), np.ceil(b[:, 2:] * 1e5)]) / 1e5
+        return rounded.tolist()
+
+    def query(self, bounds=None, regency=None):
+        """Index feature (urut) yang bbox-nya berpotongan dengan bounds, dibatasi ke kabupaten regency"""
+        if regency is not None:
+            candidates = self.regency_features.get(regency, np.array([], dtype=np.int64))
+        elif bounds is None or self.bounds is None:
+            return np.arange(self.feature_count)
+        else:
+            minx, miny, maxx, maxy = bounds
+            if maxx < self.bounds[0] or minx > self.bounds[2] or maxy < self.bounds[1] or miny > self.bounds[3]:
+                return np.array([], dtype=np.int64)
+            ix0, iy0 = self._cell(np.array([minx]), np.array([miny]))
+            ix1, iy1 = self._cell(np.array([maxx]), np.array([maxy]))
+            rows = np.arange(iy0[0], iy1[0] + 1)
+            starts = self.cell_offsets[rows * self.nx + ix0[0]]
+            stops = self.cell_offsets[rows * self.nx + ix1[0] + 1]
+            candidates = np.unique(np.concatenate(
+                [self.cell_features[start:stop] for start, stop in zip(starts, stops)] or [[]]).astype(np.int64))
+        if bounds is None or len(candidates) == 0:
+            return np.sort(candidates)
+        minx, miny, maxx, maxy = bounds
+        b = self.feature_bounds[candidates]
+        hit = (b[:, 0] <= maxx) & (b[:, 2] >= minx) & (b[:, 1] <= maxy) & (b[:, 3] >= miny)
+        return np.sort(candidates[hit])
+
+    def visible(self, zoom, bounds=None, regency=None, vertex_budget=VERTEX_BUDGET):
+        """(toleransi, BoundarySet) berisi feature yang terlihat saja; level dipilih dari vertex subset"""
+        indices = self.query(bounds, regency)
+        choice = choose_level_index(self.tolerances,
+                                    [int(counts[indices].sum()) for counts in self.vertex_counts],
+                                    zoom, vertex_budget)
+        return self.tolerances[choice], self.subset(choice, indices)
+
+    def subset(self, level, indices):
+        """BoundarySet level ke-level yang hanya berisi feature indices (di-cache)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        key = (level, indices.tobytes())
+        subset = self._subsets.get(key)
+        if subset is None:
+            subset = self.levels[level][1].subset(indices)
+            self._subsets.put(key, subset)
+        return subset
+
+
+def rollup(df, boundaries, matcher):
+    """Rekap metrik kecamatan -> kabupaten/kota (GID_2).
+
+    Kabupaten setiap baris diambil dari feature peta yang dicocokkan matcher
+    dengan baris itu (baris duplikat mengikuti baris pertamanya), jadi
+    pencocokan per kabupaten dan penanganan nama ganda sama dengan peta.
+    Baris yang tidak cocok dikelompokkan sebagai UNMAPPED_REGENCY, baris
+    bernama ganda tanpa kabupaten sebagai AMBIGUOUS_REGENCY. Return
+    DataFrame Kabupaten, Kecamatan (jumlah), Potensi, Realisasi, Sisa,
+    Persentase, urut Potensi.
+    """
+    positions = matcher.match_properties(boundaries.properties)
+    regency_of = {}
+    for properties, position in zip(boundaries.properties, positions):
+        if position is not None:
+            regency_of.setdefault(position, properties.get('NAME_2') or properties.get('GID_2'))
+
+    regency = [regency_of.get(first) or (AMBIGUOUS_REGENCY if first in matcher.ambiguous_rows else UNMAPPED_REGENCY)
+               for first in matcher.representatives()]
+    result = df.groupby(np.array(regency, dtype=object), sort=False).agg(
+        Kecamatan=('Kecamatan', 'nunique'),
+        Potensi=('Potensi', 'sum'),
+        Realisasi=('Realisasi', 'sum'),
+    ).rename_axis('Kabupaten').reset_index()
+    result['Sisa'] = result['Potensi'] - result['Realisasi']
+    potensi = result['Potensi'].to_numpy(dtype=float)
+    result['Persentase'] = np.divide(result['Realisasi'].to_numpy(dtype=float) * 100, potensi,
+                                     out=np.zeros(len(result)), where=potensi > 0)
+    return result.sort_values('Potensi', ascending=False, kind='stable').reset_index(drop=True)
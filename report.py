@@ -0,0 +1,231 @@
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from boundaryfile import COMPACT_SUFFIX, load_compact, save_compact
+from charts import potensi_pie, top10_bar
+from choropleth import MAP_PALETTE, render_choropleth
+from batch import merge_partials, partial_aggregate
+from core import prepare_frame, summarize
+from geostore import BoundarySet
+from ingest import file_digest
+from matching import ambiguous_names, frame_matcher
+from pipeline import build_display_table, get_color_by_percentage
+from topology import choose_level, zoom_for_bounds
+
+REPORT_MAP_HEIGHT = 600
+REPORT_COLUMNS = ['Kecamatan', 'Potensi', 'Realisasi', 'Sisa', 'Persentase']
+# Kolom index.csv (satu baris per laporan)
+SUMMARY_COLUMNS = ['name', 'data', 'boundaries', 'status', 'kecamatan', 'matched', 'potensi', 'realisasi',
+                   'sisa', 'capaian', 'seconds', 'error']
+
+_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+    body {{ font-family: sans-serif; margin: 24px; color: #222; }}
+    .header {{ background: linear-gradient(to right, #004aad, #0074e0); color: white; padding: 20px;
+               border-radius: 10px; text-align: center; }}
+    .metrics {{ display: flex; gap: 16px; margin: 20px 0; }}
+    .metric {{ flex: 1; border: 1px solid #ddd; border-radius: 8px; padding: 12px; }}
+    .metric .label {{ font-size: 13px; color: #666; }}
+    .metric .value {{ font-size: 26px; font-weight: bold; }}
+    .row {{ display: flex; gap: 16px; }}
+    .row > div {{ flex: 1; min-width: 0; }}
+    table {{ border-collapse: collapse; width: 100%; font-size: 13px; }}
+    th, td {{ border-bottom: 1px solid #eee; padding: 6px; text-align: left; }}
+</style>
+</head>
+<body>
+<div class="header"><h1>📊 {title}</h1><p>{subtitle}</p></div>
+<div class="metrics">{metrics}</div>
+<div class="row">
+<div><h2>🗺️ Peta Realisasi</h2>{map}<p>✅ Matched: {matched}</p></div>
+<div><h2>📊 Proporsi Potensi</h2>{pie}<h2>📈 Top 10 Kecamatan</h2>{bar}</div>
+</div>
+<h2>📋 Tabel Monitoring Lengkap</h2>
+{table}
+</body>
+</html>
+"""
+
+
+def map_view(boundaries, pixels=REPORT_MAP_HEIGHT):
+    """(center lat/lon, zoom) yang memuat semua feature"""
+    bounds = boundaries.bounds()
+    minx, miny = np.nanmin(bounds[:, 0]), np.nanmin(bounds[:, 1])
+    maxx, maxy = np.nanmax(bounds[:, 2]), np.nanmax(bounds[:, 3])
+    return [(miny + maxy) / 2, (minx + maxx) / 2], zoom_for_bounds((minx, miny, maxx, maxy), pixels)
+
+
+def render_report(df, levels, title, subtitle='', plotlyjs='inline'):
+    """Dashboard statis satu dataset (metrik, peta, pie, Top 10, tabel) sebagai satu file HTML.
+
+    df adalah frame metrik (hasil prepare_frame). plotlyjs='inline' menanam
+    plotly.js di file (tanpa internet, ~3.5 MB), 'cdn' merujuk CDN. Peta
+    folium ditanam lewat iframe srcdoc; tile dan Leaflet tetap dari CDN.
+    """
+    location, zoom = map_view(levels[0][1])
+    _, boundaries = choose_level(levels, zoom)
+    rendered = render_choropleth(
+        boundaries, df,
+        matcher=frame_matcher(df, ambiguous_names(boundaries.properties)),
+        palette=list(MAP_PALETTE),
+        progress_color=get_color_by_percentage,
+        location=location,
+        zoom=zoom,
+    )
+
+    totals = summarize(df)
+    metrics = ''.join(
+        f"<div class='metric'><div class='label'>{label}</div><div class='value'>{value}</div></div>"
+        for label, value in [
+            ("Total Potensi", f"{totals['potensi']:,}"),
+            ("Total Realisasi", f"{totals['realisasi']:,}"),
+            ("Total Sisa", f"{totals['sisa']:,}"),
+            ("Rata-rata Capaian", f"{totals['capaian']:.1f}%"),
+        ]
+    )
+
+    # plotly.js cukup ditanam sekali per halaman
+    include_plotlyjs = True if plotlyjs == 'inline' else 'cdn'
+    fig_pie = potensi_pie(df)
+    if fig_pie is not None:
+        pie = fig_pie.to_html(full_html=False, include_plotlyjs=include_plotlyjs)
+        include_plotlyjs = False
+    else:
+        pie = "<p>Tidak ada data potensi untuk ditampilkan</p>"
+    bar = top10_bar(df).to_html(full_html=False, include_plotlyjs=include_plotlyjs)
+
+    table = build_display_table(df)[['Kecamatan', 'Potensi', 'Realisasi', 'Sisa', 'Progress']]
+    # Hanya kolom Progress yang berisi HTML; nama dari file data di-escape
+    table['Kecamatan'] = table['Kecamatan'].astype(str).map(html.escape)
+    return _PAGE.format(
+        title=html.escape(title),
+        subtitle=html.escape(subtitle),
+        metrics=metrics,
+        map=f"<iframe srcdoc=\"{html.escape(rendered['html'])}\" style=\"width:100%; "
+            f"height:{REPORT_MAP_HEIGHT + 10}px; border:none;\"></iframe>",
+        matched=f"{rendered['matched']}/{len(boundaries)} kecamatan",
+        pie=pie,
+        bar=bar,
+        table=table.to_html(escape=False, index=True),
+    ), rendered['matched']
+
+
+def compact_boundaries(paths, directory):
+    """Parse setiap file batas unik sekali; GeoJSON disimpan dalam format ringkas di directory.
+
+    Return (dict path asli -> path .bnd yang dibaca worker, dict path asli ->
+    pesan error). Load .bnd hanya beberapa milidetik, jadi parsing dan
+    penyederhanaan tidak diulang per job; file yang gagal tidak menghentikan
+    file lain.
+    """
+    compact = {}
+    errors = {}
+    for path in sorted(set(paths)):
+        if path.endswith(COMPACT_SUFFIX):
+            compact[path] = path
+            continue
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            target = os.path.join(directory, f"{file_digest(data)[:16]}{COMPACT_SUFFIX}")
+            if not os.path.exists(target):
+                os.makedirs(directory, exist_ok=True)
+                # Tulis ke file sementara: file setengah jadi tidak boleh dipakai ulang run berikutnya
+                save_compact(f"{target}.tmp", BoundarySet.from_geojson(json.loads(data)))
+                os.replace(f"{target}.tmp", target)
+        except Exception as e:
+            errors[path] = f"Batas {os.path.basename(path)}: {e}"
+            continue
+        compact[path] = target
+    return compact, errors
+
+
+# Level batas yang sudah dibaca di proses ini (per worker, dipakai ulang antar job)
+_worker_levels = {}
+
+
+def _levels(path):
+    if path not in _worker_levels:
+        _worker_levels[path] = load_compact(path)
+    return _worker_levels[path]
+
+
+def render_job(job, output_dir, plotlyjs='inline'):
+    """Render satu job {name, data, boundaries} menjadi <name>.html dan <name>.csv; return baris ringkasan"""
+    start = time.perf_counter()
+    with open(job['data'], 'rb') as f:
+        data = f.read()
+    # Data per baris (mis. satu baris per transaksi) dijumlahkan per kecamatan dulu, sama seperti mode batch
+    outcome = partial_aggregate(os.path.basename(job['data']), data)
+    df, _, _ = prepare_frame(merge_partials([outcome['partial']]), outcome['desa'])
+    page, matched = render_report(df, _levels(job['compact']), job['name'], subtitle=os.path.basename(job['data']),
+                                  plotlyjs=plotlyjs)
+    with open(os.path.join(output_dir, f"{job['name']}.html"), 'w', encoding='utf-8') as f:
+        f.write(page)
+    df[REPORT_COLUMNS].to_csv(os.path.join(output_dir, f"{job['name']}.csv"), index=False)
+
+    totals = summarize(df)
+    return {
+        'name': job['name'], 'data': job['data'], 'boundaries': job['boundaries'], 'status': 'ok',
+        'kecamatan': len(df), 'matched': matched, 'potensi': totals['potensi'],
+        'realisasi': totals['realisasi'], 'sisa': totals['sisa'], 'capaian': round(totals['capaian'], 2),
+        'seconds': round(time.perf_counter() - start, 3), 'error': None,
+    }
+
+
+def render_reports(jobs, output_dir, max_workers=None, plotlyjs='inline', progress=None):
+    """Render banyak laporan di process pool; job yang gagal dicatat tanpa menghentikan yang lain.
+
+    jobs adalah list dict {name, data, boundaries}. Menulis index.csv berisi
+    ringkasan semua job dan mengembalikannya sebagai DataFrame.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    compact, compact_errors = compact_boundaries([job['boundaries'] for job in jobs],
+                                                 os.path.join(output_dir, '.boundaries'))
+
+    def failed(job, error):
+        return dict({column: None for column in SUMMARY_COLUMNS}, name=job['name'], data=job['data'],
+                    boundaries=job['boundaries'], status='error', error=error)
+
+    # Job dengan file batas yang gagal diproses langsung dicatat gagal
+    rows = [failed(job, compact_errors[job['boundaries']]) for job in jobs if job['boundaries'] in compact_errors]
+    jobs = [dict(job, compact=compact[job['boundaries']]) for job in jobs if job['boundaries'] in compact]
+    skipped = len(rows)
+    total = skipped + len(jobs)
+    if progress and skipped:
+        progress(skipped, total)
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        for done, job in enumerate(jobs, 1):
+            try:
+                rows.append(render_job(job, output_dir, plotlyjs))
+            except Exception as e:
+                rows.append(failed(job, str(e)))
+            if progress:
+                progress(skipped + done, total)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(render_job, job, output_dir, plotlyjs): job for job in jobs}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    rows.append(future.result())
+                except Exception as e:
+                    rows.append(failed(futures[future], str(e)))
+                if progress:
+                    progress(skipped + done, total)
+
+    summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS).sort_values('name', kind='stable').reset_index(drop=True)
+    # Int64 (nullable): baris gagal berisi NA tanpa mengubah angka menjadi float
+    summary = summary.astype({column: 'Int64' for column in ('kecamatan', 'matched', 'potensi', 'realisasi', 'sisa')})
+    summary.to_csv(os.path.join(output_dir, 'index.csv'), index=False)
+    return summary
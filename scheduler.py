@@ -0,0 +1,146 @@
+import threading
+import time
+from types import MappingProxyType
+
+from fetcher import FetchError
+
+# Batas jumlah URL yang dipantau sekaligus (setiap URL = satu request per interval)
+MAX_WATCHED = 16
+
+
+def format_age(seconds):
+    """Umur snapshot dalam bahasa sehari-hari, mis. '42 detik' atau '3 menit'"""
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"{seconds} detik"
+    if seconds < 3600:
+        return f"{seconds // 60} menit"
+    return f"{seconds // 3600} jam {seconds % 3600 // 60} menit"
+
+
+class RefreshScheduler:
+    """Worker latar belakang yang me-refresh URL Apps Script secara berkala.
+
+    Hanya worker yang melakukan request, jadi berapa pun jumlah session
+    yang membaca URL yang sama, request ke Apps Script tetap satu per
+    interval. Setiap hasil dipublikasikan sebagai snapshot read-only
+    (MappingProxyType) yang diganti secara atomik; sequence naik hanya
+    jika data benar-benar berubah; listener dari subscribe dipanggil pada
+    saat itu juga, tanpa menunggu ada session yang membaca.
+    """
+
+    def __init__(self, fetcher, interval=60, idle_timeout=3600, max_watched=MAX_WATCHED):
+        self.fetcher = fetcher
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.max_watched = max_watched
+        self._snapshots = {}
+        self._watched = {}
+        self._forced = set()
+        self._pinned = set()
+        self._listeners = []
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='sheet-refresh', daemon=True)
+        self._thread.start()
+
+    def subscribe(self, listener):
+        """Panggil listener(url, snapshot) dari thread worker setiap kali data suatu URL berubah"""
+        with self._condition:
+            self._listeners.append(listener)
+
+    def watch(self, url, pin=False):
+        """Daftarkan URL (atau perpanjang masa aktifnya); refresh pertama dijalankan segera.
+
+        URL dengan pin=True terus di-refresh meski tidak dibaca session mana
+        pun. FetchError jika URL baru melebihi max_watched (URL lama lepas
+        setelah idle_timeout).
+        """
+        with self._condition:
+            if url not in self._watched:
+                if len(self._watched) >= self.max_watched:
+                    raise FetchError(f"Terlalu banyak URL dipantau (maks. {self.max_watched}); coba lagi nanti")
+                self._forced.add(url)
+                self._condition.notify_all()
+            self._watched[url] = time.time()
+            if pin:
+                self._pinned.add(url)
+
+    def request_refresh(self, url):
+        """Minta refresh secepatnya tanpa menunggu; permintaan ganda digabung"""
+        self.watch(url)
+        with self._condition:
+            self._forced.add(url)
+            self._condition.notify_all()
+
+    def snapshot(self, url, wait=0):
+        """Snapshot terbaru untuk URL (None jika belum ada); tunggu maks. wait detik untuk yang pertama"""
+        self.watch(url)
+        deadline = time.time() + wait
+        with self._condition:
+            while url not in self._snapshots and time.time() < deadline:
+                self._condition.wait(deadline - time.time())
+            return self._snapshots.get(url)
+
+    def _due(self, now):
+        with self._condition:
+            for url, last_access in list(self._watched.items()):
+                if now - last_access > self.idle_timeout and url not in self._pinned:
+                    # Tidak dibaca session mana pun lagi
+                    del self._watched[url]
+                    self._forced.discard(url)
+                    self._snapshots.pop(url, None)
+                    self.fetcher.forget(url)
+            due = set(self._forced)
+            for url in self._watched:
+                snapshot = self._snapshots.get(url)
+                if snapshot is None or now - snapshot['checked_at'] >= self.interval:
+                    due.add(url)
+            self._forced.clear()
+            return sorted(due)
+
+    def _refresh(self, url):
+        previous = self._snapshots.get(url)
+        try:
+            entry = self.fetcher.refresh(url)
+        except FetchError as e:
+            snapshot = {
+                'url': url,
+                'sequence': previous['sequence'] if previous else 0,
+                'version': previous['version'] if previous else None,
+                'df': previous['df'] if previous else None,
+                'updated_at': previous['updated_at'] if previous else None,
+                'checked_at': time.time(),
+                'error': str(e),
+            }
+        else:
+            changed = previous is None or entry['df'] is not previous['df']
+            snapshot = {
+                'url': url,
+                'sequence': (previous['sequence'] if previous else 0) + (1 if changed else 0),
+                'version': entry['version'],
+                'df': entry['df'],
+                'updated_at': entry['updated_at'],
+                'checked_at': entry['checked_at'],
+                'error': None,
+            }
+        snapshot = MappingProxyType(snapshot)
+        with self._condition:
+            self._snapshots[url] = snapshot
+            self._condition.notify_all()
+            listeners = list(self._listeners)
+        # Hanya saat data berubah (sequence naik); refresh gagal atau 304 tidak memanggil listener
+        if snapshot['sequence'] != (previous['sequence'] if previous else 0):
+            for listener in listeners:
+                try:
+                    listener(url, snapshot)
+                except Exception:
+                    # Listener yang gagal tidak boleh menghentikan refresh URL lain
+                    pass
+
+    def _run(self):
+        while True:
+            for url in self._due(time.time()):
+                self._refresh(url)
+            with self._condition:
+                if not self._forced:
+                    self._condition.wait(timeout=1.0)
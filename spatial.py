@@ -0,0 +1,145 @@
+import numpy as np
+
+# Batas jumlah elemen matriks titik x edge per blok (memori ~ 8 byte per elemen)
+BLOCK_ELEMENTS = 4_000_000
+
+
+def expand_ranges(starts, stops):
+    """(owner, value) untuk setiap value di range [starts[i], stops[i]] (inklusif)"""
+    counts = stops - starts + 1
+    owner = np.repeat(np.arange(len(starts)), counts)
+    first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return owner, starts[owner] + np.arange(counts.sum()) - first[owner]
+
+
+class PolygonIndex:
+    """Index grid seragam untuk point-in-polygon (kecamatan dari koordinat).
+
+    Semua edge polygon disimpan sebagai array. Setiap baris grid menyimpan
+    edge yang rentang y-nya menyentuh baris tersebut, sehingga ray casting
+    untuk satu titik hanya memeriksa edge di barisnya. Sel yang tidak
+    dilewati edge sama sekali (sebagian besar sel) diklasifikasi sekali
+    lewat titik tengahnya; titik di sel itu tidak perlu ray casting.
+    Aturan even-odd per feature menangani hole dan MultiPolygon.
+    """
+
+    def __init__(self, boundaries, grid=128):
+        starts = []
+        stops = []
+        owners = []
+        for feature in range(len(boundaries)):
+            for rings in boundaries.rings(feature):
+                for ring in rings:
+                    if len(ring) < 2:
+                        continue
+                    starts.append(ring[:-1])
+                    stops.append(ring[1:])
+                    owners.append(np.full(len(ring) - 1, feature))
+        self.feature_count = len(boundaries)
+        if not starts:
+            self.bounds = None
+            return
+
+        a = np.concatenate(starts)
+        b = np.concatenate(stops)
+        self.edge_feature = np.concatenate(owners)
+        self.x1, self.y1 = a[:, 0], a[:, 1]
+        self.x2, self.y2 = b[:, 0], b[:, 1]
+
+        xmin, ymin = np.minimum(a, b).min(axis=0)
+        xmax, ymax = np.maximum(a, b).max(axis=0)
+        self.bounds = (xmin, ymin, xmax, ymax)
+        self.nx = self.ny = grid
+        self.dx = (xmax - xmin) / grid or 1.0
+        self.dy = (ymax - ymin) / grid or 1.0
+
+        ex0, ey0 = self._cell(np.minimum(self.x1, self.x2), np.minimum(self.y1, self.y2))
+        ex1, ey1 = self._cell(np.maximum(self.x1, self.x2), np.maximum(self.y1, self.y2))
+
+        # Edge per baris grid (CSR), diurutkan per feature untuk reduceat
+        edge, row = expand_ranges(ey0, ey1)
+        order = np.lexsort((self.edge_feature[edge], row))
+        self.row_edges = edge[order]
+        self.row_offsets = np.searchsorted(row[order], np.arange(self.ny + 1))
+
+        # Sel yang dilewati edge (bbox edge, konservatif)
+        boundary = np.zeros((self.ny, self.nx), dtype=bool)
+        _, cols = expand_ranges(ex0[edge], ex1[edge])
+        boundary[np.repeat(row, ex1[edge] - ex0[edge] + 1), cols] = True
+        self.boundary_cells = boundary
+
+        # Klasifikasi sel bebas edge lewat titik tengahnya
+        self.cell_feature = np.full((self.ny, self.nx), -1, dtype=np.int64)
+        iy, ix = np.nonzero(~boundary)
+        centers_x = xmin + (ix + 0.5) * self.dx
+        centers_y = ymin + (iy + 0.5) * self.dy
+        self.cell_feature[iy, ix] = self._ray_cast(centers_x, centers_y, iy)
+
+    def _cell(self, x, y):
+        xmin, ymin, _, _ = self.bounds
+        ix = np.clip(np.floor((x - xmin) / self.dx).astype(np.int64), 0, self.nx - 1)
+        iy = np.clip(np.floor((y - ymin) / self.dy).astype(np.int64), 0, self.ny - 1)
+        return ix, iy
+
+    def _ray_cast(self, px, py, rows):
+        """Feature yang memuat tiap titik (-1 jika tidak ada), memakai edge di baris grid titik"""
+        result = np.full(len(px), -1, dtype=np.int64)
+        order = np.argsort(rows, kind='stable')
+        sorted_rows = rows[order]
+        bounds = np.searchsorted(sorted_rows, np.arange(self.ny + 1))
+
+        for row in np.unique(sorted_rows):
+            edges = self.row_edges[self.row_offsets[row]:self.row_offsets[row + 1]]
+            if len(edges) == 0:
+                continue
+            x1, y1 = self.x1[edges], self.y1[edges]
+            x2, y2 = self.x2[edges], self.y2[edges]
+            features = self.edge_feature[edges]
+            segment_starts = np.flatnonzero(np.r_[True, features[1:] != features[:-1]])
+            segment_features = features[segment_starts]
+            slope = np.divide(x2 - x1, y2 - y1, out=np.zeros(len(edges)), where=y2 != y1)
+
+            members = order[bounds[row]:bounds[row + 1]]
+            step = max(1, BLOCK_ELEMENTS // len(edges))
+            for block in range(0, len(members), step):
+                points = members[block:block + step]
+                x = px[points, None]
+                y = py[points, None]
+                crosses = ((y1 > y) != (y2 > y)) & (x < x1 + (y - y1) * slope)
+                inside = np.add.reduceat(crosses, segment_starts, axis=1) % 2 == 1
+                found = inside.any(axis=1)
+                result[points[found]] = segment_features[inside[found].argmax(axis=1)]
+        return result
+
+    def locate(self, lon, lat):
+        """Index feature untuk setiap titik (array lon/lat), -1 jika di luar semua polygon"""
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        result = np.full(len(lon), -1, dtype=np.int64)
+        if self.bounds is None or len(lon) == 0:
+            return result
+
+        xmin, ymin, xmax, ymax = self.bounds
+        valid = np.flatnonzero((lon >= xmin) & (lon <= xmax) & (lat >= ymin) & (lat <= ymax))
+        ix, iy = self._cell(lon[valid], lat[valid])
+        result[valid] = self.cell_feature[iy, ix]
+
+        edge_cell = self.boundary_cells[iy, ix]
+        candidates = valid[edge_cell]
+        result[candidates] = self._ray_cast(lon[candidates], lat[candidates], iy[edge_cell])
+        return result
+
+    def locator(self, names):
+        """Callable (lon, lat) -> array nama (None di luar polygon); names berurutan seperti feature"""
+        return NameLocator(self, names)
+
+
+class NameLocator:
+    """PolygonIndex + nama feature sebagai callable yang bisa di-pickle (dikirim ke worker proses)"""
+
+    def __init__(self, index, names):
+        self.index = index
+        self.lookup = np.array(list(names) + [None], dtype=object)
+
+    def __call__(self, lon, lat):
+        return self.lookup[self.index.locate(lon, lat)]
@@ -0,0 +1,71 @@
+"""Uji ingest banyak file: agregat parsial digabung sama dengan agregat satu kali.
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import io
+import os
+import sys
+import zipfile
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from batch import ingest_batch, merge_partials, read_directory  # noqa: E402
+from generators import synthetic_csv  # noqa: E402
+from pipeline import clean_kecamatan_names  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('batch')
+    files = []
+    for seed in range(4):
+        path = synthetic_csv(str(directory / f'kantor_{seed}.csv'), 1500, seed=seed)
+        with open(path, 'rb') as f:
+            files.append((os.path.basename(path), f.read()))
+    return files
+
+
+def single_pass(files):
+    """Semua baris mentah digabung dulu, lalu dijumlahkan sekali"""
+    raw = pd.concat([pd.read_csv(io.BytesIO(data)) for _, data in files], ignore_index=True)
+    return (raw.assign(Kecamatan=clean_kecamatan_names(raw['kecamatan']))
+            .groupby('Kecamatan')[['potensi', 'realisasi']].sum()
+            .rename(columns={'potensi': 'Potensi', 'realisasi': 'Realisasi'}))
+
+
+def test_merge_partials_is_order_independent():
+    a = pd.DataFrame({'Kecamatan': ['A', 'B'], 'Potensi': [1, 2], 'Realisasi': [0, 1]})
+    b = pd.DataFrame({'Kecamatan': ['B', 'C'], 'Potensi': [3, 4], 'Realisasi': [1, 1]})
+    merged = merge_partials([a, None, b])
+    assert merged.set_index('Kecamatan').to_dict('index') == {
+        'A': {'Potensi': 1, 'Realisasi': 0}, 'B': {'Potensi': 5, 'Realisasi': 2}, 'C': {'Potensi': 4, 'Realisasi': 1}}
+    pd.testing.assert_frame_equal(merge_partials([b, a]), merged)
+    assert merge_partials([]).empty
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_equals_single_pass(files, workers):
+    broken = ('rusak.csv', b'x,y\n1,2\n')
+    result = ingest_batch(files + [broken], max_workers=workers)
+    actual = result['df'].set_index('Kecamatan').sort_index()
+    pd.testing.assert_frame_equal(actual, single_pass(files).sort_index(), check_names=False, check_dtype=False)
+    assert [name for name, _ in result['errors']] == ['rusak.csv']
+    assert list(result['files']['File']) == sorted(name for name, _ in files)
+    assert result['desa_count'] is not None
+
+
+def test_read_directory_expands_zips(files, tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / files[0][0]).write_bytes(files[0][1])
+    with zipfile.ZipFile(tmp_path / 'arsip.zip', 'w') as archive:
+        archive.writestr('dalam/b.csv', files[1][1])
+        archive.writestr('catatan.txt', b'diabaikan')
+    (tmp_path / 'catatan.txt').write_bytes(b'diabaikan')
+    assert [name for name, _ in read_directory(str(tmp_path))] == ['dalam/b.csv', os.path.join('sub', files[0][0])]
@@ -0,0 +1,99 @@
+"""Uji format boundary ringkas (.bnd): save_compact/load_compact bolak-balik.
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from boundaryfile import load_compact, save_compact  # noqa: E402
+from generators import synthetic_boundaries  # noqa: E402
+from geostore import BoundarySet, thaw  # noqa: E402
+from topology import Topology  # noqa: E402
+
+
+def canonical_rings(boundaries, decimals=6):
+    """Ring sebagai tuple titik tanpa titik penutup, diputar ke titik terkecil.
+
+    Ring yang disusun ulang dari arc dimulai dari junction, jadi urutan titik
+    sama tetapi titik awalnya bisa bergeser.
+    """
+    coords = np.round(boundaries.coords, decimals)
+    offsets = boundaries.ring_offsets
+    rings = []
+    for i in range(len(offsets) - 1):
+        points = [tuple(point) for point in coords[offsets[i]:offsets[i + 1] - 1].tolist()]
+        start = points.index(min(points)) if points else 0
+        rings.append(tuple(points[start:] + points[:start]))
+    return rings
+
+
+def test_round_trip_bogor(tmp_path):
+    with open(os.path.join(ROOT, 'bogor_regency.json'), encoding='utf-8') as f:
+        boundaries = BoundarySet.from_geojson(json.load(f))
+    path = str(tmp_path / 'bogor.bnd')
+    save_compact(path, boundaries)
+    levels = load_compact(path)
+
+    full = levels[0][1]
+    assert levels[0][0] == 0.0
+    # Data GADM berpresisi 1e-4 derajat: level 0 lossless
+    assert canonical_rings(full) == canonical_rings(boundaries)
+    assert np.array_equal(full.part_offsets, boundaries.part_offsets)
+    assert np.array_equal(full.feature_offsets, boundaries.feature_offsets)
+    assert full.properties == boundaries.properties
+    assert levels.vertex_counts[0] == len(boundaries.coords)
+    assert list(levels.vertex_counts) == sorted(levels.vertex_counts, reverse=True)
+    # Level sederhana sama dengan penyederhanaan arc langsung dari Topology
+    topology = Topology.from_boundaries(boundaries)
+    tolerance, simplified = levels[-1]
+    expected = topology.to_boundaries(topology.simplified_arcs(tolerance))
+    assert canonical_rings(simplified) == canonical_rings(expected)
+    assert levels.vertex_counts[-1] == len(expected.coords)
+    assert levels.feature_vertex_counts(len(levels) - 1).sum() == len(expected.coords)
+
+
+def rounded(value, decimals=6):
+    if isinstance(value, list):
+        return [rounded(item, decimals) for item in value]
+    return round(value, decimals) if isinstance(value, float) else value
+
+
+def test_round_trip_mixed_properties(tmp_path):
+    boundaries = synthetic_boundaries(12, regencies=3)
+    # Dibulatkan seperti data GADM, supaya kuantisasi 1e-7 lossless
+    data = {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': dict(thaw(boundaries.properties[i])),
+         'geometry': dict(boundaries.geometry(i), coordinates=rounded(boundaries.geometry(i)['coordinates']))}
+        for i in range(len(boundaries))]}
+    data['features'][0]['properties']['EXTRA'] = {'kode': [1, 2]}
+    data['features'][1]['properties']['TYPE_3'] = None
+    data['features'].append({'type': 'Feature', 'properties': {'NAME_3': 'Tanpa Batas'}, 'geometry': None})
+    boundaries = BoundarySet.from_geojson(data)
+    path = str(tmp_path / 'mixed.bnd')
+    save_compact(path, boundaries)
+    levels = load_compact(path)
+
+    full = levels[0][1]
+    assert [thaw(props) for props in full.properties] == [feature['properties'] for feature in data['features']]
+    assert full.geometry_types == boundaries.geometry_types
+    assert canonical_rings(full) == canonical_rings(boundaries)
+
+
+def test_rejects_unknown_version(tmp_path):
+    path = tmp_path / 'old.bnd'
+    save_compact(str(path), synthetic_boundaries(4))
+    data = bytearray(path.read_bytes())
+    data[6:8] = (99).to_bytes(2, 'little')
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match='Versi format'):
+        load_compact(str(path))
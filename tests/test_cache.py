@@ -0,0 +1,99 @@
+"""Uji LRUCache, cache ingest berbasis hash isi file dan fingerprint key cache peta.
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import os
+import re
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from cache import LRUCache, fingerprint, frame_fingerprint  # noqa: E402
+from choropleth import MAP_PALETTE, render_choropleth  # noqa: E402
+from generators import synthetic_boundaries  # noqa: E402
+from geostore import BoundarySet  # noqa: E402
+from ingest import cached_ingest  # noqa: E402
+from matching import frame_matcher  # noqa: E402
+from pipeline import compute_metrics, get_color_by_percentage  # noqa: E402
+
+CSV = b'kecamatan,potensi,realisasi\nCibinong,10,4\nDramaga,5,5\n'
+
+
+def test_lru_evicts_by_count_and_size():
+    cache = LRUCache(max_entries=2, max_bytes=100, sizeof=len)
+    cache.put('a', 'x' * 10)
+    cache.put('b', 'x' * 10)
+    assert cache.get('a') is not None  # 'a' jadi yang terbaru
+    cache.put('c', 'x' * 10)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+
+    cache.put('d', 'x' * 95)
+    assert list(cache._entries) == ['d'] and cache.nbytes == 95
+    # Lebih besar dari max_bytes: tidak disimpan
+    assert cache.put('e', 'x' * 101) is False and 'e' not in cache
+
+
+def test_cached_ingest_keys_on_content_and_options():
+    cache = LRUCache()
+    first = cached_ingest(cache, CSV, 'a.csv')
+    assert not first['cached']
+    # Nama file lain, isi sama: tidak di-parse ulang
+    second = cached_ingest(cache, CSV, 'salinan.csv')
+    assert second['cached']
+    assert second['df'].equals(first['df'])
+
+    # Caller boleh mengubah df; entry cache tidak ikut berubah
+    second['df'].loc[0, 'potensi'] = -1
+    assert cached_ingest(cache, CSV, 'a.csv')['df'].loc[0, 'potensi'] == 10
+
+    assert not cached_ingest(cache, CSV + b'Ciawi,1,0\n', 'a.csv')['cached']
+    assert not cached_ingest(cache, CSV, 'a.csv', streaming=True)['cached']
+    assert cache.hits == 2 and cache.misses == 3
+
+
+def test_boundary_fingerprint_tracks_content():
+    boundaries = synthetic_boundaries(9)
+    same = BoundarySet.from_geojson(boundaries.geojson)
+    assert same.fingerprint == boundaries.fingerprint
+    assert boundaries.subset(range(9)).fingerprint == boundaries.fingerprint
+    assert boundaries.subset([0, 1]).fingerprint != boundaries.fingerprint
+
+    moved = boundaries.geojson
+    moved['features'][0]['geometry']['coordinates'][0][1][0] += 1e-6
+    assert BoundarySet.from_geojson(moved).fingerprint != boundaries.fingerprint
+    renamed = boundaries.geojson
+    renamed['features'][0]['properties']['NAME_3'] = 'Lain'
+    assert BoundarySet.from_geojson(renamed).fingerprint != boundaries.fingerprint
+
+
+def test_frame_fingerprint_tracks_values_and_columns():
+    df = pd.DataFrame({'Kecamatan': ['A', 'B'], 'Potensi': [1, 2]})
+    assert frame_fingerprint(df.copy()) == frame_fingerprint(df)
+    assert frame_fingerprint(df.assign(Potensi=[1, 3])) != frame_fingerprint(df)
+    assert frame_fingerprint(df.rename(columns={'Potensi': 'Realisasi'})) != frame_fingerprint(df)
+    assert fingerprint(['#fff'], (1.0, 2.0), 10) != fingerprint(['#fff'], (1.0, 2.0), 11)
+
+
+def test_rendered_map_depends_only_on_key_inputs():
+    # Key cache peta: fingerprint batas + fingerprint metrik + opsi; input sama harus menghasilkan peta sama
+    boundaries = synthetic_boundaries(4)
+    names = [properties['NAME_3'] for properties in boundaries.properties]
+    df = compute_metrics(pd.DataFrame({'Kecamatan': names, 'Potensi': [10, 20, 30, 40], 'Realisasi': [1, 2, 3, 4]}))
+
+    def render(frame):
+        return render_choropleth(boundaries, frame, frame_matcher(frame), list(MAP_PALETTE), get_color_by_percentage,
+                                 location=[-6.5, 106.8], zoom=10)
+
+    def html(rendered):
+        # Id elemen folium acak per render
+        return re.sub(r'_[0-9a-f]{32}', '_id', rendered['html'])
+
+    first, second = render(df), render(df.copy())
+    assert html(first) == html(second) and first['matched'] == 4
+    assert html(render(df.assign(Realisasi=[4, 3, 2, 1]))) != html(first)
@@ -0,0 +1,177 @@
+"""Uji SheetFetcher terhadap mock Apps Script lokal (tools/mock_apps_script.py).
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetcher import FetchError, SheetFetcher, check_sheet_url, make_session  # noqa: E402
+from scheduler import RefreshScheduler  # noqa: E402
+from tools.mock_apps_script import serve  # noqa: E402
+
+BACKOFF = 0.1
+
+
+@pytest.fixture
+def mock():
+    server, state = serve(rows=5)
+    yield f"http://127.0.0.1:{server.server_address[1]}/exec", state
+    server.shutdown()
+    server.server_close()
+
+
+def make_fetcher(retries=3, backoff=BACKOFF):
+    return SheetFetcher(make_session(retries=retries, backoff=backoff), timeout=5)
+
+
+def test_first_fetch_parses_data(mock):
+    url, state = mock
+    entry = make_fetcher().refresh(url)
+    assert list(entry['df'].columns) == ['kecamatan', 'potensi', 'realisasi']
+    assert len(entry['df']) == 5
+    assert entry['version'] == '1'
+    assert entry['etag'] == '"1"'
+    assert state.requests == 1
+
+
+def test_retry_with_backoff(mock):
+    url, state = mock
+    state.fail_next = 2
+    start = time.perf_counter()
+    entry = make_fetcher().refresh(url)
+    elapsed = time.perf_counter() - start
+    assert len(entry['df']) == 5
+    assert state.requests == 3
+    # urllib3: retry pertama langsung, berikutnya backoff * 2 ** (n - 1)
+    assert elapsed >= BACKOFF * 2
+
+
+def test_retries_exhausted_raises_fetch_error(mock):
+    url, state = mock
+    state.fail_next = 10
+    with pytest.raises(FetchError, match='HTTP 503'):
+        make_fetcher(retries=2, backoff=0).refresh(url)
+    assert state.requests == 3
+
+
+def test_connection_error_raises_fetch_error(mock):
+    url, _ = mock
+    closed = url.rsplit(':', 1)[0] + ':1/exec'
+    with pytest.raises(FetchError, match='Gagal menghubungi'):
+        make_fetcher(retries=1, backoff=0).refresh(closed)
+
+
+def test_etag_revalidation_reuses_frame(mock):
+    url, state = mock
+    fetcher = make_fetcher()
+    first = fetcher.refresh(url)
+    second = fetcher.refresh(url)
+    # 304: tidak di-parse ulang, objek DataFrame yang sama
+    assert second['df'] is first['df']
+    assert second['checked_at'] >= first['checked_at']
+    assert second['updated_at'] == first['updated_at']
+
+    state.change()
+    third = fetcher.refresh(url)
+    assert third['df'] is not first['df']
+    assert third['version'] == '2'
+    assert state.requests == 3
+
+
+def test_version_revalidation_without_etag(mock):
+    url, state = mock
+    fetcher = make_fetcher()
+    first = fetcher.refresh(url)
+    # Server tanpa ETag: validasi ulang lewat parameter version ({"status": "not_modified"})
+    fetcher._entries[url] = dict(first, etag=None)
+    second = fetcher.refresh(url)
+    assert second['df'] is first['df']
+    assert second['version'] == '1'
+
+
+def test_scheduler_keeps_last_data_on_error(mock):
+    url, state = mock
+    scheduler = RefreshScheduler(make_fetcher(retries=0, backoff=0), interval=3600)
+    snapshot = scheduler.snapshot(url, wait=5)
+    assert snapshot['error'] is None and snapshot['sequence'] == 1
+
+    state.fail_next = 1
+    scheduler.request_refresh(url)
+    deadline = time.time() + 5
+    while scheduler.snapshot(url)['checked_at'] == snapshot['checked_at'] and time.time() < deadline:
+        time.sleep(0.01)
+    failed = scheduler.snapshot(url)
+    assert 'HTTP 503' in failed['error']
+    assert failed['df'] is snapshot['df']
+    assert failed['sequence'] == 1
+
+
+def test_scheduler_notifies_listeners_on_change(mock):
+    url, state = mock
+    scheduler = RefreshScheduler(make_fetcher(), interval=3600, idle_timeout=0)
+    updates = []
+    scheduler.subscribe(lambda changed_url, snapshot: updates.append((changed_url, snapshot['sequence'])))
+    # Listener dipanggil dari worker tanpa ada yang membaca snapshot; pin mencegah URL lepas karena idle
+    scheduler.watch(url, pin=True)
+    deadline = time.time() + 5
+    while not updates and time.time() < deadline:
+        time.sleep(0.01)
+    assert updates == [(url, 1)]
+
+    # Revalidasi tanpa perubahan (304) tidak memanggil listener
+    scheduler.request_refresh(url)
+    while state.requests < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    state.change()
+    scheduler.request_refresh(url)
+    while len(updates) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert updates == [(url, 1), (url, 2)]
+
+
+@pytest.mark.parametrize('url', [
+    'https://script.google.com/macros/s/AKfy123/exec?action=getPotensiRealisasi',
+    '  https://script.google.com/macros/s/AKfy123/dev  ',
+])
+def test_check_sheet_url_accepts_apps_script(url):
+    assert check_sheet_url(url) == url.strip()
+
+
+@pytest.mark.parametrize('url', [
+    'http://script.google.com/macros/s/AKfy123/exec',
+    'https://example.com/macros/s/AKfy123/exec',
+    'https://script.google.com.evil.test/macros/s/AKfy123/exec',
+    'https://user:pw@script.google.com/macros/s/AKfy123/exec',
+    'https://script.google.com:8443/macros/s/AKfy123/exec',
+    'https://script.google.com/a/other',
+    'http://169.254.169.254/latest/meta-data',
+    'file:///etc/passwd',
+])
+def test_check_sheet_url_rejects_other_urls(url):
+    with pytest.raises(ValueError):
+        check_sheet_url(url)
+
+
+def test_check_sheet_url_extra_hosts(mock):
+    url, _ = mock
+    with pytest.raises(ValueError):
+        check_sheet_url(url)
+    assert check_sheet_url(url, ('127.0.0.1',)) == url
+
+
+def test_scheduler_caps_watched_urls(mock):
+    url, _ = mock
+    scheduler = RefreshScheduler(make_fetcher(), interval=3600, max_watched=2)
+    scheduler.watch(url)
+    scheduler.watch(url + '?a=1')
+    # URL yang sudah dipantau tetap boleh dibaca ulang
+    scheduler.watch(url)
+    with pytest.raises(FetchError, match='Terlalu banyak'):
+        scheduler.snapshot(url + '?a=2', wait=1)
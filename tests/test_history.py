@@ -0,0 +1,70 @@
+"""Uji SnapshotStore: snapshot identik dilewati, delta dan tren harian/mingguan.
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import datetime
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from history import SnapshotStore  # noqa: E402
+
+DAY = 24 * 3600
+START = int(datetime.datetime(2025, 6, 2, 9).timestamp())  # Senin
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['Kecamatan', 'Potensi', 'Realisasi'])
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'history.sqlite'))
+    yield store
+    store.close()
+
+
+def test_identical_snapshot_is_skipped(store, tmp_path):
+    df = frame([('Cibinong', 10, 1), ('Dramaga', 5, 0)])
+    assert store.append(df, 'sheet', START) is not None
+    assert store.append(df.copy(), 'sheet', START + 60) is None
+    # Urutan baris lain, isi sama
+    assert store.append(df.iloc[::-1], 'sheet', START + 120) is None
+    # Sumber lain punya riwayat sendiri
+    assert store.append(df, 'upload', START) is not None
+    assert store.append(frame([('Cibinong', 10, 2), ('Dramaga', 5, 0)]), 'sheet', START + 180) is not None
+    assert store.snapshot_count('sheet') == 2
+
+    # Digest terakhir dibaca dari database, jadi juga berlaku setelah dibuka ulang
+    reopened = SnapshotStore(store.path)
+    try:
+        assert reopened.append(frame([('Dramaga', 5, 0), ('Cibinong', 10, 2)]), 'sheet', START + 240) is None
+    finally:
+        reopened.close()
+
+
+def test_trend_levels_and_deltas(store):
+    store.append(frame([('Cibinong', 10, 1)]), 'sheet', START)
+    store.append(frame([('Cibinong', 12, 3)]), 'sheet', START + 3600)
+    store.append(frame([('Cibinong', 15, 5), ('Dramaga', 7, 0)]), 'sheet', START + DAY)
+    # Hari ketiga tanpa Dramaga: nilai terakhirnya tetap dihitung
+    store.append(frame([('Cibinong', 15, 9)]), 'sheet', START + 2 * DAY)
+
+    daily = store.trend('sheet', 'D')
+    assert daily['Potensi'].tolist() == [12, 22, 22]
+    assert daily['Realisasi'].tolist() == [3, 5, 9]
+    # Kecamatan baru dianggap delta 0
+    assert daily['Delta Potensi'].tolist() == [2, 3, 0]
+    assert daily['Delta Realisasi'].tolist() == [2, 2, 4]
+
+    weekly = store.trend('sheet', 'W-MON')
+    assert weekly[['Potensi', 'Realisasi', 'Delta Realisasi']].values.tolist() == [[22, 9, 8]]
+    assert store.trend('sheet', 'D', kecamatan='Dramaga')['Potensi'].tolist() == [7]
+    assert store.trend('sheet', 'D', kecamatan='Ciawi').empty
@@ -0,0 +1,83 @@
+"""Uji ingest: gabungan POTENSI/AKUISISI per kecamatan dan CSV per chunk.
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from generators import synthetic_csv, synthetic_workbook  # noqa: E402
+from ingest import merge_counts, read_potensi_akuisisi, stream_csv, stream_potensi_akuisisi  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def workbook(tmp_path_factory):
+    return synthetic_workbook(str(tmp_path_factory.mktemp('ingest') / 'data.xlsx'), 3000)
+
+
+def test_merge_counts_sums_name_variants():
+    potensi = pd.DataFrame({'Kecamatan': ['320101 Caringin', 'Kecamatan Caringin', 'Caringin', 'Cibinong'],
+                            'Potensi': [1, 2, 3, 4]})
+    akuisisi = pd.DataFrame({'Kecamatan': ['Caringin', 'Kecamatan Caringin', 'Dramaga'],
+                             'Realisasi': [1, 1, 5]})
+    df = merge_counts(potensi, akuisisi).set_index('Kecamatan')
+    assert df.index.is_unique
+    assert df.loc['Caringin'].tolist() == [6, 2]
+    assert df.loc['Cibinong'].tolist() == [4, 0]
+    assert df.loc['Dramaga'].tolist() == [0, 5]
+    # Input tidak diubah
+    assert potensi['Kecamatan'].tolist()[0] == '320101 Caringin'
+
+
+@pytest.mark.parametrize('reader', [read_potensi_akuisisi, stream_potensi_akuisisi])
+def test_workbook_totals_match_raw_sums(workbook, reader):
+    raw_potensi = pd.read_excel(workbook, sheet_name='POTENSI')
+    raw_akuisisi = pd.read_excel(workbook, sheet_name='AKUISISI')
+    df, _ = reader(workbook)
+    assert df['Kecamatan'].is_unique
+    assert df['Potensi'].sum() == raw_potensi['NILAI POTENSI'].sum()
+    assert df['Realisasi'].sum() == len(raw_akuisisi)
+
+
+def test_streaming_workbook_matches_pandas(workbook):
+    def canonical(frame, keys):
+        return frame.sort_values(keys).reset_index(drop=True)
+
+    df, info = read_potensi_akuisisi(workbook)
+    streamed, streamed_info = stream_potensi_akuisisi(workbook)
+    pd.testing.assert_frame_equal(canonical(streamed, ['Kecamatan']), canonical(df, ['Kecamatan']))
+    pd.testing.assert_frame_equal(canonical(streamed_info['desa_count'], ['Kecamatan', 'Desa']),
+                                  canonical(info['desa_count'], ['Kecamatan', 'Desa']))
+    assert streamed_info['potensi_value_col'] == info['potensi_value_col']
+
+
+def test_stream_csv_matches_full_read(tmp_path):
+    path = synthetic_csv(str(tmp_path / 'data.csv'), 5000)
+    raw = pd.read_csv(path)
+    expected = (raw.assign(kecamatan=raw['kecamatan'].str.strip())
+                .groupby('kecamatan')[['potensi', 'realisasi']].sum().sort_index())
+
+    with open(path, 'rb') as f:
+        fractions = []
+        # Chunk kecil: nama yang sama tersebar di banyak chunk
+        df = stream_csv(io.BytesIO(f.read()), chunksize=700, progress=fractions.append)
+    assert list(df.columns) == ['kecamatan', 'potensi', 'realisasi']
+    actual = df.set_index('kecamatan').sort_index().astype('int64')
+    pd.testing.assert_frame_equal(actual, expected, check_names=False)
+    assert len(fractions) == 8 and fractions[-1] == 1.0
+
+
+def test_stream_csv_coerces_bad_numbers():
+    data = b'Kecamatan,Potensi,Realisasi\nCibinong,10,x\n Cibinong ,n/a,3\nDramaga,5,\n'
+    df = stream_csv(io.BytesIO(data)).set_index('kecamatan')
+    assert df.loc['Cibinong'].tolist() == [10, 3]
+    assert df.loc['Dramaga'].tolist() == [5, 0]
@@ -0,0 +1,67 @@
+"""Uji payload peta live: geometry sekali, update berikutnya hanya data per key.
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from choropleth import MAP_PALETTE, render_choropleth  # noqa: E402
+from generators import synthetic_boundaries  # noqa: E402
+from livemap import build_live_update, geometry_payload, view_id  # noqa: E402
+from matching import frame_matcher  # noqa: E402
+from pipeline import compute_metrics, get_color_by_percentage  # noqa: E402
+
+
+def metrics(names, realisasi):
+    return compute_metrics(pd.DataFrame({'Kecamatan': names, 'Potensi': [100] * len(names),
+                                         'Realisasi': realisasi}))
+
+
+def test_geometry_and_data_payloads_share_keys():
+    boundaries = synthetic_boundaries(6)
+    names = [properties['NAME_3'] for properties in boundaries.properties]
+    df = metrics(names[:4], [10, 20, 30, 40])
+
+    geometry = geometry_payload(boundaries)
+    keys = [feature['properties']['key'] for feature in geometry['features']]
+    assert keys == [properties['GID_3'] for properties in boundaries.properties]
+    # Geometry tidak membawa metrik
+    assert all(set(feature['properties']) == {'key'} for feature in geometry['features'])
+
+    update = build_live_update(boundaries, df, frame_matcher(df), list(MAP_PALETTE), get_color_by_percentage)
+    assert list(update['data']) == keys
+    assert 'coordinates' not in json.dumps(update['data'])
+    assert update['data'][keys[2]]['properties']['realisasi'] == 30
+    assert not update['data'][keys[5]]['properties']['has_data']
+
+    # Hasil pencocokan sama dengan peta HTML statis
+    static = render_choropleth(boundaries, df, frame_matcher(df), list(MAP_PALETTE), get_color_by_percentage,
+                               location=[-6.5, 106.8], zoom=10)
+    assert (update['matched'], update['unmatched']) == (static['matched'], static['unmatched'])
+
+
+def test_refresh_changes_only_data():
+    boundaries = synthetic_boundaries(4)
+    names = [properties['NAME_3'] for properties in boundaries.properties]
+
+    def update(realisasi):
+        df = metrics(names, realisasi)
+        return build_live_update(boundaries, df, frame_matcher(df), list(MAP_PALETTE), get_color_by_percentage)
+
+    before, after = update([1, 2, 3, 4]), update([50, 2, 3, 4])
+    changed = [key for key in before['data'] if before['data'][key] != after['data'][key]]
+    assert changed == [boundaries.properties[0]['GID_3']]
+
+
+def test_view_id_ignores_float_noise():
+    assert view_id((-6.5, 106.8), 10) == view_id((-6.5000000001, 106.8), 10)
+    assert view_id((-6.5, 106.8), 10) != view_id((-6.5, 106.8), 11)
@@ -0,0 +1,62 @@
+"""Uji KecamatanMatcher: alias, kode, nama ambigu antar kabupaten dan fuzzy.
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from matching import KecamatanMatcher, ambiguous_names  # noqa: E402
+
+
+def feature(name, regency='Bogor', gid_2='IDN.9.5_1', **extra):
+    return dict({'NAME_3': name, 'NAME_2': regency, 'GID_2': gid_2}, **extra)
+
+
+def test_exact_alias_and_code_lookup():
+    matcher = KecamatanMatcher(['Cibinong', 'Darmaga', '320101 Nanggung', 'Kelapa Nunggal'])
+    positions = matcher.match_properties([
+        feature('Cibinong'),
+        feature('Dramaga'),                      # data memakai ejaan alias
+        feature('Lain', CC_3='320101'),          # hanya kode yang cocok
+        feature('Klapanunggal'),                 # alias feature = nama data tanpa spasi
+    ])
+    assert positions == [0, 1, 2, 3]
+    assert list(matcher.report()['Metode']) == ['exact', 'alias', 'code', 'exact']
+    assert matcher.unused == []
+
+
+def test_fuzzy_match_uses_only_unclaimed_rows():
+    matcher = KecamatanMatcher(['Cibinong', 'Cibungbulangg', 'Ciseeng'])
+    positions = matcher.match_properties([feature('Cibinong'), feature('Cibungbulang'), feature('Cibinongg')])
+    # 'Cibinongg' mirip baris 0, tetapi baris itu sudah dipakai feature exact
+    assert positions[:2] == [0, 1]
+    assert positions[2] != 0
+    assert matcher.report()['Metode'][1] == 'fuzzy'
+
+
+def test_fuzzy_below_threshold_is_unmatched():
+    matcher = KecamatanMatcher(['Cibinong'])
+    assert matcher.match_properties([feature('Parung Panjang')]) == [None]
+    assert matcher.unused == ['Cibinong']
+
+
+def test_ambiguous_names_need_regency():
+    features = [feature('Cisarua', 'Bogor', 'IDN.9.5_1'), feature('Cisarua', 'Bandung Barat', 'IDN.9.4_1')]
+    ambiguous = ambiguous_names(features)
+    assert ambiguous == frozenset({'cisarua'})
+
+    # Tanpa kolom kabupaten baris tidak ditempel ke polygon mana pun
+    matcher = KecamatanMatcher(['Cisarua'], ambiguous=ambiguous)
+    assert matcher.match_properties(features) == [None, None]
+    assert matcher.ambiguous == ['Cisarua']
+    assert set(matcher.report()['Metode']) == {'ambigu'}
+
+    # Dengan kabupaten, setiap baris ke kabupatennya sendiri
+    matcher = KecamatanMatcher(['Cisarua', 'Cisarua'], ['Kab. Bandung Barat', 'Kabupaten Bogor'], ambiguous)
+    assert matcher.match_properties(features) == [1, 0]
+    assert matcher.ambiguous == []
@@ -0,0 +1,94 @@
+"""Uji API metrik: negosiasi gzip (q-value) dan sumber file yang sementara hilang.
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import gzip
+import http.client
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core import prepare_frame  # noqa: E402
+from metrics_api import MetricsStore, _accepts_gzip, serve  # noqa: E402
+from tools.serve_metrics import file_source  # noqa: E402
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', True),
+    ('gzip, deflate, br', True),
+    ('deflate, gzip;q=0.5', True),
+    ('GZIP ; Q=1', True),
+    ('*', True),
+    ('gzip;q=0', False),
+    ('gzip;q=0.0, deflate', False),
+    ('*;q=0.5, gzip;q=0', False),
+    ('identity', False),
+    ('x-gzipped, notgzip', False),
+    ('gzip;q=abc', False),
+    ('', False),
+    (None, False),
+])
+def test_accepts_gzip(header, expected):
+    assert _accepts_gzip(header) is expected
+
+
+@pytest.fixture(scope='module')
+def server():
+    df, _, _ = prepare_frame(pd.DataFrame({'kecamatan': [f'Kecamatan {i}' for i in range(200)],
+                                           'potensi': range(200), 'realisasi': range(200)}))
+    store = MetricsStore()
+    store.publish(df, source='test')
+    server = serve(store, port=0)
+    yield server
+    server.shutdown()
+
+
+def get(server, path, accept_encoding):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+    connection.request('GET', path, headers={'Accept-Encoding': accept_encoding})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def test_gzip_refused_with_q_zero(server):
+    response, body = get(server, '/metrics.json', 'gzip')
+    assert response.getheader('Content-Encoding') == 'gzip'
+    plain = gzip.decompress(body)
+
+    response, body = get(server, '/metrics.json', 'gzip;q=0, identity')
+    assert response.getheader('Content-Encoding') is None
+    assert body == plain
+
+
+def test_file_source_survives_missing_file(tmp_path, capsys):
+    path = tmp_path / 'data.csv'
+    path.write_text('kecamatan,potensi,realisasi\nCibinong,10,1\n')
+    updates = file_source(str(path), 0.01)
+    raw, _ = next(updates)
+    assert raw['potensi'].tolist() == [10]
+
+    # File diganti: sempat hilang, lalu muncul lagi dengan isi baru
+    os.remove(path)
+
+    def recreate():
+        time.sleep(0.2)
+        path.write_text('kecamatan,potensi,realisasi\nCibinong,20,1\n')
+
+    thread = threading.Thread(target=recreate)
+    thread.start()
+    raw, _ = next(updates)
+    thread.join()
+    assert raw['potensi'].tolist() == [20]
+    # Error yang sama hanya dilaporkan sekali
+    assert capsys.readouterr().err.count('File tidak terbaca') == 1
@@ -0,0 +1,81 @@
+"""Uji PolygonIndex terhadap ray casting brute-force (hole, MultiPolygon, titik di luar).
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from generators import synthetic_boundaries  # noqa: E402
+from geostore import BoundarySet  # noqa: E402
+from spatial import PolygonIndex  # noqa: E402
+
+
+def brute_force(boundaries, lon, lat):
+    """Feature pertama yang memuat titik (even-odd per feature), -1 jika tidak ada"""
+    result = np.full(len(lon), -1, dtype=np.int64)
+    for i, (x, y) in enumerate(zip(lon, lat)):
+        for feature in range(len(boundaries)):
+            inside = False
+            for rings in boundaries.rings(feature):
+                for ring in rings:
+                    for (x1, y1), (x2, y2) in zip(ring[:-1], ring[1:]):
+                        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                            inside = not inside
+            if inside:
+                result[i] = feature
+                break
+    return result
+
+
+def square(x, y, size):
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+
+
+@pytest.fixture(scope='module')
+def mixed():
+    # Polygon dengan hole, MultiPolygon dua pulau, dan polygon kecil di dalam hole
+    return BoundarySet.from_geojson({'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'NAME_3': 'Donat'},
+         'geometry': {'type': 'Polygon', 'coordinates': [square(0, 0, 4), square(1, 1, 2)]}},
+        {'type': 'Feature', 'properties': {'NAME_3': 'Pulau'},
+         'geometry': {'type': 'MultiPolygon', 'coordinates': [[square(5, 0, 1)], [square(5, 3, 1)]]}},
+        {'type': 'Feature', 'properties': {'NAME_3': 'Enclave'},
+         'geometry': {'type': 'Polygon', 'coordinates': [square(1.5, 1.5, 1)]}},
+    ]})
+
+
+@pytest.mark.parametrize('grid', [4, 128])
+def test_mixed_geometry_matches_brute_force(mixed, grid):
+    rng = np.random.default_rng(0)
+    lon, lat = rng.uniform(-1, 7, 1500), rng.uniform(-1, 5, 1500)
+    located = PolygonIndex(mixed, grid=grid).locate(lon, lat)
+    np.testing.assert_array_equal(located, brute_force(mixed, lon, lat))
+    assert set(located) == {-1, 0, 1, 2}
+
+
+@pytest.mark.parametrize('grid', [8, 128])
+def test_grid_matches_brute_force(grid):
+    boundaries = synthetic_boundaries(25)
+    rng = np.random.default_rng(1)
+    bounds = boundaries.bounds()
+    xmin, ymin = bounds[:, :2].min(axis=0)
+    xmax, ymax = bounds[:, 2:].max(axis=0)
+    lon = rng.uniform(xmin - 0.05, xmax + 0.05, 800)
+    lat = rng.uniform(ymin - 0.05, ymax + 0.05, 800)
+    located = PolygonIndex(boundaries, grid=grid).locate(lon, lat)
+    np.testing.assert_array_equal(located, brute_force(boundaries, lon, lat))
+
+
+def test_locator_names_and_pickle(mixed):
+    locator = pickle.loads(pickle.dumps(PolygonIndex(mixed).locator(['Donat', 'Pulau', 'Enclave'])))
+    assert list(locator([0.5, 2, 2, 5.5, 10], [0.5, 1.2, 2, 3.5, 10])) == ['Donat', None, 'Enclave', 'Pulau', None]
@@ -0,0 +1,82 @@
+"""Uji penyederhanaan batas per arc bersama dan pemilihan level detail.
+
+Jalankan dari root repo:
+
+    python -m pytest tests
+"""
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from generators import synthetic_boundaries  # noqa: E402
+from topology import (SIMPLIFY_TOLERANCES, build_levels, choose_level_index, pixel_size,  # noqa: E402
+                      simplify_mask, zoom_for_bounds)
+
+
+def segment_counts(boundaries):
+    """Jumlah pemakaian setiap segmen (tanpa arah) di semua ring"""
+    counts = Counter()
+    offsets = boundaries.ring_offsets
+    for ring in range(len(offsets) - 1):
+        points = [tuple(point) for point in boundaries.coords[offsets[ring]:offsets[ring + 1]].tolist()]
+        counts.update(frozenset(pair) for pair in zip(points, points[1:]))
+    return counts
+
+
+def outline_length(counts):
+    """Panjang segmen yang hanya dipakai satu ring (batas luar, atau celah antar tetangga)"""
+    return sum(np.hypot(*np.subtract(*tuple(segment))) for segment, count in counts.items() if count == 1)
+
+
+@pytest.fixture(scope='module')
+def levels():
+    return build_levels(synthetic_boundaries(36, vertices_per_edge=24))
+
+
+def test_levels_get_coarser_and_stay_valid(levels):
+    assert [tolerance for tolerance, _ in levels] == sorted(SIMPLIFY_TOLERANCES)
+    sizes = [len(boundaries.coords) for _, boundaries in levels]
+    assert sizes == sorted(sizes, reverse=True) and sizes[-1] < sizes[0]
+    for _, boundaries in levels:
+        assert len(boundaries) == 36
+        offsets = boundaries.ring_offsets
+        for ring in range(len(offsets) - 1):
+            points = boundaries.coords[offsets[ring]:offsets[ring + 1]]
+            assert len(points) >= 4 and np.array_equal(points[0], points[-1])
+
+
+def test_shared_borders_stay_identical(levels):
+    full = segment_counts(levels[0][1])
+    for _, boundaries in levels[1:]:
+        counts = segment_counts(boundaries)
+        # Batas bersama tetap sama di kedua sisi: tidak ada celah/tumpang tindih antar tetangga,
+        # jadi segmen tunggal hanya batas luar yang makin pendek
+        assert max(counts.values()) == 2
+        assert outline_length(counts) <= outline_length(full) + 1e-9
+
+
+def test_simplify_mask_keeps_ends_and_closed_rings():
+    line = np.array([[0, 0], [1, 0.001], [2, 0], [3, 1], [4, 0]], dtype=float)
+    assert simplify_mask(line, 0.01).tolist() == [True, False, True, True, True]
+    ring = np.array([[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]], dtype=float)
+    assert simplify_mask(ring, 10).sum() >= 4
+
+
+def test_choose_level_follows_zoom_and_budget():
+    tolerances = [0.0, 0.0005, 0.001, 0.002, 0.005]
+    counts = [400_000, 150_000, 90_000, 50_000, 20_000]
+    # Toleransi harus <= setengah pixel: zoom dekat memakai level detail
+    assert choose_level_index(tolerances, counts, 16, vertex_budget=10 ** 9) == 0
+    assert tolerances[choose_level_index(tolerances, counts, 9, vertex_budget=10 ** 9)] <= pixel_size(9) / 2
+    # Melebihi budget: naik ke level yang lebih kasar
+    assert choose_level_index(tolerances, counts, 16, vertex_budget=100_000) == 2
+    # Zoom terbesar yang masih memuat bounds dalam 600 pixel
+    zoom = zoom_for_bounds((106.4, -6.8, 107.2, -6.2), 600)
+    assert pixel_size(zoom) * 600 >= 0.8 > pixel_size(zoom + 1) * 600
@@ -0,0 +1,63 @@
+"""Konversi batas wilayah GeoJSON <-> format ringkas (.bnd).
+
+Contoh, dari root repo:
+
+    python tools/convert_boundaries.py bogor_regency.json bogor_regency.bnd
+    python tools/convert_boundaries.py bogor_regency.bnd check.geojson
+    python tools/convert_boundaries.py gadm41_IDN_3.json jawa_barat.bnd --where GID_1=IDN.9_1
+
+Format ringkas berisi header JSON (properti, toleransi, layout) diikuti
+array mentah tanpa kompresi: koordinat ring terkuantisasi per level, yang
+disederhanakan dari arc bersama agar batas antar-wilayah tetap berimpit.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from boundaryfile import COMPACT_SUFFIX, QUANTUM, load_compact, save_compact  # noqa: E402
+from geostore import BoundarySet, thaw  # noqa: E402
+from topology import SIMPLIFY_TOLERANCES  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help="File .json/.geojson atau .bnd")
+    parser.add_argument('output', help="File tujuan (.bnd atau .geojson)")
+    parser.add_argument('--tolerances', type=float, nargs='+', default=SIMPLIFY_TOLERANCES,
+                        help="Toleransi Douglas-Peucker (derajat) untuk level sederhana")
+    parser.add_argument('--quantum', type=float, default=QUANTUM, help="Resolusi kuantisasi (derajat)")
+    parser.add_argument('--where', metavar='FIELD=VALUE',
+                        help="Hanya feature dengan properties FIELD=VALUE (mis. GID_1=IDN.9_1 untuk Jawa Barat)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.source.endswith(COMPACT_SUFFIX):
+        levels = load_compact(args.source)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(thaw(levels[0][1].geojson), f)
+    else:
+        with open(args.source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if args.where:
+            field, _, value = args.where.partition('=')
+            data['features'] = [
+                feature for feature in data.get('features', [])
+                if str((feature.get('properties') or {}).get(field)) == value
+            ]
+        boundaries = BoundarySet.from_geojson(data)
+        save_compact(args.output, boundaries, args.tolerances, args.quantum)
+        levels = load_compact(args.output)
+    elapsed = time.perf_counter() - start
+
+    for tolerance, vertices in zip(levels.tolerances, levels.vertex_counts):
+        print(f"tolerance={tolerance:<8g} vertices={vertices:>8,}")
+    print(f"{args.source} ({os.path.getsize(args.source):,} bytes) -> "
+          f"{args.output} ({os.path.getsize(args.output):,} bytes) in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
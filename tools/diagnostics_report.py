@@ -0,0 +1,50 @@
+"""Ringkas log instrumentasi dashboard (JSON Lines) menjadi persentil per tahap.
+
+Contoh, dari root repo:
+
+    python tools/diagnostics_report.py diagnostics.jsonl
+    python tools/diagnostics_report.py logs/*.jsonl --since 2025-06-01 --percentiles 50 95 99
+    python tools/diagnostics_report.py diagnostics.jsonl --field cpu_ms --csv cpu.csv
+
+Dashboard hanya menulis log jika DASHBOARD_DIAGNOSTICS_LOG diset (mis.
+DASHBOARD_DIAGNOSTICS_LOG=diagnostics.jsonl streamlit run app.py); file
+dirotasi ke .1 saat mencapai instrument.LOG_MAX_BYTES.
+
+Log dari beberapa server/proses bisa digabung; setiap baris adalah satu
+rerun dari satu session (lihat instrument.StageRecorder).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrument import STAGE_FIELDS, read_log, stage_percentiles  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('logs', nargs='+', help="File log .jsonl")
+    parser.add_argument('--since', help="Hanya rerun sejak waktu ini (ISO, mis. 2025-06-01 atau 2025-06-01T08:00)")
+    parser.add_argument('--field', default='wall_ms', choices=[f for f in STAGE_FIELDS if f != 'calls'])
+    parser.add_argument('--percentiles', type=int, nargs='+', default=[50, 95])
+    parser.add_argument('--csv', help="Tulis hasil juga ke file CSV")
+    args = parser.parse_args()
+
+    records = [record for path in args.logs for record in read_log(path)]
+    if args.since:
+        # Timestamp ISO dengan format sama bisa dibandingkan sebagai string
+        records = [record for record in records if record.get('timestamp', '') >= args.since]
+    if not records:
+        sys.exit("Tidak ada rerun di log")
+
+    table = stage_percentiles(records, tuple(args.percentiles), args.field)
+    table = table.sort_values(f"p{args.percentiles[-1]}", ascending=False)
+    print(f"{len(records):,} rerun, {len({record.get('session') for record in records}):,} session ({args.field})")
+    print(table.to_string(index=False))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Gabungkan banyak workbook/CSV (file, direktori atau zip) menjadi satu rekap per kecamatan.
+
+Contoh, dari root repo:
+
+    python tools/ingest_batch.py data/ --output rekap.csv
+    python tools/ingest_batch.py kantor_a.zip kantor_b.xlsx --output rekap.csv --desa rekap_desa.csv --streaming
+
+Sama dengan upload banyak file di dashboard: setiap file di-parse di
+process pool dan diringkas per kecamatan, lalu hasilnya dijumlahkan
+(lihat batch.ingest_batch). File yang gagal dilaporkan tanpa menghentikan
+file lain.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import expand_upload, ingest_batch, read_directory  # noqa: E402
+
+
+def collect_files(paths):
+    """List (nama, bytes) dari argumen; direktori dibaca rekursif, zip dibongkar"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(read_directory(path))
+        else:
+            with open(path, 'rb') as f:
+                files.extend(expand_upload(os.path.basename(path), f.read()))
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', help="File CSV/Excel/zip atau direktori")
+    parser.add_argument('--output', default='rekap.csv', help="CSV rekap per kecamatan")
+    parser.add_argument('--desa', help="CSV rekap per desa (jika ada file dengan kolom desa)")
+    parser.add_argument('--streaming', action='store_true', help="Parse workbook POTENSI & AKUISISI per baris")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: jumlah CPU)")
+    args = parser.parse_args()
+
+    files = collect_files(args.paths)
+    if not files:
+        parser.error("tidak ada file CSV/Excel/zip")
+
+    start = time.perf_counter()
+    result = ingest_batch(
+        files, streaming=args.streaming, max_workers=args.workers,
+        progress=lambda fraction: print(f"\r{fraction:.0%}", end='', file=sys.stderr)
+    )
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    result['df'].to_csv(args.output, index=False)
+    if args.desa and result['desa_count'] is not None:
+        result['desa_count'].to_csv(args.desa, index=False)
+    print(result['files'].to_string(index=False))
+    for name, error in result['errors']:
+        print(f"GAGAL {name}: {error}")
+    print(f"{len(files) - len(result['errors'])}/{len(files)} file, {len(result['df'])} kecamatan, "
+          f"potensi {int(result['df']['Potensi'].sum()):,} -> {args.output} in {elapsed:.1f}s")
+    sys.exit(1 if result['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
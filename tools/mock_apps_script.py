@@ -0,0 +1,142 @@
+"""Server HTTP lokal yang meniru kontrak Google Apps Script ({status, data}).
+
+Contoh, dari root repo:
+
+    python tools/mock_apps_script.py --port 8765 --rows 40
+    # lalu jalankan app dengan DASHBOARD_SHEET_HOSTS=127.0.0.1 dan isi
+    # "Google Apps Script URL" dengan http://127.0.0.1:8765/exec
+
+Respons membawa field version dan header ETag. Request dengan
+?version=<sama> dibalas {"status": "not_modified"}, dan If-None-Match yang
+cocok dibalas 304. Opsi --latency, --fail-rate dan --change-every berguna
+untuk menguji retry, validasi ulang dan beban; SheetState.fail_next
+membuat N request berikutnya gagal (503) secara deterministik.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+KECAMATAN = [
+    'Babakan Madang', 'Bojonggede', 'Caringin', 'Cariu', 'Ciampea', 'Ciawi', 'Cibinong', 'Cibungbulang',
+    'Cigombong', 'Cigudeg', 'Cijeruk', 'Cileungsi', 'Ciomas', 'Cisarua', 'Ciseeng', 'Citeureup', 'Dramaga',
+    'Gunung Putri', 'Gunung Sindur', 'Jasinga', 'Jonggol', 'Kemang', 'Klapanunggal', 'Leuwiliang',
+    'Leuwisadeng', 'Megamendung', 'Nanggung', 'Pamijahan', 'Parung', 'Parung Panjang', 'Rancabungur',
+    'Rumpin', 'Sukajaya', 'Sukamakmur', 'Sukaraja', 'Tajurhalang', 'Tamansari', 'Tanjungsari', 'Tenjo',
+    'Tenjolaya',
+]
+
+
+class SheetState:
+    """Isi 'sheet' palsu; versi naik setiap kali data berubah"""
+
+    def __init__(self, rows, seed=0):
+        self.rows = rows
+        self.random = random.Random(seed)
+        self.version = 0
+        self.requests = 0
+        # Jumlah request berikutnya yang dibalas 503
+        self.fail_next = 0
+        self.lock = threading.Lock()
+        self.body = None
+        self.change()
+
+    def change(self):
+        with self.lock:
+            self.version += 1
+            data = []
+            for i in range(self.rows):
+                potensi = self.random.randint(1_000, 40_000)
+                data.append({
+                    'kecamatan': KECAMATAN[i % len(KECAMATAN)] + ('' if i < len(KECAMATAN) else f' {i}'),
+                    'potensi': potensi,
+                    'realisasi': self.random.randint(0, potensi),
+                })
+            self.body = json.dumps({'status': 'ok', 'version': str(self.version), 'data': data}).encode('utf-8')
+
+    def snapshot(self):
+        with self.lock:
+            return str(self.version), self.body
+
+
+def make_handler(state, latency=0.0, fail_rate=0.0, seed=0):
+    failures = random.Random(seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            with state.lock:
+                state.requests += 1
+                fail = state.fail_next > 0
+                state.fail_next -= fail
+            if latency:
+                time.sleep(latency)
+            if fail or (fail_rate and failures.random() < fail_rate):
+                self._send(503, b'{"status": "error", "message": "mock failure"}')
+                return
+
+            version, body = state.snapshot()
+            etag = f'"{version}"'
+            query = parse_qs(urlparse(self.path).query)
+            if self.headers.get('If-None-Match') == etag:
+                self._send(304, b'', etag)
+            elif query.get('version', [None])[0] == version:
+                self._send(200, json.dumps({'status': 'not_modified', 'version': version}).encode('utf-8'), etag)
+            else:
+                self._send(200, body, etag)
+
+        def _send(self, code, body, etag=None):
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=0, rows=40, latency=0.0, fail_rate=0.0, change_every=0.0, seed=0):
+    """Jalankan server di thread latar belakang; return (server, state). port=0 memilih port bebas."""
+    state = SheetState(rows, seed)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state, latency, fail_rate, seed))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    if change_every:
+        def tick():
+            while True:
+                time.sleep(change_every)
+                state.change()
+        threading.Thread(target=tick, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rows', type=int, default=40, help="Jumlah baris kecamatan")
+    parser.add_argument('--latency', type=float, default=0.0, help="Jeda per request (detik)")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Peluang membalas 503 (0-1)")
+    parser.add_argument('--change-every', type=float, default=0.0, help="Ubah data setiap N detik (0 = tidak)")
+    args = parser.parse_args()
+
+    server, _ = serve(args.port, args.rows, args.latency, args.fail_rate, args.change_every)
+    print(f"Mock Apps Script di http://127.0.0.1:{server.server_address[1]}/exec (Ctrl+C untuk berhenti)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
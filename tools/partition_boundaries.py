@@ -0,0 +1,50 @@
+"""Pecah batas desa GeoJSON (GADM level 4) menjadi partisi per kecamatan.
+
+Contoh, dari root repo:
+
+    python tools/partition_boundaries.py gadm41_IDN_4.json desa_partitions --parent IDN.9.5_1
+
+Setiap kecamatan (GID_3) ditulis sebagai satu file .bnd (format ringkas,
+lihat tools/convert_boundaries.py) ditambah index.json. Dashboard hanya
+membuka partisi kecamatan yang diklik, jadi file besar tidak perlu dimuat.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geostore import BoundarySet  # noqa: E402
+from partitions import write_partitions  # noqa: E402
+from topology import SIMPLIFY_TOLERANCES  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help="File .json/.geojson batas desa (GADM level 4)")
+    parser.add_argument('output', help="Direktori partisi (mis. desa_partitions)")
+    parser.add_argument('--parent', help="Hanya desa dengan GID_2 ini (mis. IDN.9.5_1 untuk Kabupaten Bogor)")
+    parser.add_argument('--tolerances', type=float, nargs='+', default=SIMPLIFY_TOLERANCES,
+                        help="Toleransi Douglas-Peucker (derajat) untuk level sederhana")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.source, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if args.parent:
+        data['features'] = [
+            feature for feature in data.get('features', [])
+            if (feature.get('properties') or {}).get('GID_2') == args.parent
+        ]
+    index = write_partitions(BoundarySet.from_geojson(data), args.output, args.tolerances)
+    elapsed = time.perf_counter() - start
+
+    size = sum(os.path.getsize(os.path.join(args.output, entry['file'])) for entry in index.values())
+    print(f"{len(index)} kecamatan, {sum(entry['features'] for entry in index.values()):,} desa -> "
+          f"{args.output} ({size:,} bytes) in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Render dashboard statis (HTML + CSV) untuk banyak dataset tanpa Streamlit.
+
+Contoh, dari root repo:
+
+    python tools/render_reports.py data/*.xlsx --boundaries bogor_regency.bnd --output reports
+    python tools/render_reports.py --manifest jobs.csv --output reports --workers 8
+
+Manifest CSV berisi kolom data, boundaries (opsional) dan name (opsional).
+Setiap dataset menghasilkan <name>.html (metrik, peta, pie, Top 10, tabel
+monitoring) dan <name>.csv; index.csv merangkum semua laporan. File batas
+di-parse sekali lalu dipakai bersama oleh semua job.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import BATCH_EXTENSIONS  # noqa: E402
+from report import render_reports  # noqa: E402
+
+DEFAULT_BOUNDARIES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bogor_regency.bnd')
+
+
+def expand_paths(paths):
+    """File data dari argumen; direktori dibaca (rekursif) untuk CSV/Excel"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith(BATCH_EXTENSIONS))
+        else:
+            files.append(path)
+    return files
+
+
+def make_jobs(data_files, boundaries, manifest=None):
+    """List job {name, data, boundaries}; nama diambil dari nama file dan dibuat unik"""
+    rows = []
+    if manifest:
+        for row in pd.read_csv(manifest).to_dict('records'):
+            rows.append((row['data'], row.get('boundaries') if isinstance(row.get('boundaries'), str) else boundaries,
+                         row.get('name') if isinstance(row.get('name'), str) else None))
+    rows.extend((path, boundaries, None) for path in data_files)
+
+    jobs = []
+    used = set()
+    for data, boundary_file, name in rows:
+        base = name or os.path.splitext(os.path.basename(data))[0]
+        name, suffix = base, 2
+        while name in used:
+            name, suffix = f"{base}_{suffix}", suffix + 1
+        used.add(name)
+        jobs.append({'name': name, 'data': data, 'boundaries': boundary_file})
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data', nargs='*', help="File CSV/Excel atau direktori")
+    parser.add_argument('--manifest', help="CSV berisi kolom data, boundaries, name")
+    parser.add_argument('--boundaries', default=DEFAULT_BOUNDARIES, help="File batas (.bnd/.geojson) default")
+    parser.add_argument('--output', default='reports', help="Direktori hasil")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: jumlah CPU)")
+    parser.add_argument('--plotlyjs', choices=['inline', 'cdn'], default='inline',
+                        help="inline: HTML bisa dibuka offline (plotly.js ditanam); cdn: file lebih kecil")
+    args = parser.parse_args()
+
+    jobs = make_jobs(expand_paths(args.data), args.boundaries, args.manifest)
+    if not jobs:
+        parser.error("tidak ada dataset (beri file/direktori atau --manifest)")
+
+    start = time.perf_counter()
+    summary = render_reports(
+        jobs, args.output, max_workers=args.workers, plotlyjs=args.plotlyjs,
+        progress=lambda done, total: print(f"\r{done}/{total} laporan", end='', file=sys.stderr)
+    )
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    failed = summary[summary['status'] != 'ok']
+    for row in failed.itertuples():
+        print(f"GAGAL {row.name}: {row.error}")
+    print(f"{len(summary) - len(failed)}/{len(summary)} laporan -> {args.output} in {elapsed:.1f}s")
+    sys.exit(1 if len(failed) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""API metrik read-only (JSON/CSV) sebagai proses terpisah dari dashboard.
+
+Contoh, dari root repo:
+
+    python tools/serve_metrics.py --url "https://script.google.com/macros/s/.../exec" --port 8502
+    python tools/serve_metrics.py --file data.xlsx --port 8502
+
+    curl http://127.0.0.1:8502/metrics.json      # tabel per kecamatan
+    curl http://127.0.0.1:8502/totals.csv        # total seperti baris metrik dashboard
+    curl http://127.0.0.1:8502/unmatched.json    # kecamatan tanpa batas peta / tanpa data
+
+Snapshot dibangun ulang hanya saat data berubah (snapshot Apps Script baru
+atau file di disk berubah); request dilayani dari bytes yang sudah jadi,
+dengan ETag/304 dan gzip.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from boundaryfile import load_compact  # noqa: E402
+from core import load_file, prepare_frame  # noqa: E402
+from fetcher import SheetFetcher  # noqa: E402
+from metrics_api import MetricsStore, serve  # noqa: E402
+from scheduler import RefreshScheduler  # noqa: E402
+
+DEFAULT_BOUNDARIES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bogor_regency.bnd')
+
+
+def sheet_source(url, interval):
+    """Generator (df mentah, updated_at) setiap kali snapshot Apps Script berubah"""
+    scheduler = RefreshScheduler(SheetFetcher(), interval=interval)
+    sequence = None
+    while True:
+        snapshot = scheduler.snapshot(url, wait=interval)
+        if snapshot is not None and snapshot['error']:
+            print(f"Refresh gagal: {snapshot['error']}", file=sys.stderr)
+        if snapshot is not None and snapshot['df'] is not None and snapshot['sequence'] != sequence:
+            sequence = snapshot['sequence']
+            yield snapshot['df'], snapshot['updated_at']
+        time.sleep(1)
+
+
+def file_source(path, interval):
+    """Generator (df mentah, updated_at) setiap kali file berubah (mtime).
+
+    File yang sementara hilang atau tidak terbaca (mis. sedang diganti)
+    dilaporkan sekali lalu dicek lagi pada interval berikutnya; API tetap
+    melayani snapshot terakhir.
+    """
+    mtime = None
+    error = None
+    while True:
+        raw = None
+        try:
+            current = os.path.getmtime(path)
+            if current != mtime:
+                raw = load_file(path)['df']
+                mtime = current
+            error = None
+        except OSError as e:
+            if str(e) != error:
+                error = str(e)
+                print(f"File tidak terbaca, memakai snapshot terakhir: {e}", file=sys.stderr)
+        if raw is not None:
+            yield raw, current
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--url', help="URL Google Apps Script")
+    source.add_argument('--file', help="File CSV/Excel (dibaca ulang jika berubah)")
+    parser.add_argument('--boundaries', default=DEFAULT_BOUNDARIES,
+                        help="Batas .bnd untuk daftar unmatched (kosongkan untuk tanpa peta)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--interval', type=float, default=60, help="Interval cek perubahan data (detik)")
+    args = parser.parse_args()
+
+    boundaries = load_compact(args.boundaries)[0][1] if args.boundaries else None
+    store = MetricsStore()
+    server = serve(store, args.host, args.port)
+    print(f"Metrics API di http://{args.host}:{server.server_address[1]}/metrics.json (Ctrl+C untuk berhenti)")
+
+    updates = sheet_source(args.url, args.interval) if args.url else file_source(args.file, args.interval)
+    label = f"sheets:{args.url}" if args.url else f"file:{os.path.basename(args.file)}"
+    try:
+        for raw, updated_at in updates:
+            try:
+                df, _, _ = prepare_frame(raw)
+            except ValueError as e:
+                print(f"Data tidak valid: {e}", file=sys.stderr)
+                continue
+            if store.publish(df, boundaries, source=label, updated_at=updated_at):
+                print(f"Snapshot {store.snapshot()['version']}: {len(df)} kecamatan")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+import numpy as np
+
+from geostore import BoundarySet
+
+# Toleransi (derajat) yang di-precompute; 0 = resolusi penuh GADM
+SIMPLIFY_TOLERANCES = (0.0, 0.0005, 0.001, 0.002, 0.005)
+
+# Batas jumlah vertex yang dikirim ke browser dalam satu peta
+VERTEX_BUDGET = 200_000
+
+
+class Topology:
+    """Ring polygon yang dipecah menjadi arc bersama (seperti TopoJSON).
+
+    Batas antara dua kecamatan disimpan sekali sebagai satu arc; ring
+    merujuk arc lewat (index, reversed). Menyederhanakan arc, bukan ring,
+    menjaga batas bersama tetap identik di kedua sisi.
+    """
+
+    def __init__(self, boundaries, arcs, ring_arcs):
+        self.boundaries = boundaries
+        self.arcs = arcs
+        self.ring_arcs = ring_arcs
+
+    @classmethod
+    def from_boundaries(cls, boundaries):
+        coords = boundaries.coords
+        offsets = boundaries.ring_offsets
+        rings = [
+            [tuple(point) for point in coords[offsets[i]:offsets[i + 1]].tolist()]
+            for i in range(len(offsets) - 1)
+        ]
+
+        # Titik yang tetangganya berbeda di ring lain adalah junction
+        neighbours = {}
+        for ring in rings:
+            points = ring[:-1] if len(ring) > 1 and ring[0] == ring[-1] else ring
+            n = len(points)
+            for i, point in enumerate(points):
+                pair = frozenset((points[i - 1], points[(i + 1) % n]))
+                neighbours.setdefault(point, set()).add(pair)
+        junctions = {point for point, pairs in neighbours.items() if len(pairs) > 1}
+
+        arcs = []
+        arc_index = {}
+
+        def add_arc(points):
+            key = tuple(points)
+            if key in arc_index:
+                return arc_index[key], False
+            reverse_key = key[::-1]
+            if reverse_key in arc_index:
+                return arc_index[reverse_key], True
+            arc_index[key] = len(arcs)
+            arcs.append(np.array(points, dtype=np.float64).reshape(-1, 2))
+            return arc_index[key], False
+
+        ring_arcs = []
+        for ring in rings:
+            points = ring[:-1] if len(ring) > 1 and ring[0] == ring[-1] else ring
+            cuts = [i for i, point in enumerate(points) if point in junctions]
+            if not cuts:
+                # Ring tanpa junction (pulau / enclave): satu arc tertutup,
+                # diputar ke titik terkecil supaya ring kembar dikenali
+                start = min(range(len(points)), key=points.__getitem__) if points else 0
+                rotated = points[start:] + points[:start]
+                ring_arcs.append([add_arc(rotated + rotated[:1])])
+                continue
+            rotated = points[cuts[0]:] + points[:cuts[0]]
+            cuts = [i - cuts[0] for i in cuts] + [len(points)]
+            rotated = rotated + rotated[:1]
+            ring_arcs.append([add_arc(rotated[a:b + 1]) for a, b in zip(cuts[:-1], cuts[1:])])
+
+        return cls(boundaries, arcs, ring_arcs)
+
+    @property
+    def shared_vertex_count(self):
+        return sum(len(arc) for arc in self.arcs)
+
+    def ring_coords(self, ring, arcs=None):
+        """Koordinat ring ke-i yang disusun ulang dari arc"""
+        arcs = self.arcs if arcs is None else arcs
+        pieces = []
+        for i, (index, reverse) in enumerate(self.ring_arcs[ring]):
+            arc = arcs[index][::-1] if reverse else arcs[index]
+            pieces.append(arc if i == 0 else arc[1:])
+        return np.concatenate(pieces)
+
+    def simplified_arcs(self, tolerance):
+        """Arc setelah Douglas-Peucker; arc milik ring yang runtuh (< 4 titik) tidak disederhanakan"""
+        if tolerance <= 0:
+            return list(self.arcs)
+        arcs = [arc[simplify_mask(arc, tolerance)] for arc in self.arcs]
+
+        # Arc asli dipakai di semua ring yang berbagi arc tersebut,
+        # supaya batas tetap konsisten
+        for ring in range(len(self.ring_arcs)):
+            if len(self.ring_coords(ring, arcs)) < 4:
+                for index, _ in self.ring_arcs[ring]:
+                    arcs[index] = self.arcs[index]
+        return arcs
+
+    def to_boundaries(self, arcs):
+        """BoundarySet dengan ring yang disusun dari arc yang diberikan"""
+        ring_offsets = [0]
+        coords = []
+        for ring in range(len(self.ring_arcs)):
+            points = self.ring_coords(ring, arcs)
+            coords.append(points)
+            ring_offsets.append(ring_offsets[-1] + len(points))
+
+        source = self.boundaries
+        return BoundarySet(
+            np.concatenate(coords) if coords else np.empty((0, 2)),
+            ring_offsets,
+            source.part_offsets,
+            source.feature_offsets,
+            source.geometry_types,
+            source.properties,
+            source.other_geometries,
+        )
+
+    def simplify(self, tolerance):
+        """BoundarySet baru dengan setiap arc disederhanakan (Douglas-Peucker)"""
+        if tolerance <= 0:
+            return self.boundaries
+        return self.to_boundaries(self.simplified_arcs(tolerance))
+
+
+def simplify_mask(points, tolerance):
+    """Mask titik yang dipertahankan oleh Douglas-Peucker; titik ujung selalu dipertahankan.
+
+    Arc tertutup (titik awal == akhir) dipecah di titik terjauh agar hasilnya
+    tetap berupa ring dengan minimal 3 titik berbeda.
+    """
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    if n <= 2:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+
+    stack = [(0, n - 1)]
+    if np.array_equal(points[0], points[-1]):
+        far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+        keep[far] = True
+        stack = [(0, far), (far, n - 1)]
+        # Titik ketiga: terjauh dari garis awal - far
+        segment = _segment_distance(points, 0, far)
+        third = int(np.argmax(segment))
+        keep[third] = True
+
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        distance = _segment_distance(points, start, end)[start + 1:end]
+        i = int(np.argmax(distance))
+        if distance[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+
+def _segment_distance(points, start, end):
+    """Jarak semua titik ke segmen points[start]-points[end]"""
+    a = points[start]
+    b = points[end]
+    ab = b - a
+    length2 = float(ab @ ab)
+    if length2 == 0:
+        return np.hypot(*(points - a).T)
+    t = np.clip(((points - a) @ ab) / length2, 0, 1)
+    projection = a + t[:, None] * ab
+    return np.hypot(*(points - projection).T)
+
+
+def build_levels(boundaries, tolerances=SIMPLIFY_TOLERANCES):
+    """Daftar (toleransi, BoundarySet) dari yang paling detail ke paling kasar"""
+    topology = Topology.from_boundaries(boundaries)
+    return [(tolerance, topology.simplify(tolerance)) for tolerance in sorted(tolerances)]
+
+
+def pixel_size(zoom):
+    """Lebar satu pixel (derajat bujur) pada zoom Web Mercator"""
+    return 360.0 / (256 * 2 ** zoom)
+
+
+def zoom_for_bounds(bounds, pixels=600, max_zoom=16):
+    """Zoom terbesar yang masih memuat bounds (minx, miny, maxx, maxy) dalam lebar/tinggi pixels"""
+    minx, miny, maxx, maxy = bounds
+    span = max(maxx - minx, maxy - miny, 1e-9)
+    zoom = 0
+    while zoom < max_zoom and span <= pixel_size(zoom + 1) * pixels:
+        zoom += 1
+    return zoom
+
+
+def choose_level_index(tolerances, vertex_counts, zoom, vertex_budget=VERTEX_BUDGET):
+    """Index level untuk dirender.
+
+    Level paling kasar yang toleransinya masih <= setengah pixel pada zoom
+    tersebut; jika vertex-nya melebihi budget (mis. banyak feature), naik ke
+    level yang lebih kasar.
+    """
+    limit = pixel_size(zoom) / 2
+    candidates = [i for i, tolerance in enumerate(tolerances) if tolerance <= limit]
+    choice = candidates[-1] if candidates else 0
+    while choice < len(tolerances) - 1 and vertex_counts[choice] > vertex_budget:
+        choice += 1
+    return choice
+
+
+def choose_level(levels, zoom, vertex_budget=VERTEX_BUDGET):
+    """Pilih (toleransi, BoundarySet) untuk dirender, lihat choose_level_index"""
+    # Level dari file ringkas (CompactLevels) membawa jumlah vertex tanpa perlu di-decode
+    if hasattr(levels, 'vertex_counts'):
+        tolerances, vertex_counts = levels.tolerances, levels.vertex_counts
+    else:
+        tolerances = [tolerance for tolerance, _ in levels]
+        vertex_counts = [len(boundaries.coords) for _, boundaries in levels]
+    choice = choose_level_index(tolerances, vertex_counts, zoom, vertex_budget)
+    return levels[choice]
+